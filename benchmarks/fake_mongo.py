@@ -0,0 +1,66 @@
+"""
+MongoDB w pamięci (mongomock) dla benchmarków i testów bez serwera.
+
+Użycie:
+    from fake_mongo import MongoClient
+    db = DataBase(client=MongoClient(), db_name="movie_library_bench")
+
+bulk_write z mongomock 4.3 nie współpracuje z pymongo 4.9+: nie zna argumentu `sort`,
+który UpdateOne/ReplaceOne przekazują budowniczemu paczki (TypeError), a upserted_ids
+numeruje kolejnymi upsertami zamiast pozycją operacji w paczce. Tutaj bulk_write
+wykonuje operacje po kolei przez update_one/replace_one/... i zwraca prawdziwy
+pymongo BulkWriteResult. Obejście żyje tylko w tym module - kod aplikacji rozmawia
+z klientem tak samo jak z prawdziwym serwerem.
+"""
+import mongomock
+from mongomock.collection import Collection
+from pymongo.results import BulkWriteResult
+
+
+class _BulkRecorder:
+    """Odbiera operacje tym samym protokołem co budowniczy paczki pymongo (op._add_to_bulk)"""
+    def __init__(self):
+        self.ops = []
+
+    def add_insert(self, document):
+        self.ops.append(("insert", document, None, False))
+
+    def add_update(self, selector, document, multi=False, upsert=False, **kwargs):
+        self.ops.append(("update_many" if multi else "update_one", selector, document, upsert))
+
+    def add_replace(self, selector, document, upsert=False, **kwargs):
+        self.ops.append(("replace_one", selector, document, upsert))
+
+    def add_delete(self, selector, limit, **kwargs):
+        self.ops.append(("delete_one" if limit == 1 else "delete_many", selector, None, False))
+
+
+def _bulk_write(self, requests, ordered=True, **kwargs):
+    recorder = _BulkRecorder()
+    for request in requests:
+        request._add_to_bulk(recorder)
+
+    result = {"nInserted": 0, "nUpserted": 0, "nMatched": 0, "nModified": 0, "nRemoved": 0, "upserted": []}
+    for index, (kind, first, second, upsert) in enumerate(recorder.ops):
+        if kind == "insert":
+            self.insert_one(first)
+            result["nInserted"] += 1
+        elif kind.startswith("delete"):
+            result["nRemoved"] += getattr(self, kind)(first).deleted_count
+        else:
+            done = getattr(self, kind)(first, second, upsert=upsert)
+            if done.upserted_id is not None:
+                result["nUpserted"] += 1
+                result["upserted"].append({"index": index, "_id": done.upserted_id})
+            else:
+                result["nMatched"] += done.matched_count
+                result["nModified"] += done.modified_count
+    return BulkWriteResult(result, True)
+
+
+Collection.bulk_write = _bulk_write
+
+
+def MongoClient(*args, **kwargs):
+    """mongomock.MongoClient z bulk_write zgodnym z zainstalowanym pymongo"""
+    return mongomock.MongoClient(*args, **kwargs)
@@ -0,0 +1,168 @@
+"""
+Lokalny zastępca API TMDB do benchmarków (bez klucza, bez sieci, bez limitów TMDB).
+
+Użycie:
+    python benchmarks/fake_tmdb.py [--port 8765] [--latency-ms 40] [--throttle 0.05]
+
+Odpowiada na te same ścieżki, których używa core.tmdb_api.TMDBClient
+(/search/multi, /search/movie, /search/tv, /movie/<id>, /tv/<id>) deterministycznymi
+wynikami wyliczonymi z zapytania. Opóźnienie i odsetek odpowiedzi 429 (z Retry-After)
+są konfigurowalne, żeby sprawdzać zachowanie przy throttlingu.
+Klient: TMDBClient(base_url=server.url) albo zmienna TMDB_BASE_URL.
+"""
+import json
+import time
+import zlib
+import random
+import argparse
+import threading
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from urllib.parse import urlsplit, parse_qs
+
+GENRES = ["Akcja", "Dramat", "Komedia", "Sci-Fi", "Fantasy", "Horror", "Thriller", "Animacja"]
+
+
+class FakeTMDB:
+    """
+    Serwer HTTP w wątku tła. latency_ms (+ losowy jitter_ms) na każde żądanie,
+    throttle - odsetek żądań kończonych 429, miss - odsetek wyszukiwań bez wyników.
+    """
+    def __init__(self, port=0, latency_ms=0, jitter_ms=0, throttle=0.0, miss=0.0, retry_after="0.05", seed=42):
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.throttle = throttle
+        self.miss = miss
+        self.retry_after = retry_after
+        self.stats = {"requests": 0, "throttled": 0, "search": 0, "details": 0}
+        self._titles = {}                  # id -> tytuł z wyszukiwania (szczegóły pod tym samym tytułem)
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+
+        fake = self
+
+        class Handler(BaseHTTPRequestHandler):
+            # Keep-alive jak w prawdziwym API (TMDBClient trzyma pulę połączeń)
+            protocol_version = "HTTP/1.1"
+
+            def do_GET(self):
+                fake._handle(self)
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", port), Handler)
+        self.server.daemon_threads = True
+        self._thread = None
+
+    @property
+    def url(self):
+        host, port = self.server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self):
+        self._thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    # --- Odpowiedzi ---
+
+    @staticmethod
+    def _id(text):
+        return zlib.crc32(text.encode("utf-8")) % 900000 + 1000
+
+    def _item(self, tmdb_id, media_type, title=None):
+        title = title or self._titles.get(tmdb_id) or f"Tytuł {tmdb_id}"
+        year = 1950 + tmdb_id % 75
+        item = {
+            "id": tmdb_id, "media_type": media_type, "overview": f"Opis {title}",
+            "poster_path": f"/p{tmdb_id}.jpg", "backdrop_path": f"/b{tmdb_id}.jpg",
+            "vote_average": round(tmdb_id % 100 / 10, 1),
+            "genres": [{"id": i, "name": GENRES[(tmdb_id + i) % len(GENRES)]} for i in range(1 + tmdb_id % 3)],
+        }
+        if media_type == "tv":
+            item.update(name=title, original_name=title, first_air_date=f"{year}-01-01")
+        else:
+            item.update(title=title, original_title=title, release_date=f"{year}-01-01")
+        return item
+
+    def _respond(self, path, params):
+        """(status, treść JSON) dla ścieżki API"""
+        parts = path.strip("/").split("/")
+        if parts[0] == "search" and len(parts) == 2:
+            query = params.get("query", [""])[0]
+            with self._lock:
+                self.stats["search"] += 1
+                missed = self._random.random() < self.miss
+            if missed or not query:
+                return 200, {"page": 1, "results": [], "total_results": 0}
+            media_type = "tv" if parts[1] == "tv" else "movie"
+            tmdb_id = self._id(query)
+            self._titles[tmdb_id] = query.title()
+            item = self._item(tmdb_id, media_type)
+            return 200, {"page": 1, "results": [item], "total_results": 1}
+        if parts[0] in ("movie", "tv") and len(parts) == 2 and parts[1].isdigit():
+            with self._lock:
+                self.stats["details"] += 1
+            return 200, self._item(int(parts[1]), parts[0])
+        return 404, {"status_code": 34, "status_message": "The resource you requested could not be found."}
+
+    def _handle(self, handler):
+        with self._lock:
+            self.stats["requests"] += 1
+            delay = self.latency_ms + (self._random.uniform(0, self.jitter_ms) if self.jitter_ms else 0)
+            throttled = self._random.random() < self.throttle
+            if throttled:
+                self.stats["throttled"] += 1
+        if delay:
+            time.sleep(delay / 1000)
+
+        if throttled:
+            status, body, headers = 429, {"status_code": 25, "status_message": "Rate limit exceeded"}, \
+                {"Retry-After": self.retry_after}
+        else:
+            url = urlsplit(handler.path)
+            status, body = self._respond(url.path, parse_qs(url.query))
+            headers = {}
+
+        data = json.dumps(body).encode("utf-8")
+        handler.send_response(status)
+        handler.send_header("Content-Type", "application/json;charset=utf-8")
+        handler.send_header("Content-Length", str(len(data)))
+        for name, value in headers.items():
+            handler.send_header(name, value)
+        handler.end_headers()
+        handler.wfile.write(data)
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--port", type=int, default=8765)
+    ap.add_argument("--latency-ms", type=float, default=40)
+    ap.add_argument("--jitter-ms", type=float, default=20)
+    ap.add_argument("--throttle", type=float, default=0.0, help="odsetek odpowiedzi 429 (0-1)")
+    ap.add_argument("--miss", type=float, default=0.05, help="odsetek wyszukiwań bez wyników (0-1)")
+    args = ap.parse_args()
+
+    server = FakeTMDB(args.port, args.latency_ms, args.jitter_ms, args.throttle, args.miss)
+    print(f"Fałszywe TMDB: {server.url}  (TMDB_BASE_URL={server.url})")
+    try:
+        server.server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server.server_close()
+        print(f"Statystyki: {server.stats}")
+
+
+if __name__ == "__main__":
+    main()
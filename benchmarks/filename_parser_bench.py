@@ -0,0 +1,93 @@
+"""
+Mikro-benchmark parsera nazw plików (core.filename_parser).
+
+Użycie:
+    python benchmarks/filename_parser_bench.py [--count 100000] [--min-rate 30000]
+
+Kończy się kodem 1, jeśli przepustowość "na zimno" spadnie poniżej --min-rate nazw/s
+(domyślnie 30k/s - stary parser robił ~25k/s; 0 wyłącza próg).
+Przebieg "na ciepło" używa pamięci podręcznej mieszczącej wszystkie unikalne nazwy -
+przy domyślnym memo_size (65536) i 100k nazw kolejne przejścia wypychałyby się z LRU
+i drugi przebieg byłby w praktyce drugim zimnym.
+"""
+import sys
+import time
+import random
+import argparse
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parent.parent / 'src'))
+
+from core.filename_parser import FilenameParser
+
+TITLES = [
+    "The Matrix", "Avatar", "Blade Runner", "Breaking Bad", "The Office", "Dune",
+    "Pulp Fiction", "Stranger Things", "Gladiator", "The Last of Us", "Interstellar",
+    "Czarnobyl", "Pan Tadeusz", "Wiedzmin", "House of the Dragon", "Arcane"
+]
+TAGS = ["1080p", "720p", "4K", "BluRay", "WEBRip", "x264", "HEVC", "AAC", "DTS",
+        "HDR", "AMZN", "NETFLIX", "GalaxyRG", "RARBG", "PL", "DUBBED", "[eztv]", "(2020)"]
+SEPARATORS = [".", " ", "_", "-"]
+EXTENSIONS = [".mkv", ".mp4", ".avi"]
+
+
+def make_corpus(count=100000, seed=42):
+    """Deterministyczny zbiór nazw: filmy z rokiem, odcinki S01E01/1x01, śmieciowe tagi"""
+    rnd = random.Random(seed)
+    names = []
+    for _ in range(count):
+        sep = rnd.choice(SEPARATORS)
+        parts = rnd.choice(TITLES).split(" ")
+        kind = rnd.random()
+        if kind < 0.45:
+            parts.append(f"S{rnd.randint(1, 12):02d}E{rnd.randint(1, 24):02d}")
+        elif kind < 0.55:
+            parts.append(f"{rnd.randint(1, 9)}x{rnd.randint(1, 24):02d}")
+        else:
+            parts.append(str(rnd.randint(1950, 2025)))
+        parts += rnd.sample(TAGS, rnd.randint(0, 4))
+        names.append(sep.join(parts) + rnd.choice(EXTENSIONS))
+    return names
+
+
+def run(count=100000, seed=42):
+    """Zwraca przepustowość (nazw/s) na zimno (pusty memo) i na ciepło (wszystkie nazwy w memo)"""
+    names = make_corpus(count, seed)
+    unique = len(set(names))
+    # Memo na cały korpus - drugi przebieg ma same trafienia
+    parser = FilenameParser(memo_size=max(unique, 1))
+
+    start = time.perf_counter()
+    parser.analyze_many(names)
+    cold = count / (time.perf_counter() - start)
+
+    hits = parser.cache_info().hits
+    start = time.perf_counter()
+    parser.analyze_many(names)
+    warm = count / (time.perf_counter() - start)
+    warm_hits = parser.cache_info().hits - hits
+
+    return {"count": count, "unique": unique, "cold_rate": cold, "warm_rate": warm,
+            "warm_hit_ratio": warm_hits / count, "memo": parser.cache_info()}
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--count", type=int, default=100000)
+    ap.add_argument("--min-rate", type=float, default=30000,
+                    help="minimalna przepustowość na zimno (nazw/s, 0 = bez progu)")
+    args = ap.parse_args()
+
+    result = run(args.count)
+    print(f"Nazw:       {result['count']} (unikalnych {result['unique']})")
+    print(f"Na zimno:   {result['cold_rate']:,.0f} nazw/s")
+    print(f"Na ciepło:  {result['warm_rate']:,.0f} nazw/s (trafień w memo {result['warm_hit_ratio']:.0%})")
+    print(f"Memo:       {result['memo']}")
+
+    if args.min_rate and result['cold_rate'] < args.min_rate:
+        print(f"REGRESJA: {result['cold_rate']:,.0f} < {args.min_rate:,.0f} nazw/s")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
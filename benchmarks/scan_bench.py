@@ -0,0 +1,351 @@
+"""
+Benchmark całego skanu: dysk (FileScanner) -> baza (DataBase) -> TMDB (TMDBEnricher).
+
+Użycie:
+    python benchmarks/scan_bench.py [--count 5000] [--stages scanner,db,pipeline]
+                                    [--mongo-uri mongodb://localhost:27017 | --mongomock | --sqlite]
+                                    [--latency-ms 40] [--throttle 0.02] [--json wynik.json]
+                                    [--min-scan-rate 2000] [--min-pipeline-rate 200]
+
+Generuje syntetyczne drzewo (filmy, odcinki S01E01 i 1x01, śmieciowe tagi) w katalogu
+tymczasowym, stawia lokalne fałszywe TMDB (benchmarks/fake_tmdb.py) z opóźnieniem
+i odpowiedziami 429, a bazę uruchamia na lokalnym mongod (osobna baza movie_library_bench,
+czyszczona po biegu), na mongomock albo w pliku SQLite (SQLiteDataBase). Etap "pipeline" to ScanPipeline - dokładnie to,
+co w tle uruchamia przycisk Scan (MovieLibrary.scan), bez okna Qt.
+
+Raport: pliki/s, percentyle opóźnień każdej operacji (metody DataBase, żądania HTTP)
+i szczytowe RSS procesu po każdym etapie. Kończy się kodem 1, jeśli przepustowość
+spadnie poniżej --min-scan-rate / --min-pipeline-rate.
+"""
+import os
+import sys
+import json
+import time
+import random
+import shutil
+import argparse
+import tempfile
+import threading
+from pathlib import Path
+from collections import defaultdict
+
+sys.path.append(str(Path(__file__).resolve().parent.parent / 'src'))
+
+from filename_parser_bench import TITLES, TAGS, SEPARATORS, EXTENSIONS
+from search_index_bench import percentile
+from fake_tmdb import FakeTMDB
+from core.file_scanner import FileScanner
+
+SUFFIXES = ["Returns", "Origins", "Legacy", "Rising", "Reborn", "Forever", "Beyond", "Zero",
+            "Redemption", "Awakening", "Chronicles", "Revolution", "Requiem", "Dawn", "Exodus"]
+# Operacje DataBase mierzone w etapach "db" i "pipeline"
+DB_METHODS = ("get_scan_state", "upsert_scanned_files", "get_unenriched_ids", "update_many_details",
+              "move_movies", "find_by_fingerprints", "prune_missing", "save_dir_states", "list_movies")
+
+
+def make_titles(count, rnd):
+    """count różnych tytułów (różne grupy dla TMDBEnricher)"""
+    titles, pool = [], [f"{t} {s}" for t in TITLES for s in SUFFIXES]
+    rnd.shuffle(pool)
+    titles.extend(pool[:count])
+    while len(titles) < count:
+        titles.append(f"{rnd.choice(TITLES)} {' '.join(rnd.sample(SUFFIXES, 2))}")
+    return titles
+
+
+def make_tree(root, count=5000, episodes=0.45, nxnn=0.1, max_tags=4, titles=None, seed=42):
+    """
+    Syntetyczna biblioteka pod root: count plików, z czego `episodes` to odcinki S01E01,
+    `nxnn` odcinki 1x01, a reszta filmy z rokiem; do max_tags śmieciowych tagów w nazwie.
+    Seriale: Seriale/<tytuł>/Season N/, filmy: Filmy/<litera>/. Każdy plik ma inną treść
+    (różne odciski dla wykrywania przeniesień). Zwraca listę ścieżek.
+    """
+    rnd = random.Random(seed)
+    titles = make_titles(titles or max(16, count // 20), rnd)
+    next_episode = defaultdict(int)
+    paths, seen = [], set()
+    for i in range(count):
+        title = rnd.choice(titles)
+        sep = rnd.choice(SEPARATORS)
+        kind = rnd.random()
+        parts = title.split(" ")
+        if kind < episodes + nxnn:
+            season = rnd.randint(1, 6)
+            next_episode[title, season] += 1
+            episode = next_episode[title, season]
+            parts.append(f"S{season:02d}E{episode:02d}" if kind < episodes else f"{season}x{episode:02d}")
+            folder = Path(root) / "Seriale" / title / f"Season {season}"
+        else:
+            parts.append(str(rnd.randint(1950, 2025)))
+            folder = Path(root) / "Filmy" / title[0].upper()
+        parts += rnd.sample(TAGS, rnd.randint(0, max_tags))
+        name = sep.join(parts) + rnd.choice(EXTENSIONS)
+        if folder / name in seen:
+            name = f"{Path(name).stem} [{i}]{Path(name).suffix}"
+        path = folder / name
+        seen.add(path)
+        folder.mkdir(parents=True, exist_ok=True)
+        path.write_bytes(f"{i}".encode())
+        paths.append(str(path))
+    return paths
+
+
+class Timings:
+    """Czasy wywołań pogrupowane po nazwie (bezpieczne dla wątków)"""
+    def __init__(self):
+        self.samples = defaultdict(list)
+        self._lock = threading.Lock()
+
+    def add(self, name, seconds):
+        with self._lock:
+            self.samples[name].append(seconds * 1000)
+
+    def wrap(self, name, func):
+        def timed(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                self.add(name, time.perf_counter() - start)
+        return timed
+
+    def report(self):
+        return {
+            name: {"count": len(values), "p50_ms": percentile(values, 50), "p95_ms": percentile(values, 95),
+                   "p99_ms": percentile(values, 99), "max_ms": max(values)}
+            for name, values in sorted(self.samples.items()) if values
+        }
+
+
+class TimedDB:
+    """DataBase z mierzonymi metodami z DB_METHODS (reszta przechodzi bez zmian)"""
+    def __init__(self, db, timings):
+        self._db = db
+        self._timings = timings
+
+    def __getattr__(self, name):
+        attr = getattr(self._db, name)
+        if name in DB_METHODS and callable(attr):
+            return self._timings.wrap(f"db.{name}", attr)
+        return attr
+
+
+def peak_rss_mb():
+    """Szczytowe RSS procesu od startu (None tam, gdzie nie ma modułu resource)"""
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux podaje KB, macOS bajty
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def open_database(args, timings):
+    if args.sqlite:
+        from core.sqlite_database import SQLiteDataBase
+        db = SQLiteDataBase(path=Path(tempfile.mkdtemp(prefix="scan_bench_db_")) / "library.sqlite")
+        return db, TimedDB(db, timings)
+    from core.database import DataBase
+    if args.mongomock:
+        from fake_mongo import MongoClient
+        client = MongoClient()
+    else:
+        from pymongo import MongoClient
+        client = MongoClient(args.mongo_uri, serverSelectionTimeoutMS=3000)
+    db = DataBase(client=client, db_name=args.db_name)
+    db.collection.drop()
+    db.dirs_collection.drop()
+    db.ensure_indexes()
+    return db, TimedDB(db, timings)
+
+
+def reopen_database(db, args):
+    """Druga instancja tej samej bazy - z pustym cache (jak po starcie aplikacji)"""
+    if args.sqlite:
+        from core.sqlite_database import SQLiteDataBase
+        return SQLiteDataBase(path=db.path)
+    from core.database import DataBase
+    return DataBase(client=db.client, db_name=args.db_name)
+
+
+def drop_database(db):
+    if hasattr(db, "conn"):
+        db.close()
+        shutil.rmtree(Path(db.path).parent, ignore_errors=True)
+        return
+    db.client.drop_database(db.db.name)
+
+
+# --- Etapy ---
+
+def bench_scanner(folder, args):
+    """Pełny skan (z odciskami treści) i ponowny skan bez zmian"""
+    scanner = FileScanner(max_workers=args.workers)
+    start = time.perf_counter()
+    delta = scanner.scan_incremental(folder)
+    full = time.perf_counter() - start
+    found = len(delta['added'])
+
+    known = {rec['filepath']: rec['fs_stat'] for rec in delta['added']}
+    start = time.perf_counter()
+    rescan = scanner.scan_incremental(folder, known, delta['dirs'])
+    incremental = time.perf_counter() - start
+    return {"files": found, "full_s": full, "files_per_s": found / full,
+            "rescan_s": incremental, "rescan_unchanged": rescan['unchanged']}
+
+
+def bench_db(folder, args):
+    """Zapisy paczkami, stan skanu, lista (zimny cache) i sprzątanie - bez TMDB"""
+    from core.database import DataBase
+    timings = Timings()
+    raw, db = open_database(args, timings)
+    try:
+        records = FileScanner(max_workers=args.workers).scan_incremental(folder)['added']
+        start = time.perf_counter()
+        for i in range(0, len(records), args.batch_size):
+            db.upsert_scanned_files(records[i:i + args.batch_size])
+        write = time.perf_counter() - start
+
+        db.get_scan_state(folder)
+        # Lista z zimnym cache (jak po starcie aplikacji)
+        TimedDB(reopen_database(raw, args), timings).list_movies()
+        present = {rec['filepath'] for rec in records[:len(records) // 2]}
+        db.prune_missing(folder, present, soft=True)
+        return {"files": len(records), "write_s": write, "files_per_s": len(records) / write,
+                "latency": timings.report()}
+    finally:
+        drop_database(raw)
+
+
+def bench_pipeline(folder, args):
+    """ScanPipeline z fałszywym TMDB: pierwszy skan (z wzbogacaniem) i ponowny bez zmian"""
+    from core.tmdb_api import TMDBClient
+    from core.enrichment import TMDBEnricher, TokenBucket
+    from core.scan_pipeline import ScanPipeline
+
+    timings = Timings()
+    raw, db = open_database(args, timings)
+    server = FakeTMDB(latency_ms=args.latency_ms, jitter_ms=args.jitter_ms,
+                      throttle=args.throttle, miss=args.miss).start()
+    try:
+        client = TMDBClient(cache=False, base_url=server.url, backoff_base=0.05, backoff_max=1)
+        client.api_key = "benchmark"
+        client._get = timings.wrap("http.get", client._get)
+        enricher = TMDBEnricher(client, max_workers=args.tmdb_workers, rate_limiter=TokenBucket(rate=args.tmdb_rate))
+        pipeline = ScanPipeline(db, FileScanner(max_workers=args.workers), enricher, batch_size=args.batch_size)
+
+        first_stored = []
+        last_event = [time.perf_counter()]
+
+        def on_event(kind, data):
+            now = time.perf_counter()
+            if kind == 'stored':
+                if not first_stored:
+                    first_stored.append(now - start)
+                timings.add("pipeline.stored_interval", now - last_event[0])
+                last_event[0] = now
+
+        start = time.perf_counter()
+        summary = pipeline.run(folder, callback=on_event)
+        total = time.perf_counter() - start
+
+        start = time.perf_counter()
+        pipeline.run(folder)
+        rescan = time.perf_counter() - start
+
+        files = summary['added']
+        return {"files": files, "total_s": total, "files_per_s": files / total,
+                "first_rows_s": first_stored[0] if first_stored else None, "rescan_s": rescan,
+                "enriched": summary['enriched'], "not_found": summary['not_found'],
+                "tmdb_server": dict(server.stats), "tmdb_client": dict(client.stats),
+                "latency": timings.report()}
+    finally:
+        server.stop()
+        drop_database(raw)
+
+
+STAGES = {"scanner": bench_scanner, "db": bench_db, "pipeline": bench_pipeline}
+
+
+def print_latency(latency):
+    for name, s in latency.items():
+        print(f"    {name:<30} n={s['count']:<6} p50 {s['p50_ms']:8.2f}  p95 {s['p95_ms']:8.2f}  "
+              f"p99 {s['p99_ms']:8.2f}  max {s['max_ms']:8.2f} ms")
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--count", type=int, default=5000, help="liczba plików w drzewie")
+    ap.add_argument("--episodes", type=float, default=0.45, help="odsetek odcinków S01E01")
+    ap.add_argument("--nxnn", type=float, default=0.1, help="odsetek odcinków 1x01")
+    ap.add_argument("--max-tags", type=int, default=4, help="maks. śmieciowych tagów w nazwie")
+    ap.add_argument("--titles", type=int, default=0, help="liczba różnych tytułów (domyślnie count/20)")
+    ap.add_argument("--root", help="gotowe drzewo zamiast generowanego (nie jest usuwane)")
+    ap.add_argument("--stages", default="scanner,db,pipeline")
+    ap.add_argument("--workers", type=int, default=8, help="wątki FileScanner")
+    ap.add_argument("--batch-size", type=int, default=500)
+    ap.add_argument("--mongo-uri", default=os.getenv("MONGO_URI", "mongodb://localhost:27017"))
+    ap.add_argument("--mongomock", action="store_true", help="baza w pamięci (pakiet mongomock)")
+    ap.add_argument("--sqlite", action="store_true", help="baza w pliku SQLite (katalog tymczasowy)")
+    ap.add_argument("--db-name", default="movie_library_bench")
+    ap.add_argument("--latency-ms", type=float, default=40, help="opóźnienie fałszywego TMDB")
+    ap.add_argument("--jitter-ms", type=float, default=20)
+    ap.add_argument("--throttle", type=float, default=0.02, help="odsetek odpowiedzi 429 (0-1)")
+    ap.add_argument("--miss", type=float, default=0.05, help="odsetek wyszukiwań bez wyników (0-1)")
+    ap.add_argument("--tmdb-workers", type=int, default=8)
+    ap.add_argument("--tmdb-rate", type=float, default=200, help="limit żądań/s do (fałszywego) TMDB")
+    ap.add_argument("--json", help="zapisz wyniki do pliku JSON (porównania między wersjami)")
+    ap.add_argument("--min-scan-rate", type=float, default=0, help="minimalna przepustowość FileScanner (pliki/s)")
+    ap.add_argument("--min-pipeline-rate", type=float, default=0, help="minimalna przepustowość skanu (pliki/s)")
+    args = ap.parse_args()
+
+    stages = [s.strip() for s in args.stages.split(",") if s.strip()]
+    unknown = [s for s in stages if s not in STAGES]
+    if unknown:
+        ap.error(f"nieznane etapy: {', '.join(unknown)} (dostępne: {', '.join(STAGES)})")
+
+    tmp = None
+    if args.root:
+        folder = args.root
+    else:
+        tmp = tempfile.mkdtemp(prefix="scan_bench_")
+        folder = os.path.join(tmp, "biblioteka")
+        start = time.perf_counter()
+        make_tree(folder, args.count, args.episodes, args.nxnn, args.max_tags, args.titles)
+        print(f"Drzewo: {args.count} plików w {time.perf_counter() - start:.2f} s ({folder})")
+
+    results = {"count": args.count, "stages": {}}
+    failed = False
+    try:
+        for name in stages:
+            result = STAGES[name](folder, args)
+            result["peak_rss_mb"] = peak_rss_mb()
+            results["stages"][name] = result
+
+            print(f"\n[{name}]")
+            for key, value in result.items():
+                if key == "latency":
+                    continue
+                print(f"  {key:<18} {value:,.2f}" if isinstance(value, float) else f"  {key:<18} {value}")
+            if result.get("latency"):
+                print_latency(result["latency"])
+    finally:
+        if tmp:
+            shutil.rmtree(tmp, ignore_errors=True)
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+
+    for stage, limit in (("scanner", args.min_scan_rate), ("pipeline", args.min_pipeline_rate)):
+        rate = results["stages"].get(stage, {}).get("files_per_s")
+        if limit and rate is not None and rate < limit:
+            print(f"REGRESJA ({stage}): {rate:,.0f} < {limit:,.0f} plików/s")
+            failed = True
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
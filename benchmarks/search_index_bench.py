@@ -0,0 +1,145 @@
+"""
+Benchmark indeksu wyszukiwania (core.search_index) - opóźnienie "klawisz -> wynik".
+
+Użycie:
+    python benchmarks/search_index_bench.py [--count 100000] [--max-p99-ms 10] [--no-cold-db]
+
+Buduje indeks z syntetycznej biblioteki, a potem wpisuje zapytania litera po literze
+(jak użytkownik w polu wyszukiwania). Kończy się kodem 1, jeśli p99 przekroczy --max-p99-ms.
+
+Osobno "zimna baza": ta sama biblioteka w pliku SQLite, świeżo otwarta - pierwsze
+zapytanie przez DataBase.search_index() płaci za wczytanie listy i budowę indeksu.
+Tyle trwałoby pierwsze wciśnięcie klawisza, gdyby indeks nie powstawał w wątku
+ładowania okna (LibraryLoader); pierwszy klawisz po załadowaniu to już zwykłe wyszukanie.
+"""
+import sys
+import time
+import random
+import shutil
+import argparse
+import tempfile
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parent.parent / 'src'))
+
+from core.search_index import SearchIndex
+
+WORDS = [
+    "the", "matrix", "dark", "knight", "star", "wars", "lord", "rings", "blade", "runner",
+    "pan", "tadeusz", "wiedzmin", "czarnobyl", "ogniem", "mieczem", "house", "dragon",
+    "breaking", "bad", "office", "last", "us", "arcane", "dune", "alien", "return",
+    "empire", "strikes", "back", "king", "lion", "toy", "story", "night", "day", "black",
+    "mirror", "crown", "witcher", "potop", "kiler", "seksmisja", "mis", "rejs", "vabank"
+]
+GENRES = ["Akcja", "Dramat", "Komedia", "Sci-Fi", "Fantasy", "Horror", "Thriller", "Animacja"]
+QUERIES = ["matrix", "star wars", "wiedzmin s01", "dark knight rok:2008", "gatunek:dram pan",
+           "breakign bad", "the lord of the rings", "typ:serial crown", "alien 19"]
+
+
+def make_docs(count=100000, seed=42):
+    """Deterministyczna biblioteka: tytuły z 1-4 słów + unikalny numer, rok, gatunki, odcinki"""
+    rnd = random.Random(seed)
+    docs = []
+    for i in range(count):
+        title = " ".join(rnd.sample(WORDS, rnd.randint(1, 4))).title() + f" {i}"
+        is_tv = rnd.random() < 0.4
+        docs.append({
+            '_id': i,
+            'file_path': f"/filmy/{i}.mkv",
+            'title_scanned': title,
+            'episode_code': f"S{rnd.randint(1, 9):02d}E{rnd.randint(1, 24):02d}" if is_tv else "",
+            'movie_details': {
+                'title': title,
+                'release_year': str(rnd.randint(1950, 2025)),
+                'genres': rnd.sample(GENRES, rnd.randint(1, 3)),
+                'type': 'tv' if is_tv else 'movie',
+            }
+        })
+    return docs
+
+
+def percentile(values, p):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * p / 100))]
+
+
+def run_cold_db(docs):
+    """Pierwsze zapytanie na świeżo otwartej bazie: wczytanie listy + budowa indeksu + wyszukanie"""
+    from core.sqlite_database import SQLiteDataBase
+    folder = tempfile.mkdtemp(prefix="search_bench_db_")
+    try:
+        path = Path(folder) / "library.sqlite"
+        seed = SQLiteDataBase(cache=False, path=path)
+        for start in range(0, len(docs), 5000):
+            seed.import_documents(docs[start:start + 5000])
+        seed.close()
+
+        db = SQLiteDataBase(path=path)
+        start = time.perf_counter()
+        db.search_index().search(QUERIES[0][:1])
+        first = time.perf_counter() - start
+        # Następny klawisz - indeks już jest
+        start = time.perf_counter()
+        db.search_index().search(QUERIES[0][:2])
+        second = (time.perf_counter() - start) * 1000
+        db.close()
+        return {"cold_first_query_s": first, "cold_second_query_ms": second}
+    finally:
+        shutil.rmtree(folder, ignore_errors=True)
+
+
+def run(count=100000, seed=42, cold_db=True):
+    docs = make_docs(count, seed)
+    index = SearchIndex()
+
+    start = time.perf_counter()
+    index.load(docs)
+    build = time.perf_counter() - start
+
+    latencies = []
+    for query in QUERIES:
+        for end in range(1, len(query) + 1):
+            start = time.perf_counter()
+            index.search(query[:end])
+            latencies.append((time.perf_counter() - start) * 1000)
+
+    # Aktualizacja przyrostowa (np. dopasowanie z TMDB dla jednego pliku)
+    start = time.perf_counter()
+    for doc in docs[:1000]:
+        index.add(doc)
+    update = (time.perf_counter() - start) / 1000 * 1000
+
+    result = {
+        "count": count, "build_s": build, "keystrokes": len(latencies),
+        "p50_ms": percentile(latencies, 50), "p99_ms": percentile(latencies, 99),
+        "max_ms": max(latencies), "update_ms": update,
+    }
+    if cold_db:
+        result.update(run_cold_db(docs))
+    return result
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--count", type=int, default=100000)
+    ap.add_argument("--max-p99-ms", type=float, default=0, help="maksymalne p99 na klawisz (ms)")
+    ap.add_argument("--no-cold-db", action="store_true", help="bez pomiaru pierwszego zapytania na zimnej bazie")
+    args = ap.parse_args()
+
+    result = run(args.count, cold_db=not args.no_cold_db)
+    print(f"Dokumentów:     {result['count']}")
+    print(f"Budowa indeksu: {result['build_s']:.2f} s")
+    print(f"Klawiszy:       {result['keystrokes']}")
+    print(f"p50 / p99 / max: {result['p50_ms']:.2f} / {result['p99_ms']:.2f} / {result['max_ms']:.2f} ms")
+    print(f"Aktualizacja:   {result['update_ms']:.3f} ms/dokument")
+    if 'cold_first_query_s' in result:
+        print(f"Zimna baza:     pierwsze zapytanie {result['cold_first_query_s']:.2f} s "
+              f"(wątek ładowania), następne {result['cold_second_query_ms']:.2f} ms")
+
+    if args.max_p99_ms and result['p99_ms'] > args.max_p99_ms:
+        print(f"REGRESJA: p99 {result['p99_ms']:.2f} > {args.max_p99_ms:.2f} ms")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,223 @@
+"""
+Benchmark zimnego startu okna: import -> pierwsze malowanie -> pierwszy wiersz tabeli.
+
+Użycie:
+    python benchmarks/startup_bench.py [--rows 20000] [--runs 5]
+                                       [--mongo-uri mongodb://localhost:27017 | --mongomock | --unreachable]
+                                       [--json wynik.json] [--max-first-paint-ms 800] [--max-first-row-ms 1500]
+
+Każdy bieg to osobny proces (zimne importy), który robi to samo co src/main.py: QApplication,
+styl, MovieLibrary(backend=create_backend), show(). Mierzone od uruchomienia procesu:
+    python_s       - start interpretera (do pierwszej linii skryptu),
+    import_s       - import main.py (PyQt, okno; bez pymongo i requests),
+    first_paint_s  - pierwsze zdarzenie Paint okna,
+    first_row_s    - pierwszy wiersz w tabeli, a pętla zdarzeń znów wolna (można klikać),
+    loaded_s       - cała lista wczytana (LibraryLoader.load_finished).
+Baza: lokalny mongod (osobna baza movie_library_bench, zasilana raz i czyszczona po biegu),
+mongomock (import pymongo opłacony przy zasilaniu, więc liczy się głównie UI) albo
+--unreachable - serwer, którego nie ma: okno musi się namalować mimo to.
+Kończy się kodem 1, jeśli mediana przekroczy --max-first-paint-ms / --max-first-row-ms.
+"""
+import os
+import sys
+import json
+import time
+import random
+import argparse
+import subprocess
+import contextlib
+from pathlib import Path
+
+BENCH_DIR = Path(__file__).resolve().parent
+SRC_DIR = BENCH_DIR.parent / 'src'
+sys.path.append(str(SRC_DIR))
+
+STEPS = ("python_s", "import_s", "first_paint_s", "first_row_s", "loaded_s")
+
+
+def make_docs(count, seed=42):
+    """Dokumenty biblioteki jak po skanie i wzbogaceniu (z polami listy)"""
+    from filename_parser_bench import TITLES
+    rnd = random.Random(seed)
+    docs = []
+    for i in range(count):
+        title = f"{rnd.choice(TITLES)} {i}"
+        tv = rnd.random() < 0.45
+        docs.append({
+            "file_path": f"/biblioteka/{'Seriale' if tv else 'Filmy'}/{title}.mkv",
+            "title_scanned": title,
+            "episode_code": f"S01E{i % 20 + 1:02d}" if tv else "",
+            "tmdb_id": i,
+            "fs_stat": {"size": 1000 + i, "mtime_ns": i, "inode": i},
+            "movie_details": {"title": title, "original_title": title, "release_year": str(1950 + i % 75),
+                              "genres": ["Dramat"], "type": "tv" if tv else "movie",
+                              "overview": "Opis " * 40, "poster_url": None, "backdrop_url": None},
+        })
+    return docs
+
+
+# --- Proces potomny: jeden zimny start ---
+
+def child(args):
+    spawned = float(os.environ["STARTUP_BENCH_T0"])
+    marks = {"python_s": time.time() - spawned}
+    # stdout należy do wyniku (JSON) - komunikaty aplikacji idą na stderr
+    with contextlib.redirect_stdout(sys.stderr):
+        factory = None
+        if args.mongomock:
+            import mongomock
+            client = mongomock.MongoClient()
+            client[args.db_name]["movies"].insert_many(make_docs(args.rows))
+
+            def factory():
+                from core.database import DataBase
+                from core.file_scanner import FileScanner
+                from core.tmdb_api import TMDBClient
+                return DataBase(client=client, db_name=args.db_name), FileScanner(), TMDBClient(cache=False)
+            # Zasilanie mongomock nie wlicza się do czasów startu
+            spawned += time.time() - spawned - marks["python_s"]
+
+        start = time.time()
+        import main as app_main
+        from PyQt6.QtWidgets import QApplication
+        from PyQt6.QtCore import QObject, QEvent, QTimer
+        marks["import_s"] = time.time() - start
+
+        def mark(name):
+            if name not in marks:
+                marks[name] = time.time() - spawned
+
+        class PaintWatch(QObject):
+            def eventFilter(self, obj, event):
+                if event.type() == QEvent.Type.Paint:
+                    mark("first_paint_s")
+                return False
+
+        app = QApplication(sys.argv[:1])
+        app_main.load_stylesheet(app)
+        window = app_main.MovieLibrary(backend=factory or app_main.create_backend)
+        watch = PaintWatch()
+        window.installEventFilter(watch)
+        window.model.rowsInserted.connect(lambda *_: QTimer.singleShot(0, lambda: mark("first_row_s")))
+        window.show()
+
+        def finish(*_):
+            marks["rows"] = window.model.rowCount()
+            app.quit()
+
+        def on_failed(message):
+            marks["error"] = message
+            finish()
+
+        def hook_loader():
+            # LibraryLoader powstaje w pierwszym obrocie pętli zdarzeń (MovieLibrary.load_library)
+            if window.loader is None:
+                QTimer.singleShot(0, hook_loader)
+                return
+            window.loader.load_finished.connect(lambda count: (mark("loaded_s"), finish()))
+            window.loader.load_failed.connect(on_failed)
+
+        hook_loader()
+        QTimer.singleShot(int(args.timeout * 1000), finish)
+        app.exec()
+        window.close()
+    print(json.dumps(marks))
+
+
+# --- Proces główny ---
+
+def run_once(args):
+    env = dict(os.environ, STARTUP_BENCH_T0=repr(time.time()))
+    env.setdefault("QT_QPA_PLATFORM", "offscreen")
+    cmd = [sys.executable, str(Path(__file__).resolve()), "--child", "--rows", str(args.rows),
+           "--db-name", args.db_name, "--timeout", str(args.timeout)]
+    if args.mongomock:
+        cmd.append("--mongomock")
+    else:
+        env["MONGO_URI"] = "mongodb://127.0.0.1:9" if args.unreachable else args.mongo_uri
+        env["MONGO_DB"] = args.db_name
+    result = subprocess.run(cmd, env=env, cwd=SRC_DIR, capture_output=True, text=True)
+    if result.returncode != 0 or not result.stdout.strip():
+        raise RuntimeError(f"bieg zakończony kodem {result.returncode}:\n{result.stderr[-2000:]}")
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+@contextlib.contextmanager
+def seeded_mongo(args):
+    """Baza do benchmarku na prawdziwym serwerze - zasilana raz, usuwana po biegu"""
+    if args.mongomock or args.unreachable:
+        yield
+        return
+    from pymongo import MongoClient
+    client = MongoClient(args.mongo_uri, serverSelectionTimeoutMS=3000)
+    client.drop_database(args.db_name)
+    start = time.perf_counter()
+    client[args.db_name]["movies"].insert_many(make_docs(args.rows))
+    print(f"Baza: {args.rows} dokumentów w {time.perf_counter() - start:.2f} s ({args.db_name})")
+    try:
+        yield
+    finally:
+        client.drop_database(args.db_name)
+        client.close()
+
+
+def median(values):
+    values = sorted(values)
+    mid = len(values) // 2
+    return values[mid] if len(values) % 2 else (values[mid - 1] + values[mid]) / 2
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--rows", type=int, default=20000, help="rozmiar biblioteki")
+    ap.add_argument("--runs", type=int, default=5, help="liczba zimnych startów")
+    ap.add_argument("--mongo-uri", default=os.getenv("MONGO_URI", "mongodb://localhost:27017"))
+    ap.add_argument("--mongomock", action="store_true", help="baza w pamięci (pakiet mongomock)")
+    ap.add_argument("--unreachable", action="store_true", help="baza niedostępna - liczy się tylko pierwsze malowanie")
+    ap.add_argument("--db-name", default="movie_library_bench")
+    ap.add_argument("--timeout", type=float, default=30, help="limit jednego biegu (s)")
+    ap.add_argument("--json", help="zapisz wyniki do pliku JSON (porównania między wersjami)")
+    ap.add_argument("--max-first-paint-ms", type=float, default=0, help="maksymalna mediana do pierwszego malowania")
+    ap.add_argument("--max-first-row-ms", type=float, default=0, help="maksymalna mediana do pierwszego wiersza")
+    ap.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    args = ap.parse_args()
+
+    if args.child:
+        child(args)
+        return
+
+    runs = []
+    with seeded_mongo(args):
+        for i in range(args.runs):
+            marks = run_once(args)
+            runs.append(marks)
+            steps = "  ".join(f"{s[:-2]} {marks[s] * 1000:7.1f} ms" for s in STEPS if s in marks)
+            print(f"bieg {i + 1}: {steps}  wierszy {marks.get('rows', 0)}"
+                  + (f"  BŁĄD: {marks['error'][:60]}" if 'error' in marks else ""))
+
+    summary = {}
+    print(f"\n{'krok':<16}{'mediana':>12}{'max':>12}")
+    for step in STEPS:
+        values = [m[step] for m in runs if step in m]
+        if not values:
+            print(f"  {step:<14}{'-':>12}{'-':>12}")
+            continue
+        summary[step] = {"median_ms": median(values) * 1000, "max_ms": max(values) * 1000, "runs": len(values)}
+        print(f"  {step:<14}{summary[step]['median_ms']:>9.1f} ms{summary[step]['max_ms']:>9.1f} ms")
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump({"rows": args.rows, "runs": runs, "summary": summary}, f, indent=2)
+
+    failed = False
+    for step, limit in (("first_paint_s", args.max_first_paint_ms), ("first_row_s", args.max_first_row_ms)):
+        value = summary.get(step, {}).get("median_ms")
+        if limit and (value is None or value > limit):
+            print(f"REGRESJA ({step}): {'brak' if value is None else f'{value:,.0f} ms'} > {limit:,.0f} ms")
+            failed = True
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,16 +1,125 @@
 import os
-from pymongo import MongoClient
+import re
+import time
+import threading
+from pymongo import MongoClient, UpdateOne, ReplaceOne
 from bson.objectid import ObjectId
 from bson.errors import InvalidId
+from core.storage import BaseDataBase, _timed
+from core import metrics
 
-class DataBase:
-    def __init__(self):
-        # Pobieramy URI lub domyślny localhost
+
+class DataBase(BaseDataBase):
+    """Biblioteka w MongoDB (backend domyślny; SQLiteDataBase - bez serwera)"""
+    LIST_PROJECTION = dict(
+        {"_id": 1, "file_path": 1, "title_scanned": 1, "episode_code": 1, "tmdb_id": 1},
+        **{f"movie_details.{name}": 1 for name in BaseDataBase.LIST_DETAILS}
+    )
+
+    # Rekordy plików, których nie było przy ostatnim skanie (prune_missing(soft=True)),
+    # zostają w bazie z polem missing_since, ale nie pokazują się na liście
+    VISIBLE = {"missing_since": None}
+
+    def __init__(self, cache=True, details_cache_size=256, client=None, db_name=None):
+        super().__init__(cache, details_cache_size)
+        # Pobieramy URI lub domyślny localhost (client - gotowy klient, np. mongomock w benchmarkach)
         uri = os.getenv("MONGO_URI", "mongodb://localhost:27017")
-        self.client = MongoClient(uri)
-        self.db = self.client["movie_library"]
+        # MongoClient nie łączy się od razu; niedostępny serwer zgłasza błąd przy pierwszym
+        # zapytaniu po MONGO_TIMEOUT_MS (domyślne 30 s pymongo to za długo dla aplikacji okienkowej)
+        timeout_ms = int(os.getenv("MONGO_TIMEOUT_MS", 5000))
+        self.client = client if client is not None else MongoClient(uri, serverSelectionTimeoutMS=timeout_ms)
+        self.db = self.client[db_name or os.getenv("MONGO_DB", "movie_library")]
         self.collection = self.db["movies"]
+        # Stan katalogów z ostatniego skanu (mtime + podkatalogi) dla skanów przyrostowych
+        self.dirs_collection = self.db["scan_dirs"]
+        # Zeskanowane foldery biblioteki (obserwowane w trybie "na żywo")
+        self.roots_collection = self.db["library_roots"]
+        self._change_stream_thread = None
+
+    def ping(self):
+        self.client.admin.command('ping')
+
+    # --- Zapytania dla BaseDataBase ---
+
+    def _to_oid(self, movie_id):
+        return ObjectId(movie_id) if isinstance(movie_id, str) else movie_id
+
+    def _find_movie(self, oid):
+        return self.collection.find_one({"_id": oid})
+
+    def _find_movie_by_path(self, path):
+        return self.collection.find_one({"file_path": path})
+
+    def _load_list(self):
+        return list(self.collection.find(self.VISIBLE, self.LIST_PROJECTION))
+
+    def _iter_list(self, batch_size):
+        cursor = self.collection.find(self.VISIBLE, self.LIST_PROJECTION)
+        return cursor.sort(self.SORT_FIELDS["title"], 1).batch_size(batch_size)
+
+    def _query_list(self, field, descending):
+        cursor = self.collection.find(self.VISIBLE, self.LIST_PROJECTION)
+        return list(cursor.sort(field, -1 if descending else 1))
+
+    def _library_root_paths(self):
+        return [doc['_id'] for doc in self.roots_collection.find({}, {"_id": 1})]
 
+    @_timed("text_search")
+    def text_search(self, query, limit=100):
+        """
+        Wyszukiwanie po stronie serwera (indeks tekstowy MongoDB, patrz ensure_text_index) -
+        dla narzędzi bez listy w pamięci. Zwraca lekkie dokumenty od najlepiej pasujących.
+        """
+        projection = dict(self.LIST_PROJECTION, score={"$meta": "textScore"})
+        cursor = self.collection.find(dict(self.VISIBLE, **{"$text": {"$search": query}}), projection)
+        return list(cursor.sort([("score", {"$meta": "textScore"})]).limit(limit))
+
+    def start_change_stream(self):
+        """
+        Opcjonalnie: śledzenie zmian robionych przez inne procesy (change streams).
+        Wymaga MongoDB jako replica set - na pojedynczym serwerze tylko wypisuje ostrzeżenie.
+        Własne zapisy też przychodzą tym kanałem (powiadomienie 'update' jest wtedy powtórzone).
+        """
+        if self.cache is None or self._change_stream_thread is not None:
+            return
+        self._ensure_cache()
+
+        def watch():
+            try:
+                with self.collection.watch(full_document='updateLookup') as stream:
+                    for change in stream:
+                        self._apply_change(change)
+            except Exception as e:
+                print(f"Change stream niedostępny: {e}")
+
+        self._change_stream_thread = threading.Thread(target=watch, daemon=True)
+        self._change_stream_thread.start()
+
+    def _apply_change(self, change):
+        op = change.get('operationType')
+        if op in ('insert', 'replace', 'update'):
+            doc = change.get('fullDocument')
+            if doc is None:
+                return
+            if doc.get('missing_since') is not None:
+                # Oznaczony jako brakujący - znika z listy jak usunięty
+                removed = self.cache.remove(doc['_id'])
+                if removed is not None:
+                    self.cache.notify('delete', [removed])
+                return
+            existed = self.cache.get(doc['_id']) is not None
+            self._forget_details([doc['_id']])
+            self.cache.notify('update' if existed else 'insert', [self.cache.put(doc)])
+        elif op == 'delete':
+            self._forget_details([change['documentKey']['_id']])
+            doc = self.cache.remove(change['documentKey']['_id'])
+            if doc is not None:
+                self.cache.notify('delete', [doc])
+        elif op in ('drop', 'invalidate'):
+            self.cache.clear()
+            self.cache.notify('reset', [])
+
+    @_timed("add_movie")
     def add_movie(self, file_path, title_scanned):
         """
         Dodaje film i zwraca jego ID.
@@ -28,8 +137,350 @@ class DataBase:
             "tmdb_id": None
         }
         result = self.collection.insert_one(movie_doc)
+        if self.cache is not None:
+            movie_doc["_id"] = result.inserted_id
+            light = self.cache.put(movie_doc) if self.cache.loaded else self._list_shape(movie_doc)
+            self.cache.notify('insert', [light])
         return result.inserted_id
 
+    @_timed("ensure_indexes")
+    def ensure_indexes(self):
+        """Zakłada unikalny indeks na file_path i indeksy sortowania listy (idempotentne)."""
+        try:
+            self.collection.create_index("file_path", unique=True)
+        except Exception as e:
+            # Np. stare duplikaty w kolekcji - upsert nadal działa, tylko wolniej
+            print(f"Nie udało się założyć indeksu file_path: {e}")
+        try:
+            for field in self.SORT_FIELDS.values():
+                if field != "_id":
+                    self.collection.create_index(field)
+            # Wyszukiwanie przeniesionych plików po treści (tylko rekordy z odciskiem)
+            self.collection.create_index("fingerprint", sparse=True)
+        except Exception as e:
+            print(f"Nie udało się założyć indeksów sortowania: {e}")
+
+    @_timed("ensure_text_index")
+    def ensure_text_index(self):
+        """
+        Indeks tekstowy dla text_search (opcjonalny - budowa na dużej kolekcji trwa).
+        Bez stemmingu ('none'), bo MongoDB nie ma reguł dla polskiego.
+        """
+        try:
+            self.collection.create_index(
+                [("movie_details.title", "text"), ("movie_details.original_title", "text"),
+                 ("title_scanned", "text"), ("movie_details.genres", "text")],
+                name="library_text",
+                weights={"movie_details.title": 10, "movie_details.original_title": 5, "title_scanned": 3},
+                default_language="none"
+            )
+        except Exception as e:
+            print(f"Nie udało się założyć indeksu tekstowego: {e}")
+
+    @_timed("upsert_scanned_files")
+    def upsert_scanned_files(self, records, batch_size=1000):
+        """
+        Zapisuje całą paczkę wyników skanera (słowniki z FileScanner) przez bulk_write.
+        Nowe pliki są wstawiane z pustymi danymi TMDB, istniejące zostają nietknięte
+        (poza kodem odcinka). Zwraca słownik {file_path: ObjectId}.
+        """
+        self.ensure_indexes()
+        path_to_id = {}
+
+        for start in range(0, len(records), batch_size):
+            batch = records[start:start + batch_size]
+            ops, inserts, sets = [], [], []
+            for f in batch:
+                on_insert = {
+                    "file_path": f['filepath'],
+                    "title_scanned": f['title_guess'],
+                    "movie_details": {},
+                    "tmdb_id": None
+                }
+                update = {"$setOnInsert": on_insert}
+                to_set = {}
+                if f.get('episode_code'):
+                    to_set["episode_code"] = f['episode_code']
+                if f.get('fs_stat'):
+                    to_set["fs_stat"] = f['fs_stat']
+                if f.get('fingerprint'):
+                    to_set["fingerprint"] = f['fingerprint']
+                if to_set:
+                    update["$set"] = to_set
+                ops.append(UpdateOne({"file_path": f['filepath']}, update, upsert=True))
+                inserts.append(on_insert)
+                sets.append(to_set)
+
+            if not ops:
+                continue
+            result = self.collection.bulk_write(ops, ordered=False)
+            metrics.DB_DOCUMENTS.inc(len(ops), op="upsert")
+
+            # Nowe rekordy: ID mamy z wyniku bulk_write
+            inserted_docs = []
+            for i, oid in result.upserted_ids.items():
+                path_to_id[batch[i]['filepath']] = oid
+                inserted_docs.append(dict(inserts[i], _id=oid, **sets[i]))
+
+            # Istniejące: jedno zapytanie po ID dla reszty paczki
+            paths = [f['filepath'] for f in batch if f['filepath'] not in path_to_id]
+            if paths:
+                cursor = self.collection.find({"file_path": {"$in": paths}}, {"_id": 1, "file_path": 1})
+                for doc in cursor:
+                    path_to_id[doc['file_path']] = doc['_id']
+
+            if self.cache is not None:
+                if self.cache.loaded:
+                    inserted_docs = [self.cache.put(doc) for doc in inserted_docs]
+                updated_docs = []
+                for i, f in enumerate(batch):
+                    if i not in result.upserted_ids and sets[i] and f['filepath'] in path_to_id:
+                        updated_docs += self._cache_patch([path_to_id[f['filepath']]], sets[i])
+                self.cache.notify('insert', inserted_docs)
+                self.cache.notify('update', updated_docs)
+
+        return path_to_id
+
+    @staticmethod
+    def _prefix_query(root):
+        """Zapytanie o ścieżki pod katalogiem root (zakotwiczony regex korzysta z indeksu)"""
+        prefix = os.path.join(os.path.normpath(root), '')
+        return {"$regex": "^" + re.escape(prefix)}
+
+    @_timed("get_scan_state")
+    def get_scan_state(self, root):
+        """
+        Stan poprzedniego skanu pod katalogiem root:
+        ({file_path: fs_stat}, {katalog: {'mtime_ns': ..., 'subdirs': [...]}})
+        """
+        files = {}
+        cursor = self.collection.find({"file_path": self._prefix_query(root)}, {"file_path": 1, "fs_stat": 1})
+        for doc in cursor:
+            files[doc['file_path']] = doc.get('fs_stat')
+
+        dirs = {}
+        norm_root = os.path.normpath(root)
+        query = {"$or": [{"_id": norm_root}, {"_id": self._prefix_query(root)}]}
+        for doc in self.dirs_collection.find(query):
+            dirs[doc['_id']] = {'mtime_ns': doc['mtime_ns'], 'subdirs': doc.get('subdirs', [])}
+        return files, dirs
+
+    @_timed("add_library_root")
+    def add_library_root(self, root):
+        root = os.path.normpath(root)
+        self.roots_collection.update_one({"_id": root}, {"$set": {"added_at": time.time()}}, upsert=True)
+
+    @_timed("remove_library_root")
+    def remove_library_root(self, root):
+        self.roots_collection.delete_one({"_id": os.path.normpath(root)})
+
+    @_timed("save_dir_states")
+    def save_dir_states(self, root, dirs, batch_size=1000):
+        """Zapisuje stan katalogów po skanie; usuwa wpisy katalogów, których już nie ma"""
+        ops = [
+            ReplaceOne({"_id": path}, {"_id": path, "mtime_ns": st['mtime_ns'], "subdirs": st['subdirs']}, upsert=True)
+            for path, st in dirs.items()
+        ]
+        for start in range(0, len(ops), batch_size):
+            self.dirs_collection.bulk_write(ops[start:start + batch_size], ordered=False)
+
+        norm_root = os.path.normpath(root)
+        query = {"$or": [{"_id": norm_root}, {"_id": self._prefix_query(root)}]}
+        gone = [doc['_id'] for doc in self.dirs_collection.find(query, {"_id": 1}) if doc['_id'] not in dirs]
+        if gone:
+            self.dirs_collection.delete_many({"_id": {"$in": gone}})
+
+    @_timed("move_movies")
+    def move_movies(self, moves, batch_size=1000):
+        """
+        Przenosi rekordy na nowe ścieżki (zmiana nazwy/folderu) bez utraty danych z TMDB.
+        moves: lista par (stara_ścieżka, rekord ze skanera).
+        """
+        changes = []
+        for old_path, rec in moves:
+            fields = {
+                "file_path": rec['filepath'],
+                "fs_stat": rec.get('fs_stat'),
+                "episode_code": rec.get('episode_code', "")
+            }
+            if rec.get('fingerprint'):
+                fields["fingerprint"] = rec['fingerprint']
+            changes.append((old_path, fields))
+        # Rekord oznaczony jako brakujący (prune_missing soft) po przeniesieniu wraca na listę
+        ops = [UpdateOne({"file_path": old_path}, {"$set": fields, "$unset": {"missing_since": ""}})
+               for old_path, fields in changes]
+        sources = {old_path for old_path, _ in changes}
+        occupied = []
+        for start in range(0, len(ops), batch_size):
+            # Rekord, który już zajmuje nową ścieżkę (np. brakujący po starym pliku), ustępuje
+            # przeniesionemu z danymi TMDB - inaczej zapis złamałby unikalny indeks file_path
+            targets = [fields["file_path"] for _, fields in changes[start:start + batch_size]]
+            stale = [doc for doc in self.collection.find({"file_path": {"$in": targets}}, {"_id": 1, "file_path": 1})
+                     if doc['file_path'] not in sources]
+            if stale:
+                self.collection.delete_many({"_id": {"$in": [doc['_id'] for doc in stale]}})
+                occupied += stale
+            self.collection.bulk_write(ops[start:start + batch_size], ordered=False)
+        metrics.DB_DOCUMENTS.inc(len(ops), op="move")
+
+        self._cache_delete(occupied)
+        self._clear_details()
+        if self.cache is not None and self.cache.loaded:
+            docs, revived = [], []
+            for old_path, fields in changes:
+                doc = self.cache.patch_by_path(old_path, fields)
+                if doc is not None:
+                    docs.append(doc)
+                else:
+                    revived.append(fields["file_path"])
+            self.cache.notify('update', docs)
+            if revived:
+                back = self.collection.find({"file_path": {"$in": revived}}, self.LIST_PROJECTION)
+                self.cache.notify('insert', [self.cache.put(doc) for doc in back])
+
+    @_timed("find_by_fingerprints")
+    def find_by_fingerprints(self, fingerprints, batch_size=1000):
+        """
+        Rekordy o podanych odciskach treści (także oznaczone jako brakujące):
+        {odcisk: [{'_id', 'file_path', 'missing_since'}, ...]}
+        """
+        fingerprints = list({fp for fp in fingerprints if fp})
+        found = {}
+        for start in range(0, len(fingerprints), batch_size):
+            cursor = self.collection.find(
+                {"fingerprint": {"$in": fingerprints[start:start + batch_size]}},
+                {"file_path": 1, "fingerprint": 1, "missing_since": 1}
+            )
+            for doc in cursor:
+                found.setdefault(doc['fingerprint'], []).append(doc)
+        return found
+
+    @_timed("delete_by_paths")
+    def delete_by_paths(self, paths, batch_size=1000):
+        """Usuwa rekordy plików, których już nie ma na dysku"""
+        paths = list(paths)
+        for start in range(0, len(paths), batch_size):
+            self.collection.delete_many({"file_path": {"$in": paths[start:start + batch_size]}})
+        metrics.DB_DOCUMENTS.inc(len(paths), op="delete")
+
+        self._clear_details()
+        if self.cache is not None:
+            if self.cache.loaded:
+                docs = [self.cache.remove_path(p) for p in paths]
+                docs = [d for d in docs if d is not None]
+            else:
+                docs = [{"file_path": p} for p in paths]
+            self.cache.notify('delete', docs)
+
+    @_timed("prune_missing")
+    def prune_missing(self, root, present_paths, soft=False, batch_size=1000):
+        """
+        Sprzątanie po skanie katalogu root: rekordy spod root, których ścieżek nie ma
+        w present_paths, są usuwane (soft=False) albo tylko oznaczane missing_since
+        (soft=True - np. odmontowany dysk nie kasuje dopasowań z TMDB).
+        Oznaczone rekordy, których pliki znów są w present_paths, wracają na listę.
+        Zwraca listę ścieżek usuniętych/oznaczonych w tym wywołaniu.
+        """
+        present = set(present_paths)
+        stale, revived = [], []
+        cursor = self.collection.find(
+            {"file_path": self._prefix_query(root)}, {"file_path": 1, "missing_since": 1}
+        )
+        for doc in cursor:
+            missing = doc.get('missing_since') is not None
+            if doc['file_path'] in present:
+                if missing:
+                    revived.append(doc['_id'])
+            elif not (soft and missing):
+                stale.append(doc)
+
+        stale_ids = [doc['_id'] for doc in stale]
+        now = time.time()
+        for start in range(0, len(stale_ids), batch_size):
+            chunk = {"_id": {"$in": stale_ids[start:start + batch_size]}}
+            if soft:
+                self.collection.update_many(chunk, {"$set": {"missing_since": now}})
+            else:
+                self.collection.delete_many(chunk)
+        for start in range(0, len(revived), batch_size):
+            self.collection.update_many(
+                {"_id": {"$in": revived[start:start + batch_size]}}, {"$unset": {"missing_since": ""}}
+            )
+        metrics.DB_DOCUMENTS.inc(len(stale_ids), op="tombstone" if soft else "delete")
+
+        if stale_ids or revived:
+            self._forget_details(stale_ids + revived)
+        if self.cache is not None:
+            if self.cache.loaded:
+                gone = [self.cache.remove(mid) for mid in stale_ids]
+                gone = [d for d in gone if d is not None]
+            else:
+                gone = [{"_id": d['_id'], "file_path": d['file_path']} for d in stale]
+            self.cache.notify('delete', gone)
+            if revived:
+                back = list(self.collection.find({"_id": {"$in": revived}}, self.LIST_PROJECTION))
+                if self.cache.loaded:
+                    back = [self.cache.put(doc) for doc in back]
+                self.cache.notify('insert', back)
+        return [doc['file_path'] for doc in stale]
+
+    def _missing_query(self, root=None, older_than=0):
+        query = {"missing_since": {"$lte": time.time() - older_than}}
+        if root is not None:
+            query["file_path"] = self._prefix_query(root)
+        return query
+
+    @_timed("purge_missing")
+    def purge_missing(self, root=None, older_than=0):
+        """Ostatecznie usuwa rekordy oznaczone jako brakujące dłużej niż older_than sekund"""
+        return self.collection.delete_many(self._missing_query(root, older_than)).deleted_count
+
+    @_timed("count_missing")
+    def count_missing(self, root=None, older_than=0):
+        """Ile rekordów usunęłoby purge_missing z tymi samymi argumentami"""
+        return self.collection.count_documents(self._missing_query(root, older_than))
+
+    @_timed("iter_unenriched")
+    def iter_unenriched(self, root=None, limit=0):
+        """Widoczne rekordy bez danych z TMDB (np. po braku wyniku albo przerwanym skanie)"""
+        query = dict(self.VISIBLE, tmdb_id=None)
+        if root is not None:
+            query["file_path"] = self._prefix_query(root)
+        return self.collection.find(query, {"_id": 1, "file_path": 1}).limit(limit)
+
+    @_timed("get_stats")
+    def get_stats(self):
+        """Liczniki biblioteki: wszystkie, widoczne, brakujące, bez danych TMDB i według typu"""
+        visible = self.collection.count_documents(self.VISIBLE)
+        by_type = {
+            (row['_id'] or "brak"): row['count']
+            for row in self.collection.aggregate([
+                {"$match": self.VISIBLE},
+                {"$group": {"_id": "$movie_details.type", "count": {"$sum": 1}}},
+            ])
+        }
+        return {
+            "total": self.collection.estimated_document_count(),
+            "visible": visible,
+            "missing": self.collection.count_documents({"missing_since": {"$ne": None}}),
+            "unenriched": self.collection.count_documents(dict(self.VISIBLE, tmdb_id=None)),
+            "by_type": by_type,
+            "roots": self.get_library_roots(),
+        }
+
+    @_timed("get_unenriched_ids")
+    def get_unenriched_ids(self, movie_ids):
+        """Zwraca te ID z podanych, które nie mają jeszcze danych z TMDB"""
+        movie_ids = list(movie_ids)
+        result = set()
+        for start in range(0, len(movie_ids), 1000):
+            cursor = self.collection.find(
+                {"_id": {"$in": movie_ids[start:start + 1000]}, "tmdb_id": None}, {"_id": 1}
+            )
+            result.update(doc['_id'] for doc in cursor)
+        return result
+
+    @_timed("update_movie_details")
     def update_movie_details(self, movie_id, details, tmdb_id):
         """
         Aktualizuje rekord o dane z API.
@@ -50,7 +501,12 @@ class DataBase:
                     "tmdb_id": tmdb_id
                 }}
             )
-            
+            self._forget_details([oid])
+
+            if self.cache is not None and result.matched_count > 0:
+                fields = {"movie_details": details, "tmdb_id": tmdb_id}
+                self.cache.notify('update', self._cache_patch([oid], fields))
+
             # DIAGNOSTYKA W TERMINALU
             if result.modified_count > 0:
                 print(f"Zaktualizowano rekord {oid}")
@@ -64,16 +520,80 @@ class DataBase:
         except Exception as e:
             print(f" BŁĄD KRYTYCZNY: {e}")
 
+    @_timed("update_many_details")
+    def update_many_details(self, movie_ids, details, tmdb_id):
+        """Ten sam wynik z TMDB dla wielu rekordów (np. odcinki jednego serialu) - jedno update_many"""
+        try:
+            oids = [ObjectId(m) if isinstance(m, str) else m for m in movie_ids]
+            result = self.collection.update_many(
+                {"_id": {"$in": oids}},
+                {"$set": {"movie_details": details, "tmdb_id": tmdb_id}}
+            )
+            metrics.DB_DOCUMENTS.inc(result.modified_count, op="details")
+            self._forget_details(oids)
+            if self.cache is not None:
+                fields = {"movie_details": details, "tmdb_id": tmdb_id}
+                self.cache.notify('update', self._cache_patch(oids, fields))
+            print(f"Zaktualizowano {result.modified_count}/{len(oids)} rekordów ({details.get('title')})")
+        except InvalidId:
+            print(f"Nieprawidłowy format ID w: {movie_ids}")
+        except Exception as e:
+            print(f" BŁĄD KRYTYCZNY: {e}")
+
+    @_timed("get_all_movies")
     def get_all_movies(self):
-        """Pobiera wszystkie filmy"""
+        """Pobiera wszystkie filmy - pełne dokumenty (do listy lepiej list_movies)"""
         try:
             # Sortujemy alfabetycznie po tytule skanera
-            return list(self.collection.find().sort("title_scanned", 1))
+            return list(self.collection.find(self.VISIBLE).sort("title_scanned", 1))
         except Exception as e:
             print(f"Błąd pobierania listy: {e}")
             return []
     
+    # --- Migracja między backendami (storage.migrate) ---
+
+    def iter_documents(self, batch_size=1000):
+        """Wszystkie rekordy (także brakujące) w kolejności dodania - pełne dokumenty"""
+        return self.collection.find({}).sort("_id", 1).batch_size(batch_size)
+
+    @_timed("import_documents")
+    def import_documents(self, docs):
+        """Zapis pełnych dokumentów z innej bazy (nadpisuje rekord o tej samej ścieżce)"""
+        self.ensure_indexes()
+        ops = [ReplaceOne({"file_path": doc['file_path']}, {k: v for k, v in doc.items() if k != '_id'}, upsert=True)
+               for doc in docs]
+        if ops:
+            self.collection.bulk_write(ops, ordered=False)
+        metrics.DB_DOCUMENTS.inc(len(ops), op="import")
+        self._clear_details()
+        if self.cache is not None and self.cache.loaded:
+            self.cache.clear()
+            self.cache.loaded = False
+            self.cache.notify('reset', [])
+        return len(ops)
+
+    def export_state(self):
+        """Stan skanów i foldery biblioteki: {'dirs': {katalog: stan}, 'roots': {folder: dodano}}"""
+        return {
+            "dirs": {doc['_id']: {'mtime_ns': doc['mtime_ns'], 'subdirs': doc.get('subdirs', [])}
+                     for doc in self.dirs_collection.find({})},
+            "roots": {doc['_id']: doc.get('added_at') for doc in self.roots_collection.find({})},
+        }
+
+    def import_state(self, state):
+        ops = [ReplaceOne({"_id": path}, {"_id": path, "mtime_ns": st['mtime_ns'], "subdirs": st['subdirs']}, upsert=True)
+               for path, st in state["dirs"].items()]
+        for start in range(0, len(ops), 1000):
+            self.dirs_collection.bulk_write(ops[start:start + 1000], ordered=False)
+        for root, added_at in state["roots"].items():
+            self.roots_collection.update_one({"_id": root}, {"$set": {"added_at": added_at or time.time()}}, upsert=True)
+
     # Metoda pomocnicza do czyszczenia bazy (przyda się zaraz)
+    @_timed("clear_database")
     def clear_database(self):
         self.collection.drop()
+        self._clear_details()
+        if self.cache is not None:
+            self.cache.clear()
+            self.cache.notify('reset', [])
         print("Baza danych wyczyszczona.")
\ No newline at end of file
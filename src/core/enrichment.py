@@ -0,0 +1,177 @@
+import os
+import queue
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from core import tracing
+
+
+class TokenBucket:
+    """
+    Prosty limiter typu token bucket (bezpieczny dla wątków).
+    rate: ile żądań na sekundę, capacity: maksymalny "wybuch" żądań naraz.
+    Domyślne wartości mieszczą się w limicie TMDB (ok. 40-50 żądań/s z jednego IP).
+    """
+    def __init__(self, rate=None, capacity=None):
+        self.rate = float(rate or os.getenv("TMDB_RATE_LIMIT", 40))
+        self.capacity = float(capacity or self.rate)
+        self.tokens = self.capacity
+        self.last = time.monotonic()
+        self.lock = threading.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.last) * self.rate)
+        self.last = now
+
+    def acquire(self, tokens=1):
+        """Blokuje, aż będzie dostępny token."""
+        while True:
+            with self.lock:
+                self._refill()
+                if self.tokens >= tokens:
+                    self.tokens -= tokens
+                    return
+                wait_time = (tokens - self.tokens) / self.rate
+            time.sleep(wait_time)
+
+
+_END = object()
+
+
+class TMDBEnricher:
+    """
+    Równoległe wyszukiwanie danych w TMDB na ograniczonej puli wątków.
+    Pliki o tym samym (tytuł, rok, serial?) - np. wszystkie odcinki sezonu - są
+    grupowane: jedno zapytanie na grupę, wynik trafia do wszystkich rekordów grupy.
+    Wyniki są oddawane na bieżąco (w kolejności ukończenia), a nie na końcu.
+    """
+    # Co ile sekund zaglądać do kolejki zadań, gdy czekamy na wyniki TMDB
+    QUEUE_POLL = 0.05
+
+    def __init__(self, tmdb, max_workers=8, rate_limiter=None):
+        self.tmdb = tmdb
+        self.max_workers = max_workers
+        # Limiter siedzi w kliencie, więc obejmuje każde żądanie HTTP (search + details)
+        if rate_limiter is not None:
+            self.tmdb.rate_limiter = rate_limiter
+        elif getattr(self.tmdb, 'rate_limiter', None) is None:
+            self.tmdb.rate_limiter = TokenBucket()
+
+    @staticmethod
+    def group_key(record):
+        """Znormalizowany klucz wyszukiwania: (tytuł, rok, czy_serial)"""
+        title = " ".join(str(record['title_guess']).split()).casefold()
+        return title, record.get('year_guess'), bool(record.get('is_tv_guess'))
+
+    def _lookup(self, record):
+        with tracing.span("tmdb_lookup", cat="enrich", title=record['title_guess']):
+            return self.tmdb.search_smart(
+                record['title_guess'],
+                record.get('year_guess'),
+                record.get('is_tv_guess')
+            )
+
+    def enrich(self, jobs):
+        """
+        jobs: iterowalne pary (movie_id, rekord ze skanera) albo queue.Queue z takimi parami
+        (None = koniec). Z kolejki przy zapytaniach w toku albo gotowych grupach czytamy
+        bez czekania (get_nowait, potem co QUEUE_POLL s), więc pusta kolejka skanera nie
+        wstrzymuje oddawania wyników. Blokujemy się na niej tylko, gdy nie ma nic innego do roboty.
+        Generator zwraca (lista movie_id, details) - details to None, gdy nic nie znaleziono.
+        Zapytanie dla klucza, który jest już w toku, nie jest wysyłane drugi raz -
+        ID dopisuje się do grupy; klucz już rozwiązany w tym przebiegu nie idzie do TMDB wcale.
+        """
+        source = jobs if isinstance(jobs, queue.Queue) else None
+        jobs = iter(jobs) if source is None else None
+        # Ograniczamy liczbę zadań w kolejce, żeby nie tworzyć 60k Future naraz
+        max_pending = self.max_workers * 4
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            pending = {}    # Future -> klucz
+            in_flight = {}  # klucz -> lista movie_id czekających na wynik
+            resolved = {}   # klucz -> details (wyniki z tego przebiegu)
+            ready = []      # gotowe grupy do oddania
+            exhausted = False
+
+            def pull():
+                """Kolejne zadanie, _END na końcu źródła albo None, gdy kolejka jest chwilowo pusta"""
+                if source is None:
+                    return next(jobs, _END)
+                try:
+                    job = source.get(block=not (pending or ready))
+                except queue.Empty:
+                    return None
+                return _END if job is None else job
+
+            def submit_next():
+                nonlocal exhausted
+                while not exhausted:
+                    job = pull()
+                    if job is None:
+                        return False
+                    if job is _END:
+                        exhausted = True
+                        return False
+                    movie_id, record = job
+                    key = self.group_key(record)
+                    if key in resolved:
+                        ready.append(([movie_id], resolved[key]))
+                        return True
+                    if key in in_flight:
+                        in_flight[key].append(movie_id)
+                        continue
+                    in_flight[key] = [movie_id]
+                    pending[pool.submit(self._lookup, record)] = key
+                    return True
+                return False
+
+            def fill():
+                # Dokładamy zadania dopiero po oddaniu wyników - źródło zadań może blokować
+                while len(pending) < max_pending and len(ready) < max_pending and submit_next():
+                    pass
+
+            fill()
+            while pending or ready:
+                while ready:
+                    yield ready.pop(0)
+
+                if pending:
+                    # Z kolejki nowe zadania mogą przyjść w trakcie zapytań - zaglądamy co QUEUE_POLL s
+                    timeout = self.QUEUE_POLL if source is not None and not exhausted else None
+                    done, _ = wait(pending, timeout=timeout, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        key = pending.pop(future)
+                        try:
+                            details = future.result()
+                        except Exception as e:
+                            print(f"Błąd wyszukiwania dla '{key[0]}': {e}")
+                            details = None
+                        resolved[key] = details
+                        yield in_flight.pop(key), details
+
+                fill()
+
+    def enrich_into(self, db, jobs, on_result=None, cancel=None):
+        """
+        Zapisuje wyniki do bazy na bieżąco - jedna aktualizacja na grupę.
+        on_result(movie_ids, details): wołane po każdej grupie (details None = brak wyniku).
+        cancel: threading.Event - przerywa po bieżących zapytaniach.
+        Zwraca (znalezione, nieznalezione) w liczbie rekordów.
+        """
+        found, missing = 0, 0
+        results = self.enrich(jobs)
+        try:
+            for movie_ids, details in results:
+                if details:
+                    db.update_many_details(movie_ids, details, details['tmdb_id'])
+                    found += len(movie_ids)
+                else:
+                    missing += len(movie_ids)
+                if on_result:
+                    on_result(movie_ids, details)
+                if cancel is not None and cancel.is_set():
+                    break
+        finally:
+            results.close()
+        return found, missing
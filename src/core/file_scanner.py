@@ -1,61 +1,288 @@
 import os
-import re
+import time
+import fnmatch
+import hashlib
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from core.filename_parser import FilenameParser
+from core import metrics, tracing
 
 class FileScanner:
     VIDEO_EXTENSIONS = ('.mp4', '.mkv', '.avi', '.mov', '.wmv', '.flv')
+    # Odcisk treści: rozmiar + skrót z początku i końca pliku (bez czytania całych GB)
+    FINGERPRINT_CHUNK = 64 * 1024
+
+    def __init__(self, max_workers=8, parser=None, fingerprints=True):
+        # Ile katalogów listujemy równolegle (ważne na NFS/SMB, gdzie każde wywołanie to podróż po sieci)
+        self.max_workers = max_workers
+        # Parser nazw (skompilowane wzorce + pamięć wyników), można podać własny z innymi słowami
+        self.parser = parser or FilenameParser()
+        # Odciski treści nowych/zmienionych plików - pozwalają rozpoznać przeniesienie między dyskami
+        self.fingerprints = fingerprints
 
     def scan_folder(self, folder_path):
-        found_files = []
-        for root, dirs, files in os.walk(folder_path):
-            for file in files:
-                if file.lower().endswith(self.VIDEO_EXTENSIONS):
-                    full_path = os.path.join(root, file)
-                    
-                    # Pobieramy też kod odcinka (np. "S01E01")
-                    clean_title, year, is_tv, episode_code = self._analyze_filename(file)
-                    
-                    found_files.append({
-                        'filepath': full_path,
-                        'title_guess': clean_title,
-                        'year_guess': year,
-                        'is_tv_guess': is_tv,
-                        'episode_code': episode_code # <--- ZAPAMIĘTUJEMY ODCINEK
-                    })
-        return found_files
+        """Pełna lista plików (dla zgodności) - zbudowana na strumieniowym iter_folder"""
+        with tracing.span("FileScanner.scan_folder", cat="scanner", folder=str(folder_path)):
+            return list(self.iter_folder(folder_path))
+
+    def iter_folder(self, roots, include=None, exclude=None, max_depth=None):
+        """
+        Generator rekordów plików wideo - oddaje je, gdy tylko zostaną znalezione.
+        roots: ścieżka albo lista ścieżek.
+        include: wzorce glob dla plików (np. ["*.mkv"]) - domyślnie wszystkie wideo.
+        exclude: wzorce glob dla plików i katalogów (nazwa albo pełna ścieżka, np. ["Sample*", ".*"]).
+        max_depth: 0 = tylko pliki w samym katalogu głównym, None = bez limitu.
+        """
+        for kind, path, data in self._walk(roots, include, exclude, max_depth):
+            if kind == 'file':
+                yield self._make_record(path, data)
+
+    def _file_stat(self, st):
+        """Odcisk pliku z os.stat - wystarczy do wykrycia zmian bez czytania treści"""
+        return {'size': st.st_size, 'mtime_ns': st.st_mtime_ns, 'inode': st.st_ino}
+
+    @classmethod
+    @tracing.traced("fingerprint", cat="scanner")
+    @metrics.timed(metrics.SCAN_FINGERPRINT_SECONDS)
+    def fingerprint(cls, path, size=None):
+        """
+        Tani odcisk treści: rozmiar + blake2b z pierwszych i ostatnich 64 KB (os.pread,
+        bez przesuwania pozycji w pliku). Ten sam plik po kopii/zmianie nazwy ma ten sam odcisk.
+        Zwraca None, gdy pliku nie da się odczytać.
+        """
+        chunk = cls.FINGERPRINT_CHUNK
+        try:
+            fd = os.open(path, os.O_RDONLY | getattr(os, 'O_BINARY', 0))
+        except OSError:
+            return None
+        try:
+            if size is None:
+                size = os.fstat(fd).st_size
+            digest = hashlib.blake2b(digest_size=16)
+            if hasattr(os, 'pread'):
+                digest.update(os.pread(fd, chunk, 0))
+                if size > chunk:
+                    digest.update(os.pread(fd, chunk, max(chunk, size - chunk)))
+            else:
+                # Windows - bez pread
+                digest.update(os.read(fd, chunk))
+                if size > chunk:
+                    os.lseek(fd, max(chunk, size - chunk), os.SEEK_SET)
+                    digest.update(os.read(fd, chunk))
+            return f"{size:x}-{digest.hexdigest()}"
+        except OSError:
+            return None
+        finally:
+            os.close(fd)
+
+    def _with_fingerprint(self, record):
+        record['fingerprint'] = self.fingerprint(record['filepath'], record['fs_stat']['size'])
+        return record
+
+    def _make_record(self, full_path, fs_stat):
+        clean_title, year, is_tv, episode_code = self._analyze_filename(os.path.basename(full_path))
+        return {
+            'filepath': full_path,
+            'title_guess': clean_title,
+            'year_guess': year,
+            'is_tv_guess': is_tv,
+            'episode_code': episode_code,
+            'fs_stat': fs_stat
+        }
+
+    @staticmethod
+    def _matches(path, name, patterns):
+        return any(fnmatch.fnmatch(name, p) or fnmatch.fnmatch(path, p) for p in patterns)
+
+    def _visit_dir(self, path, known, include, exclude):
+        """
+        Praca jednego wątku: stat katalogu, a jeśli się zmienił - jego listing.
+        Zwraca ('skip', stan) dla katalogu bez zmian, ('dir', (mtime, pliki, podkatalogi))
+        albo None, gdy katalogu nie da się odczytać.
+        """
+        if not metrics.REGISTRY.enabled and not tracing.TRACER.enabled:
+            return self._read_dir(path, known, include, exclude)
+        start = time.perf_counter()
+        with tracing.span("list_dir", cat="scanner", path=path) as span:
+            result = self._read_dir(path, known, include, exclude)
+            span.set(result=result[0] if result else 'error')
+        metrics.SCAN_DIR_SECONDS.observe(time.perf_counter() - start, result=result[0] if result else 'error')
+        return result
+
+    def _read_dir(self, path, known, include, exclude):
+        try:
+            dir_mtime = os.stat(path).st_mtime_ns
+            if known and known.get('mtime_ns') == dir_mtime:
+                return 'skip', known
+
+            files, subdirs = [], []
+            with os.scandir(path) as it:
+                for entry in it:
+                    try:
+                        if exclude and self._matches(entry.path, entry.name, exclude):
+                            continue
+                        if entry.is_dir(follow_symlinks=False):
+                            subdirs.append(entry.path)
+                        elif entry.name.lower().endswith(self.VIDEO_EXTENSIONS):
+                            if include and not self._matches(entry.path, entry.name, include):
+                                continue
+                            files.append((entry.path, self._file_stat(entry.stat())))
+                    except OSError:
+                        continue
+            return 'dir', (dir_mtime, files, subdirs)
+        except OSError as e:
+            print(f"Nie można odczytać katalogu {path}: {e}")
+            return None
+
+    def _walk(self, roots, include=None, exclude=None, max_depth=None, known_dirs=None):
+        """
+        Równoległe przejście drzew katalogów na puli wątków.
+        Zdarzenia: ('file', ścieżka, fs_stat), ('dir', ścieżka, stan) oraz
+        ('skip', ścieżka, stan) - katalog bez zmian względem known_dirs (nie był listowany).
+        """
+        if isinstance(roots, (str, os.PathLike)):
+            roots = [roots]
+        known_dirs = known_dirs or {}
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            pending = {}
+
+            def submit(path, depth):
+                fut = pool.submit(self._visit_dir, path, known_dirs.get(path), include, exclude)
+                pending[fut] = (path, depth)
+
+            for root in roots:
+                submit(os.path.normpath(os.fspath(root)), 0)
+
+            while pending:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for fut in done:
+                    path, depth = pending.pop(fut)
+                    result = fut.result()
+                    if result is None:
+                        continue
+                    kind, data = result
+                    if kind == 'skip':
+                        subdirs = data.get('subdirs', [])
+                        yield 'skip', path, data
+                    else:
+                        dir_mtime, files, subdirs = data
+                        yield 'dir', path, {'mtime_ns': dir_mtime, 'subdirs': subdirs}
+                        for file_path, fs_stat in files:
+                            yield 'file', file_path, fs_stat
+
+                    if max_depth is None or depth < max_depth:
+                        for sub in subdirs:
+                            submit(sub, depth + 1)
+
+    def scan_incremental(self, folder_path, known_files=None, known_dirs=None):
+        """
+        Skan przyrostowy - zbiera zdarzenia z iter_incremental do jednej delty:
+        added/modified (rekordy), moved (pary stara_ścieżka, rekord),
+        removed (ścieżki), unchanged (liczba) i dirs (nowy stan katalogów).
+        """
+        delta = {'added': [], 'modified': [], 'moved': [], 'removed': [], 'unchanged': 0, 'dirs': {}}
+        for kind, data in self.iter_incremental(folder_path, known_files, known_dirs):
+            if kind == 'done':
+                delta.update(data)
+            else:
+                delta[kind].append(data)
+        return delta
+
+    def iter_incremental(self, folder_path, known_files=None, known_dirs=None):
+        """
+        Przyrostowe porównanie dysku ze stanem z poprzedniego skanu:
+        known_files: {ścieżka: fs_stat} - pliki z bazy pod folder_path,
+        known_dirs:  {ścieżka_katalogu: {'mtime_ns': ..., 'subdirs': [...]}}.
+
+        Katalog z niezmienionym mtime nie jest listowany (jego pliki przechodzą dalej
+        bez parsowania), wchodzimy tylko do zapamiętanych podkatalogów.
+        Uwaga: nadpisanie pliku "w miejscu" w takim katalogu wyłapie dopiero pełny
+        skan (known_dirs=None) - mtime katalogu zmienia się tylko przy dodaniu/usunięciu/zmianie nazwy.
+
+        Generator zdarzeń (rodzaj, dane), oddawanych już w trakcie przechodzenia drzewa:
+        ('added', rekord), ('modified', rekord), a po zakończeniu ('moved', (stara_ścieżka, rekord)),
+        ('removed', ścieżka) i ('done', {'unchanged': n, 'dirs': stan_katalogów}).
+        Rekordy added/modified mają też 'fingerprint' (odcisk treści, gdy fingerprints=True).
+        """
+        known_files = known_files or {}
+
+        # Pliki z bazy pogrupowane po katalogu - do przeniesienia "w ciemno"
+        files_by_dir = {}
+        # Odciski plików z bazy - nowy plik z takim odciskiem może być przeniesionym starym
+        known_by_stat = {}
+        for path, st in known_files.items():
+            files_by_dir.setdefault(os.path.dirname(path), []).append(path)
+            if st:
+                known_by_stat[(st['inode'], st['size'], st['mtime_ns'])] = path
+
+        seen = set()
+        changed = 0
+        dirs = {}
+        maybe_moved = []
+
+        # Odciski liczone na osobnej puli (czytanie plików), zdarzenia oddawane w kolejności
+        hash_pool = ThreadPoolExecutor(max_workers=self.max_workers) if self.fingerprints else None
+        hashing = deque()
+        max_hashing = self.max_workers * 4
+
+        def emit(kind, record):
+            if hash_pool is None:
+                return [(kind, record)]
+            hashing.append((kind, hash_pool.submit(self._with_fingerprint, record)))
+            ready = []
+            while hashing and (hashing[0][1].done() or len(hashing) > max_hashing):
+                kind, fut = hashing.popleft()
+                ready.append((kind, fut.result()))
+            return ready
+
+        try:
+            for kind, path, data in self._walk(folder_path, known_dirs=known_dirs):
+                if kind == 'skip':
+                    # Katalog bez zmian - bez listowania i bez parsowania plików
+                    seen.update(files_by_dir.get(path, []))
+                    dirs[path] = data
+                elif kind == 'dir':
+                    dirs[path] = data
+                else:
+                    seen.add(path)
+                    if path in known_files:
+                        if known_files[path] != data:
+                            changed += 1
+                            yield from emit('modified', self._make_record(path, data))
+                        continue
+                    changed += 1
+                    record = self._make_record(path, data)
+                    if (data['inode'], data['size'], data['mtime_ns']) in known_by_stat:
+                        # Rozstrzygamy dopiero po całym przejściu (czy stary plik zniknął)
+                        maybe_moved.append(record)
+                    else:
+                        yield from emit('added', record)
+
+            # Przeniesienie/zmiana nazwy w obrębie dysku: ten sam inode, rozmiar i mtime
+            removed = {p for p in known_files if p not in seen}
+            for record in maybe_moved:
+                st = record['fs_stat']
+                old_path = known_by_stat[(st['inode'], st['size'], st['mtime_ns'])]
+                if old_path in removed:
+                    removed.discard(old_path)
+                    yield 'moved', (old_path, record)
+                else:
+                    yield from emit('added', record)
+
+            while hashing:
+                kind, fut = hashing.popleft()
+                yield kind, fut.result()
+        finally:
+            if hash_pool is not None:
+                hash_pool.shutdown(wait=True, cancel_futures=True)
+
+        for path in known_files:
+            if path in removed:
+                yield 'removed', path
+
+        yield 'done', {'unchanged': len(seen) - changed, 'dirs': dirs}
 
+    @metrics.timed(metrics.SCAN_PARSE_SECONDS)
     def _analyze_filename(self, filename):
-        name = os.path.splitext(filename)[0]
-        name = name.replace('.', ' ').replace('_', ' ').replace('-', ' ')
-        
-        is_tv = False
-        episode_code = ""
-
-        # Szukamy S01E01, 1x01 itp.
-        serial_match = re.search(r'\b(s\d+e\d+|s\d+|\d+x\d+)\b', name, re.IGNORECASE)
-        
-        if serial_match:
-            is_tv = True
-            episode_code = serial_match.group(0).upper() # Wyciągamy np. "S01E01"
-            name = name[:serial_match.start()] # Ucinamy tytuł przed numerem
-
-        year_match = re.findall(r'\b(19\d{2}|20\d{2})\b', name)
-        year = year_match[-1] if year_match else None
-        
-        if year:
-            year_pos = name.find(year)
-            if year_pos != -1:
-                name = name[:year_pos]
-
-        junk = [
-            '1080p', '720p', '4k', 'bluray', 'web-dl', 'webrip', 'x264', 'hevc', 
-            'aac', 'dts', 'hdr', 'amzn', 'netflix', 'galaxy', 'rarbg', 'leaked', 
-            'dubbed', 'pl', 'season', 'episode'
-        ]
-        
-        for j in junk:
-            name = re.sub(f'(?i)\\b{j}\\b', '', name)
-            
-        name = re.sub(r'[\[\]\(\)\{\}]', '', name)
-        name = re.sub(r'\s+', ' ', name).strip()
-        
-        return name, year, is_tv, episode_code
\ No newline at end of file
+        return self.parser.analyze(filename)
@@ -0,0 +1,85 @@
+import os
+import re
+from functools import lru_cache
+
+
+class FilenameParser:
+    """
+    Rozpoznawanie tytułu, roku i kodu odcinka z nazwy pliku.
+    Wszystkie wzorce są kompilowane raz (w konstruktorze), śmieciowe słowa to jedna
+    alternatywa zamiast osobnego re.sub na każde słowo, a wyniki dla powtarzających
+    się nazw (ten sam "stem") są pamiętane w LRU.
+    """
+    DEFAULT_JUNK = [
+        '1080p', '720p', '4k', 'bluray', 'web-dl', 'webrip', 'x264', 'hevc',
+        'aac', 'dts', 'hdr', 'amzn', 'netflix', 'galaxy', 'rarbg', 'leaked',
+        'dubbed', 'pl', 'season', 'episode'
+    ]
+    # S01E01, S01, 1x01
+    EPISODE_PATTERN = r'\b(s\d+e\d+|s\d+|\d+x\d+)\b'
+    YEAR_PATTERN = r'\b(19\d{2}|20\d{2})\b'
+
+    _SEPARATORS = str.maketrans({'.': ' ', '_': ' ', '-': ' '})
+
+    def __init__(self, junk_words=None, extra_junk=None, episode_pattern=None, year_pattern=None, memo_size=65536):
+        """
+        junk_words: pełna lista śmieciowych słów (domyślnie DEFAULT_JUNK).
+        extra_junk: słowa dopisywane do listy; dodatkowo zmienna MOVIE_JUNK_WORDS ("słowo1,słowo2").
+        memo_size: ile wyników trzymać w pamięci podręcznej (0 = bez pamięci).
+        """
+        words = list(junk_words if junk_words is not None else self.DEFAULT_JUNK)
+        words += list(extra_junk or [])
+        words += [w.strip() for w in os.getenv("MOVIE_JUNK_WORDS", "").split(",") if w.strip()]
+        self.junk_words = list(dict.fromkeys(w.lower() for w in words))
+
+        self.episode_re = re.compile(episode_pattern or self.EPISODE_PATTERN, re.IGNORECASE)
+        self.year_re = re.compile(year_pattern or self.YEAR_PATTERN)
+        # Jedno przejście: śmieciowe słowa (dłuższe najpierw) albo nawiasy
+        alternation = "|".join(re.escape(w) for w in sorted(self.junk_words, key=len, reverse=True))
+        if alternation:
+            self.cleanup_re = re.compile(r'\b(?:' + alternation + r')\b|[\[\]\(\)\{\}]', re.IGNORECASE)
+        else:
+            self.cleanup_re = re.compile(r'[\[\]\(\)\{\}]')
+
+        if memo_size:
+            self._analyze_stem = lru_cache(maxsize=memo_size)(self._analyze_stem)
+
+    def analyze(self, filename):
+        """Zwraca (tytuł, rok albo None, czy_serial, kod_odcinka)"""
+        return self._analyze_stem(os.path.splitext(filename)[0])
+
+    def analyze_many(self, filenames):
+        """Wersja wsadowa - lista wyników w kolejności nazw"""
+        analyze_stem = self._analyze_stem
+        splitext = os.path.splitext
+        return [analyze_stem(splitext(name)[0]) for name in filenames]
+
+    def cache_info(self):
+        info = getattr(self._analyze_stem, 'cache_info', None)
+        return info() if info else None
+
+    def cache_clear(self):
+        if hasattr(self._analyze_stem, 'cache_clear'):
+            self._analyze_stem.cache_clear()
+
+    def _analyze_stem(self, name):
+        name = name.translate(self._SEPARATORS)
+
+        is_tv = False
+        episode_code = ""
+
+        serial_match = self.episode_re.search(name)
+        if serial_match:
+            is_tv = True
+            episode_code = serial_match.group(0).upper()
+            name = name[:serial_match.start()]  # Ucinamy tytuł przed numerem
+
+        years = self.year_re.findall(name)
+        year = years[-1] if years else None
+        if year:
+            year_pos = name.find(year)
+            if year_pos != -1:
+                name = name[:year_pos]
+
+        name = " ".join(self.cleanup_re.sub('', name).split())
+        return name, year, is_tv, episode_code
@@ -0,0 +1,127 @@
+import os
+import time
+import hashlib
+import sqlite3
+import threading
+from pathlib import Path
+
+
+class ImageStore:
+    """
+    Trwały cache obrazków (plakaty, tła) na dysku, adresowany treścią:
+    - plik obrazka leży pod nazwą = sha256 zawartości (ten sam obrazek pod różnymi URL-ami to jeden plik),
+    - indeks URL -> skrót w SQLite,
+    - limit rozmiaru w bajtach z usuwaniem najdawniej używanych (LRU).
+    Przechowuje skompresowane oryginały (JPEG/PNG) - dekodowaniem zajmuje się UI.
+    """
+    def __init__(self, path=None, max_bytes=512 * 1024 * 1024):
+        if path is None:
+            path = os.getenv("IMAGE_CACHE_PATH") or Path.home() / ".cache" / "movie-manager" / "images"
+        self.path = Path(path)
+        self.blobs = self.path / "blobs"
+        self.blobs.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(str(self.path / "index.sqlite"), check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS images (
+                url TEXT PRIMARY KEY,
+                digest TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                last_access REAL NOT NULL
+            )
+        """)
+        self.conn.execute("CREATE INDEX IF NOT EXISTS idx_images_access ON images(last_access)")
+        self.conn.execute("CREATE INDEX IF NOT EXISTS idx_images_digest ON images(digest)")
+        self.conn.commit()
+
+    def _blob_path(self, digest):
+        return self.blobs / digest[:2] / digest
+
+    def get(self, url):
+        """Zawartość obrazka spod URL-a albo None (brak w cache albo plik zniknął)"""
+        with self.lock:
+            row = self.conn.execute("SELECT digest FROM images WHERE url = ?", (url,)).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            try:
+                data = self._blob_path(row[0]).read_bytes()
+            except OSError:
+                # Ktoś posprzątał katalog - zapominamy wpis
+                self.conn.execute("DELETE FROM images WHERE url = ?", (url,))
+                self.conn.commit()
+                self.misses += 1
+                return None
+            self.conn.execute("UPDATE images SET last_access = ? WHERE url = ?", (time.time(), url))
+            self.conn.commit()
+            self.hits += 1
+            return data
+
+    def contains(self, url):
+        with self.lock:
+            return self.conn.execute("SELECT 1 FROM images WHERE url = ?", (url,)).fetchone() is not None
+
+    def put(self, url, data):
+        """Zapisuje obrazek; zwraca skrót zawartości"""
+        digest = hashlib.sha256(data).hexdigest()
+        blob = self._blob_path(digest)
+        with self.lock:
+            if not blob.exists():
+                blob.parent.mkdir(exist_ok=True)
+                # Zapis przez plik tymczasowy - przerwany zapis nie zostawi uciętego obrazka
+                tmp = blob.with_suffix(f".{os.getpid()}.tmp")
+                tmp.write_bytes(data)
+                os.replace(tmp, blob)
+            self.conn.execute(
+                "INSERT OR REPLACE INTO images (url, digest, size, last_access) VALUES (?, ?, ?, ?)",
+                (url, digest, len(data), time.time())
+            )
+            self.conn.commit()
+            self._evict()
+        return digest
+
+    def total_bytes(self):
+        """Rozmiar zapisanych plików (każdy plik liczony raz)"""
+        with self.lock:
+            row = self.conn.execute(
+                "SELECT COALESCE(SUM(size), 0) FROM (SELECT size FROM images GROUP BY digest)"
+            ).fetchone()
+        return row[0]
+
+    def _evict(self):
+        """Usuwa najdawniej używane wpisy, aż całość zmieści się w limicie (wołać pod lockiem)"""
+        total = self.conn.execute(
+            "SELECT COALESCE(SUM(size), 0) FROM (SELECT size FROM images GROUP BY digest)"
+        ).fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        rows = self.conn.execute("SELECT url, digest, size FROM images ORDER BY last_access ASC").fetchall()
+        for url, digest, size in rows:
+            if total <= self.max_bytes * 0.9:
+                break
+            self.conn.execute("DELETE FROM images WHERE url = ?", (url,))
+            # Plik usuwamy dopiero, gdy nie wskazuje na niego żaden inny URL
+            if self.conn.execute("SELECT 1 FROM images WHERE digest = ?", (digest,)).fetchone() is None:
+                self._blob_path(digest).unlink(missing_ok=True)
+                total -= size
+        self.conn.commit()
+
+    def __len__(self):
+        with self.lock:
+            return self.conn.execute("SELECT COUNT(*) FROM images").fetchone()[0]
+
+    def clear(self):
+        with self.lock:
+            for (digest,) in self.conn.execute("SELECT DISTINCT digest FROM images").fetchall():
+                self._blob_path(digest).unlink(missing_ok=True)
+            self.conn.execute("DELETE FROM images")
+            self.conn.commit()
+
+    def close(self):
+        with self.lock:
+            self.conn.close()
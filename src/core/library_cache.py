@@ -0,0 +1,109 @@
+import threading
+
+
+class LibraryCache:
+    """
+    Kopia dokumentów biblioteki w pamięci procesu (po _id i po ścieżce) + powiadomienia o zmianach.
+    Spójność utrzymuje DataBase: każdy jego zapis aktualizuje cache ("write-through").
+
+    Subskrybenci dostają (rodzaj, lista dokumentów), gdzie rodzaj to
+    'insert', 'update', 'delete' albo 'reset'. Powiadomienia przychodzą z wątku, który
+    wykonał zapis (np. wątku skanowania) - UI musi je sam przerzucić do wątku GUI.
+    Zwracane dokumenty są współdzielone - tylko do odczytu.
+
+    shape: funkcja przycinająca dokument przed zapisaniem (np. tylko pola listy),
+    żeby cała biblioteka w pamięci nie trzymała opisów, gatunków itd.
+    """
+    def __init__(self, shape=None):
+        self.shape = shape or (lambda doc: doc)
+        self.loaded = False
+        self._by_id = {}
+        self._id_by_path = {}
+        self._subscribers = []
+        self._lock = threading.RLock()
+
+    # --- Odczyt ---
+
+    def load(self, docs):
+        docs = [self.shape(d) for d in docs]
+        with self._lock:
+            self._by_id = {d['_id']: d for d in docs}
+            self._id_by_path = {d['file_path']: d['_id'] for d in docs}
+            self.loaded = True
+
+    def get(self, movie_id):
+        return self._by_id.get(movie_id)
+
+    def get_by_path(self, path):
+        with self._lock:
+            movie_id = self._id_by_path.get(path)
+            return self._by_id.get(movie_id) if movie_id is not None else None
+
+    def all(self, key=None, reverse=False):
+        """Wszystkie dokumenty; key: funkcja sortująca (domyślnie tytuł ze skanera)"""
+        with self._lock:
+            docs = list(self._by_id.values())
+        docs.sort(key=key or (lambda d: d.get('title_scanned') or ""), reverse=reverse)
+        return docs
+
+    def __len__(self):
+        return len(self._by_id)
+
+    # --- Zapis (wołane przez DataBase po udanej operacji w bazie) ---
+
+    def put(self, doc):
+        doc = self.shape(doc)
+        with self._lock:
+            old = self._by_id.get(doc['_id'])
+            if old is not None and old.get('file_path') != doc.get('file_path'):
+                self._id_by_path.pop(old.get('file_path'), None)
+            self._by_id[doc['_id']] = doc
+            self._id_by_path[doc['file_path']] = doc['_id']
+        return doc
+
+    def patch(self, movie_id, fields):
+        """Nadpisuje pola dokumentu; zwraca zaktualizowany dokument (albo None, gdy go nie ma)"""
+        with self._lock:
+            doc = self._by_id.get(movie_id)
+            if doc is None:
+                return None
+            doc = dict(doc, **fields)
+            return self.put(doc)
+
+    def patch_by_path(self, path, fields):
+        with self._lock:
+            movie_id = self._id_by_path.get(path)
+            return self.patch(movie_id, fields) if movie_id is not None else None
+
+    def remove(self, movie_id):
+        with self._lock:
+            doc = self._by_id.pop(movie_id, None)
+            if doc is not None:
+                self._id_by_path.pop(doc.get('file_path'), None)
+            return doc
+
+    def remove_path(self, path):
+        with self._lock:
+            movie_id = self._id_by_path.get(path)
+            return self.remove(movie_id) if movie_id is not None else None
+
+    def clear(self):
+        with self._lock:
+            self._by_id.clear()
+            self._id_by_path.clear()
+
+    # --- Powiadomienia ---
+
+    def subscribe(self, callback):
+        """callback(rodzaj, dokumenty). Zwraca funkcję do wypisania się."""
+        self._subscribers.append(callback)
+        return lambda: self._subscribers.remove(callback) if callback in self._subscribers else None
+
+    def notify(self, kind, docs):
+        if not docs and kind != 'reset':
+            return
+        for callback in list(self._subscribers):
+            try:
+                callback(kind, docs)
+            except Exception as e:
+                print(f"Błąd subskrybenta zmian ({kind}): {e}")
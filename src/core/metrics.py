@@ -0,0 +1,356 @@
+import os
+import time
+import bisect
+import threading
+from functools import wraps
+
+
+class Registry:
+    """
+    Rejestr metryk procesu (liczniki, wartości chwilowe, histogramy opóźnień).
+    Wyłączony rejestr (domyślnie, włącza METRICS=1 albo enable()) nic nie liczy -
+    każde inc/observe/time kończy się na sprawdzeniu jednej flagi.
+    Eksport: format tekstowy Prometheusa (render, write_file, serve) i snapshot() dla UI.
+    """
+    def __init__(self, enabled=False):
+        self.enabled = enabled
+        self._metrics = {}
+        self._lock = threading.Lock()
+        self._server = None
+
+    def enable(self, enabled=True):
+        self.enabled = enabled
+
+    def register(self, metric):
+        with self._lock:
+            if metric.name in self._metrics:
+                raise ValueError(f"Metryka {metric.name} już istnieje")
+            self._metrics[metric.name] = metric
+        return metric
+
+    def get(self, name):
+        return self._metrics.get(name)
+
+    def metrics(self):
+        with self._lock:
+            return list(self._metrics.values())
+
+    def reset(self):
+        for metric in self.metrics():
+            metric.reset()
+
+    # --- Eksport ---
+
+    def render(self):
+        """Wszystkie metryki w formacie tekstowym Prometheusa (text/plain; version=0.0.4)"""
+        lines = []
+        for metric in self.metrics():
+            lines.append(f"# HELP {metric.name} {metric.help}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+    def write_file(self, path):
+        """Zapis do pliku (np. dla textfile collectora node_exportera) - przez plik tymczasowy"""
+        tmp = f"{path}.{os.getpid()}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            f.write(self.render())
+        os.replace(tmp, path)
+
+    def serve(self, port=9464, host="127.0.0.1"):
+        """Endpoint /metrics w wątku tła; zwraca faktyczny port (port=0 - dowolny wolny)"""
+        if self._server is not None:
+            return self._server.server_address[1]
+        # Import dopiero tutaj - metryki są importowane przy starcie okna, serwer rzadko potrzebny
+        from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+        registry = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split("?")[0] not in ("/", "/metrics"):
+                    self.send_error(404)
+                    return
+                data = registry.render().encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def log_message(self, *args):
+                pass
+
+        self._server = ThreadingHTTPServer((host, port), Handler)
+        self._server.daemon_threads = True
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+        return self._server.server_address[1]
+
+    def stop_server(self):
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+    def snapshot(self):
+        """[(nazwa, rodzaj, etykiety, wartość)] - wartość histogramu to słownik count/sum/p50/p99"""
+        rows = []
+        for metric in self.metrics():
+            for labels, value in metric.values():
+                rows.append((metric.name, metric.kind, labels, value))
+        return rows
+
+
+REGISTRY = Registry(enabled=os.getenv("METRICS", "0") not in ("", "0"))
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+class _NullTimer:
+    """Kontekst time() przy wyłączonych metrykach - bez czytania zegara"""
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NULL_TIMER = _NullTimer()
+
+
+class _Timer:
+    def __init__(self, histogram, labels):
+        self.histogram = histogram
+        self.labels = labels
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.histogram._observe(time.perf_counter() - self.start, self.labels)
+        return False
+
+
+class _Metric:
+    kind = None
+
+    def __init__(self, name, help, labelnames=(), registry=None):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self.registry = registry or REGISTRY
+        self._values = {}
+        self._lock = threading.Lock()
+        self.registry.register(self)
+
+    def _key(self, labels):
+        if len(labels) != len(self.labelnames):
+            raise ValueError(f"{self.name}: oczekiwane etykiety {self.labelnames}, są {tuple(labels)}")
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def _format_labels(self, key, extra=()):
+        pairs = list(zip(self.labelnames, key)) + list(extra)
+        if not pairs:
+            return ""
+        return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in pairs) + "}"
+
+    def reset(self):
+        with self._lock:
+            self._values.clear()
+
+    def values(self):
+        with self._lock:
+            return [(dict(zip(self.labelnames, key)), value) for key, value in sorted(self._values.items())]
+
+    def value(self, **labels):
+        return self._values.get(self._key(labels))
+
+    def render(self):
+        return [f"{self.name}{self._format_labels(key)} {value:g}" for key, value in sorted(self._values.items())]
+
+
+class Counter(_Metric):
+    """Licznik rosnący (żądania, pliki, błędy)"""
+    kind = "counter"
+
+    def inc(self, amount=1, **labels):
+        if not self.registry.enabled:
+            return
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+
+class Gauge(_Metric):
+    """
+    Wartość chwilowa (rozmiar biblioteki, długość kolejki).
+    set_function(f) - wartość liczona dopiero przy eksporcie (zero kosztu w gorącej ścieżce).
+    """
+    kind = "gauge"
+
+    def __init__(self, name, help, labelnames=(), registry=None):
+        super().__init__(name, help, labelnames, registry)
+        self._functions = {}
+
+    def set(self, value, **labels):
+        if not self.registry.enabled:
+            return
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+    def inc(self, amount=1, **labels):
+        if not self.registry.enabled:
+            return
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def dec(self, amount=1, **labels):
+        self.inc(-amount, **labels)
+
+    def set_function(self, func, **labels):
+        self._functions[self._key(labels)] = func
+
+    def _collect(self):
+        for key, func in list(self._functions.items()):
+            try:
+                value = func()
+            except Exception:
+                continue
+            with self._lock:
+                self._values[key] = value
+
+    def values(self):
+        if self.registry.enabled:
+            self._collect()
+        return super().values()
+
+    def render(self):
+        if self.registry.enabled:
+            self._collect()
+        return super().render()
+
+
+class Histogram(_Metric):
+    """Rozkład opóźnień w sekundach (kubełki jak w klientach Prometheusa)"""
+    kind = "histogram"
+    DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+
+    def __init__(self, name, help, labelnames=(), registry=None, buckets=None):
+        super().__init__(name, help, labelnames, registry)
+        self.buckets = tuple(sorted(buckets or self.DEFAULT_BUCKETS))
+
+    def observe(self, value, **labels):
+        if not self.registry.enabled:
+            return
+        self._observe(value, labels)
+
+    def _observe(self, value, labels):
+        key = self._key(labels)
+        pos = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                # [liczniki kubełków (+Inf na końcu), suma, liczba]
+                state = self._values[key] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            state[0][pos] += 1
+            state[1] += value
+            state[2] += 1
+
+    def time(self, **labels):
+        """with histogram.time(op="..."): ... - mierzy czas bloku"""
+        if not self.registry.enabled:
+            return _NULL_TIMER
+        return _Timer(self, labels)
+
+    def quantile(self, q, counts, total):
+        """Przybliżony kwantyl z kubełków (interpolacja liniowa, jak histogram_quantile)"""
+        if not total:
+            return None
+        rank, seen, lower = q * total, 0, 0.0
+        for bound, count in zip(self.buckets, counts):
+            if count and seen + count >= rank:
+                return lower + (bound - lower) * (rank - seen) / count
+            seen += count
+            lower = bound
+        return self.buckets[-1]
+
+    def values(self):
+        with self._lock:
+            items = [(key, ([*state[0]], state[1], state[2])) for key, state in sorted(self._values.items())]
+        return [
+            (dict(zip(self.labelnames, key)), {
+                "count": total, "sum": total_sum,
+                "p50": self.quantile(0.5, counts, total), "p99": self.quantile(0.99, counts, total),
+            })
+            for key, (counts, total_sum, total) in items
+        ]
+
+    def render(self):
+        lines = []
+        with self._lock:
+            items = sorted((key, ([*state[0]], state[1], state[2])) for key, state in self._values.items())
+        for key, (counts, total_sum, total) in items:
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += count
+                le = "+Inf" if bound == float("inf") else f"{bound:g}"
+                lines.append(f"{self.name}_bucket{self._format_labels(key, [('le', le)])} {cumulative}")
+            lines.append(f"{self.name}_sum{self._format_labels(key)} {total_sum:g}")
+            lines.append(f"{self.name}_count{self._format_labels(key)} {total}")
+        return lines
+
+
+def timed(histogram, **labels):
+    """Dekorator: czas każdego wywołania funkcji trafia do histogramu"""
+    def decorator(func):
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            if not histogram.registry.enabled:
+                return func(*args, **kwargs)
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                histogram._observe(time.perf_counter() - start, labels)
+        return wrapper
+    return decorator
+
+
+# --- Metryki aplikacji (jedno miejsce z nazwami, żeby eksport był stały między wersjami) ---
+
+SCAN_DIR_SECONDS = Histogram(
+    "scanner_dir_seconds", "Czas stat + listowania jednego katalogu", ["result"])
+SCAN_PARSE_SECONDS = Histogram(
+    "scanner_parse_seconds", "Czas analizy nazwy pliku (_analyze_filename)",
+    buckets=(0.00001, 0.000025, 0.00005, 0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.01))
+SCAN_FINGERPRINT_SECONDS = Histogram(
+    "scanner_fingerprint_seconds", "Czas liczenia odcisku treści pliku")
+SCAN_FILES = Counter(
+    "scanner_files_total", "Pliki ze skanu przyrostowego według rodzaju zmiany", ["kind"])
+
+TMDB_REQUEST_SECONDS = Histogram(
+    "tmdb_request_seconds", "Czas pojedynczego żądania HTTP do TMDB (z oczekiwaniem na limiter)", ["kind"])
+TMDB_RESPONSES = Counter(
+    "tmdb_responses_total", "Odpowiedzi TMDB według statusu HTTP (error = błąd sieci)", ["kind", "status"])
+TMDB_CACHE = Counter(
+    "tmdb_cache_total", "Odczyty cache odpowiedzi TMDB", ["kind", "result"])
+TMDB_RETRIES = Counter(
+    "tmdb_retries_total", "Ponowienia żądań TMDB", ["reason"])
+
+DB_OPERATION_SECONDS = Histogram(
+    "db_operation_seconds", "Czas operacji DataBase (zapytania i zapisy MongoDB)", ["op"])
+DB_DOCUMENTS = Counter(
+    "db_documents_total", "Dokumenty zapisane albo usunięte przez DataBase", ["op"])
+LIBRARY_SIZE = Gauge(
+    "library_documents", "Liczba pozycji w bibliotece (cache w pamięci)")
+
+SCAN_RUNS = Counter(
+    "scan_runs_total", "Zakończone przebiegi ScanPipeline", ["result"])
+SCAN_IN_PROGRESS = Gauge(
+    "scan_in_progress", "Liczba trwających skanów")
+SCAN_ENRICH_QUEUE = Gauge(
+    "scan_enrich_queue", "Rekordy czekające na zapytanie do TMDB")
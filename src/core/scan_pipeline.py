@@ -0,0 +1,216 @@
+import os
+import time
+import queue
+import threading
+from core import metrics, tracing
+
+
+class ScanPipeline:
+    """
+    Cały proces skanowania folderu bez zależności od Qt:
+    dysk (FileScanner) -> baza (DataBase) -> dane z TMDB (TMDBEnricher).
+    Etapy działają strumieniowo: zapis do bazy i zapytania do TMDB startują,
+    zanim skończy się przechodzenie drzewa katalogów.
+    """
+    def __init__(self, db, scanner, enricher, batch_size=500, flush_interval=1.0, soft_delete=True):
+        self.db = db
+        self.scanner = scanner
+        self.enricher = enricher
+        self.batch_size = batch_size
+        # Paczka trafia do bazy także po tylu sekundach (żeby UI dostawał wiersze na bieżąco)
+        self.flush_interval = flush_interval
+        # Brakujące pliki tylko oznaczamy (DataBase.prune_missing) - odmontowany dysk nie kasuje biblioteki
+        self.soft_delete = soft_delete
+
+    @tracing.traced("ScanPipeline.run", cat="pipeline")
+    def run(self, folder, incremental=True, callback=None, cancel=None, changed_dirs=None):
+        """
+        incremental=True: pomija katalogi i pliki bez zmian od ostatniego skanu.
+        incremental=False: listuje wszystkie katalogi (pliki bez zmian nadal nie są parsowane).
+        callback(rodzaj, dane): powiadomienia w trakcie skanu (wołane z wątków roboczych):
+            'progress' - słownik liczników (found, inserted, enriched, failed),
+            'stored'   - lista zapisanych rekordów (dokumenty jak w bazie, bez danych TMDB),
+            'enriched' - (lista movie_id, details),
+            'moved'    - lista par (stara_ścieżka, nowa_ścieżka),
+            'removed'  - lista usuniętych (albo oznaczonych jako brakujące) ścieżek.
+        cancel: threading.Event - po ustawieniu skan kończy się przy najbliższej okazji
+        (bez usuwania "brakujących" plików, bo przejście drzewa było niepełne).
+        changed_dirs: katalogi do wylistowania mimo niezmienionego mtime (np. zgłoszone
+        przez obserwowanie systemu plików, gdy zmienił się sam plik, a nie katalog).
+        Zwraca słownik z podsumowaniem skanu.
+        """
+        known_files, known_dirs = self.db.get_scan_state(folder)
+        if not incremental:
+            known_dirs = {}
+        for path in changed_dirs or ():
+            known_dirs.pop(os.path.normpath(path), None)
+
+        summary = {'added': 0, 'modified': 0, 'moved': 0, 'removed': 0,
+                   'unchanged': 0, 'enriched': 0, 'not_found': 0, 'cancelled': False}
+        progress = {'found': 0, 'inserted': 0, 'enriched': 0, 'failed': 0}
+        progress_lock = threading.Lock()
+
+        def notify(kind, data):
+            if callback:
+                callback(kind, data)
+
+        def bump(**counts):
+            with progress_lock:
+                for name, value in counts.items():
+                    progress[name] += value
+                snapshot = dict(progress)
+            notify('progress', snapshot)
+
+        # Wzbogacanie w osobnym wątku, karmione przez kolejkę (None = koniec)
+        jobs = queue.Queue()
+        enrich_result = {}
+
+        def on_enriched(movie_ids, details):
+            if details:
+                bump(enriched=len(movie_ids))
+                notify('enriched', (movie_ids, details))
+            else:
+                bump(failed=len(movie_ids))
+
+        def enrich_worker():
+            found, missing = self.enricher.enrich_into(
+                self.db, jobs, on_result=on_enriched, cancel=cancel
+            )
+            enrich_result.update(found=found, missing=missing)
+
+        enrich_thread = threading.Thread(target=enrich_worker, daemon=True)
+        enrich_thread.start()
+
+        moved_by_content = []
+
+        @tracing.traced("store_batch", cat="pipeline")
+        def store(records):
+            records, moves = self._match_moved(records, known_files)
+            if moves:
+                # Ta sama treść pod nową ścieżką - rekord przenosimy, bez nowego zapytania do TMDB
+                self.db.move_movies(moves)
+                for old_path, rec in moves:
+                    print(f"Przeniesiono (ta sama treść): {old_path} -> {rec['filepath']}")
+                notify('moved', [(old_path, rec['filepath']) for old_path, rec in moves])
+                moved_by_content.extend(moves)
+            if records:
+                stored = self._store_batch(records, jobs)
+                tracing.TRACER.counter("enrich_queue", records=jobs.qsize())
+                bump(inserted=len(stored))
+                notify('stored', stored)
+
+        batch, moved, removed, dirs = [], [], [], {}
+        scanned = set()
+        last_flush = time.monotonic()
+        metrics.SCAN_IN_PROGRESS.inc()
+        metrics.SCAN_ENRICH_QUEUE.set_function(jobs.qsize)
+        try:
+            for kind, data in self.scanner.iter_incremental(folder, known_files, known_dirs):
+                if cancel is not None and cancel.is_set():
+                    summary['cancelled'] = True
+                    break
+                metrics.SCAN_FILES.inc(data['unchanged'] if kind == 'done' else 1,
+                                       kind='unchanged' if kind == 'done' else kind)
+
+                if kind in ('added', 'modified'):
+                    summary[kind] += 1
+                    bump(found=1)
+                    batch.append(data)
+                    scanned.add(data['filepath'])
+                    if len(batch) >= self.batch_size or time.monotonic() - last_flush > self.flush_interval:
+                        store(batch)
+                        batch = []
+                        last_flush = time.monotonic()
+                elif kind == 'moved':
+                    moved.append(data)
+                elif kind == 'removed':
+                    removed.append(data)
+                elif kind == 'done':
+                    summary['unchanged'] = data['unchanged']
+                    dirs = data['dirs']
+
+            if batch:
+                store(batch)
+
+            if not summary['cancelled']:
+                # Przeniesienia (rekordy zachowują dane z TMDB), potem sprzątanie
+                if moved:
+                    self.db.move_movies(moved)
+                    for old_path, rec in moved:
+                        print(f"Przeniesiono: {old_path} -> {rec['filepath']}")
+                    notify('moved', [(old_path, rec['filepath']) for old_path, rec in moved])
+
+                # Na dysku są: znane pliki z nietkniętych katalogów + wszystko, co skan zobaczył
+                present = set(known_files).difference(removed, (old for old, _ in moved))
+                present.update(scanned, (rec['filepath'] for _, rec in moved))
+                pruned = self.db.prune_missing(folder, present, soft=self.soft_delete)
+                if pruned:
+                    for path in pruned:
+                        print(f"Usunieto nieistniejacy plik: {path}")
+                    notify('removed', pruned)
+                summary['removed'] = len(pruned)
+
+                self.db.save_dir_states(folder, dirs)
+        except Exception:
+            metrics.SCAN_RUNS.inc(result='error')
+            raise
+        finally:
+            jobs.put(None)
+            enrich_thread.join()
+            metrics.SCAN_IN_PROGRESS.dec()
+
+        summary['added'] -= len(moved_by_content)
+        summary['moved'] = len(moved) + len(moved_by_content)
+        summary['enriched'] = enrich_result.get('found', 0)
+        summary['not_found'] = enrich_result.get('missing', 0)
+        if cancel is not None and cancel.is_set():
+            summary['cancelled'] = True
+        metrics.SCAN_RUNS.inc(result='cancelled' if summary['cancelled'] else 'ok')
+        return summary
+
+    def _match_moved(self, records, known_files):
+        """
+        Nowe ścieżki z odciskiem treści znanego rekordu, którego pliku już nie ma na dysku,
+        to przeniesienia (np. na inny dysk albo do innej biblioteki) - rekord zachowuje
+        dopasowanie z TMDB i poprawki z fix_match. Zwraca (pozostałe rekordy, przeniesienia).
+        """
+        candidates = [r for r in records if r.get('fingerprint') and r['filepath'] not in known_files]
+        if not candidates:
+            return records, []
+        found = self.db.find_by_fingerprints(r['fingerprint'] for r in candidates)
+
+        moves, moved_paths, used = [], set(), set()
+        for rec in candidates:
+            for doc in found.get(rec['fingerprint'], ()):
+                old_path = doc['file_path']
+                # Kopia (oryginał nadal jest) to osobny plik, a nie przeniesienie
+                if doc['_id'] in used or old_path == rec['filepath'] or os.path.exists(old_path):
+                    continue
+                used.add(doc['_id'])
+                moves.append((old_path, rec))
+                moved_paths.add(rec['filepath'])
+                break
+        return [r for r in records if r['filepath'] not in moved_paths], moves
+
+    def _store_batch(self, records, jobs):
+        """
+        Bulk upsert paczki; do TMDB trafiają tylko rekordy bez dopasowania.
+        Zwraca zapisane rekordy w kształcie dokumentów z bazy.
+        """
+        path_to_id = self.db.upsert_scanned_files(records)
+        to_enrich = self.db.get_unenriched_ids(path_to_id.values())
+        stored = []
+        for rec in records:
+            mid = path_to_id.get(rec['filepath'])
+            if mid is None:
+                continue
+            if mid in to_enrich:
+                jobs.put((mid, rec))
+            stored.append({
+                '_id': mid,
+                'file_path': rec['filepath'],
+                'title_scanned': rec['title_guess'],
+                'episode_code': rec.get('episode_code', ""),
+                'enriched': mid not in to_enrich
+            })
+        return stored
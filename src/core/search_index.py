@@ -0,0 +1,305 @@
+import re
+import bisect
+import threading
+import unicodedata
+from functools import lru_cache
+from collections import defaultdict
+
+
+@lru_cache(maxsize=65536)
+def _strip_accents(text):
+    text = unicodedata.normalize('NFKD', text.translate(SearchIndex._FOLD))
+    return "".join(c for c in text if not unicodedata.combining(c))
+
+
+class SearchIndex:
+    """
+    Indeks wyszukiwania biblioteki w pamięci (bez zapytań do bazy przy każdym klawiszu).
+    - słowa z tytułu (TMDB, oryginalnego i ze skanera), gatunków i kodu odcinka,
+    - dopasowanie po prefiksie ("matr" -> "matrix") przez posortowaną listę słów,
+    - tolerancja literówek ("matirx") przez trigramy słów,
+    - filtry (rok, typ, gatunek) jako gotowe zbiory ID,
+    - aktualizacja przyrostowa: add/remove pojedynczych dokumentów albo apply(rodzaj, dokumenty)
+      podpięte pod powiadomienia DataBase.
+    Dokumenty w kształcie listy z DataBase (LIST_PROJECTION).
+    """
+    TOKEN_RE = re.compile(r'\w+')
+    # Litery, których NFKD nie rozkłada na literę + znak diakrytyczny
+    _FOLD = str.maketrans({'ł': 'l', 'ø': 'o', 'đ': 'd', 'ß': 'ss', 'æ': 'ae', 'œ': 'oe'})
+    # Ile wspólnych trigramów (jako część trigramów słowa z zapytania) wystarcza na "literówkę"
+    FUZZY_THRESHOLD = 0.5
+    # Filtry wpisywane w polu wyszukiwania: "rok:1999 typ:serial gatunek:dramat"
+    FACET_ALIASES = {
+        'rok': 'year', 'year': 'year',
+        'typ': 'type', 'type': 'type',
+        'gatunek': 'genre', 'genre': 'genre',
+    }
+    TYPE_ALIASES = {'film': 'movie', 'movie': 'movie', 'serial': 'tv', 'tv': 'tv'}
+    # Prefiksy do tej długości (pierwsze litery zapytania) mają zapamiętane wyniki,
+    # aktualizowane razem z indeksem
+    PREFIX_CACHE_LEN = 2
+    PREFIX_CACHE_SIZE = 128
+    # Powyżej tylu pasujących słów taniej sprawdzić słowa kandydatów niż sumować zbiory
+    FILTER_TOKENS = 64
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._doc_tokens = {}                 # id -> zbiór słów
+        self._doc_text = {}                   # id -> " słowo1 słowo2 ..." (szybkie sprawdzanie prefiksu)
+        self._doc_facets = {}                 # id -> (rok, typ, gatunki)
+        self._ids_by_token = {}               # słowo -> zbiór ID
+        self._sorted_tokens = []              # wszystkie słowa, posortowane (prefiksy)
+        self._tokens_by_trigram = defaultdict(set)
+        self._facets = {'year': defaultdict(set), 'type': defaultdict(set), 'genre': defaultdict(set)}
+        self._prefix_cache = {}
+
+    # --- Normalizacja ---
+
+    @classmethod
+    def normalize(cls, text):
+        """Małe litery bez znaków diakrytycznych ("Łódź" -> "lodz")"""
+        text = str(text).casefold()
+        # Większość tytułów to czyste ASCII - bez rozkładu Unicode znak po znaku
+        return text if text.isascii() else _strip_accents(text)
+
+    @classmethod
+    def tokenize(cls, text):
+        return cls.TOKEN_RE.findall(cls.normalize(text)) if text else []
+
+    @staticmethod
+    def trigrams(token):
+        padded = f"  {token} "
+        return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+    @classmethod
+    def _extract(cls, doc):
+        details = doc.get('movie_details') or {}
+        tokens = set()
+        for text in (details.get('title'), details.get('original_title'), doc.get('title_scanned')):
+            tokens.update(cls.tokenize(text))
+        genres = tuple(cls.normalize(g) for g in details.get('genres') or ())
+        for genre in genres:
+            tokens.update(cls.tokenize(genre))
+        episode = doc.get('episode_code')
+        if episode:
+            tokens.add(cls.normalize(episode))
+
+        year = details.get('release_year')
+        year = str(year) if year and str(year).isdigit() else None
+        if year:
+            tokens.add(year)
+        kind = details.get('type') or ('tv' if episode else None)
+        return tokens, (year, kind, genres)
+
+    # --- Aktualizacja ---
+
+    def load(self, docs):
+        with self._lock:
+            self.clear()
+            for doc in docs:
+                self._add(doc, keep_sorted=False)
+            # Przy ładowaniu całości jedno sortowanie zamiast insort dla każdego słowa
+            self._sorted_tokens = sorted(self._ids_by_token)
+
+    def clear(self):
+        with self._lock:
+            self._doc_tokens.clear()
+            self._doc_text.clear()
+            self._doc_facets.clear()
+            self._ids_by_token.clear()
+            self._sorted_tokens = []
+            self._tokens_by_trigram.clear()
+            self._prefix_cache.clear()
+            for values in self._facets.values():
+                values.clear()
+
+    def add(self, doc):
+        """Dodaje albo podmienia dokument"""
+        with self._lock:
+            self._remove(doc['_id'])
+            self._add(doc)
+
+    def remove(self, movie_id):
+        with self._lock:
+            self._remove(movie_id)
+
+    def apply(self, kind, docs):
+        """Subskrybent powiadomień DataBase ('insert', 'update', 'delete', 'reset')"""
+        with self._lock:
+            if kind == 'reset':
+                self.clear()
+            elif kind == 'delete':
+                for doc in docs:
+                    if '_id' in doc:
+                        self._remove(doc['_id'])
+            else:
+                for doc in docs:
+                    # Niepełne powiadomienie (bez tytułu) nie zmienia tego, co indeksujemy
+                    if 'title_scanned' in doc:
+                        self._remove(doc['_id'])
+                        self._add(doc)
+
+    def _add(self, doc, keep_sorted=True):
+        movie_id = doc['_id']
+        tokens, (year, kind, genres) = self._extract(doc)
+        self._doc_tokens[movie_id] = tokens
+        text = self._doc_text[movie_id] = " " + " ".join(tokens)
+        for prefix, ids in self._prefix_cache.items():
+            if " " + prefix in text:
+                ids.add(movie_id)
+        self._doc_facets[movie_id] = (year, kind, genres)
+        for token in tokens:
+            ids = self._ids_by_token.get(token)
+            if ids is None:
+                ids = self._ids_by_token[token] = set()
+                if keep_sorted:
+                    bisect.insort(self._sorted_tokens, token)
+                for gram in self.trigrams(token):
+                    self._tokens_by_trigram[gram].add(token)
+            ids.add(movie_id)
+        if year:
+            self._facets['year'][year].add(movie_id)
+        if kind:
+            self._facets['type'][kind].add(movie_id)
+        for genre in genres:
+            self._facets['genre'][genre].add(movie_id)
+
+    def _remove(self, movie_id):
+        tokens = self._doc_tokens.pop(movie_id, None)
+        if tokens is None:
+            return
+        del self._doc_text[movie_id]
+        for ids in self._prefix_cache.values():
+            ids.discard(movie_id)
+        for token in tokens:
+            ids = self._ids_by_token[token]
+            ids.discard(movie_id)
+            if not ids:
+                # Słowo nie występuje już w żadnym dokumencie
+                del self._ids_by_token[token]
+                pos = bisect.bisect_left(self._sorted_tokens, token)
+                del self._sorted_tokens[pos]
+                for gram in self.trigrams(token):
+                    grams = self._tokens_by_trigram[gram]
+                    grams.discard(token)
+                    if not grams:
+                        del self._tokens_by_trigram[gram]
+        year, kind, genres = self._doc_facets.pop(movie_id)
+        for name, value in (('year', year), ('type', kind)) + tuple(('genre', g) for g in genres):
+            if value:
+                bucket = self._facets[name][value]
+                bucket.discard(movie_id)
+                if not bucket:
+                    del self._facets[name][value]
+
+    def __len__(self):
+        return len(self._doc_tokens)
+
+    # --- Wyszukiwanie ---
+
+    def _prefix_tokens(self, prefix):
+        start = bisect.bisect_left(self._sorted_tokens, prefix)
+        end = bisect.bisect_left(self._sorted_tokens, prefix + '\U0010ffff')
+        return self._sorted_tokens[start:end]
+
+    def _prefix_ids(self, prefix, tokens=None):
+        """Suma zbiorów ID wszystkich słów zaczynających się od prefix (nie modyfikować)"""
+        cached = self._prefix_cache.get(prefix)
+        if cached is not None:
+            return cached
+        if tokens is None:
+            tokens = self._prefix_tokens(prefix)
+        if len(tokens) == 1:
+            return self._ids_by_token[tokens[0]]
+        result = set().union(*(self._ids_by_token[t] for t in tokens))
+        # Pierwsze litery zapytania pasują do dziesiątek tysięcy słów - te wyniki pamiętamy
+        if len(prefix) <= self.PREFIX_CACHE_LEN:
+            if len(self._prefix_cache) >= self.PREFIX_CACHE_SIZE:
+                del self._prefix_cache[next(iter(self._prefix_cache))]
+            self._prefix_cache[prefix] = result
+        return result
+
+    def _fuzzy_ids(self, word):
+        """Słowa podobne do word (wspólne trigramy) - dla literówek"""
+        grams = self.trigrams(word)
+        counts = defaultdict(int)
+        for gram in grams:
+            for token in self._tokens_by_trigram.get(gram, ()):
+                counts[token] += 1
+        needed = max(1, int(len(grams) * self.FUZZY_THRESHOLD))
+        result = set()
+        for token, count in counts.items():
+            if count >= needed and abs(len(token) - len(word)) <= 2:
+                result |= self._ids_by_token[token]
+        return result
+
+    @classmethod
+    def parse_query(cls, text):
+        """Rozdziela tekst na słowa i filtry: 'matrix rok:1999' -> (['matrix'], {'year': '1999'})"""
+        words, facets = [], {}
+        for part in str(text or "").split():
+            name, sep, value = part.partition(':')
+            facet = cls.FACET_ALIASES.get(name.casefold()) if sep else None
+            if facet and value:
+                value = cls.normalize(value)
+                if facet == 'type':
+                    value = cls.TYPE_ALIASES.get(value, value)
+                facets[facet] = value
+            else:
+                words.extend(cls.tokenize(part))
+        return words, facets
+
+    def search(self, text="", year=None, type=None, genre=None, fuzzy=True):
+        """
+        Zbiór ID pasujących dokumentów: każde słowo z zapytania musi pasować
+        (prefiks słowa z indeksu albo, gdy nic nie pasuje, słowo podobne).
+        Filtry mogą przyjść jako argumenty albo w tekście (rok:, typ:, gatunek:).
+        Puste zapytanie bez filtrów zwraca None (= bez filtrowania).
+        """
+        words, facets = self.parse_query(text)
+        if year is not None:
+            facets['year'] = str(year)
+        if type is not None:
+            facets['type'] = self.TYPE_ALIASES.get(type, type)
+        if genre is not None:
+            facets['genre'] = self.normalize(genre)
+        if not words and not facets:
+            return None
+
+        with self._lock:
+            result = None
+            for name, value in facets.items():
+                if name == 'genre':
+                    # Gatunek też po prefiksie ("dram" -> "dramat")
+                    ids = set()
+                    for g, bucket in self._facets['genre'].items():
+                        if g.startswith(value):
+                            ids |= bucket
+                else:
+                    ids = self._facets[name].get(value, set())
+                result = ids if result is None else result & ids
+
+            # Najdłuższe (najbardziej wybiórcze) słowa najpierw
+            for word in sorted(words, key=len, reverse=True):
+                if result is not None and not result:
+                    break
+                tokens = self._prefix_tokens(word)
+                if result is not None and len(tokens) > self.FILTER_TOKENS and word not in self._prefix_cache:
+                    # Krótki prefiks ("1", "s") - sprawdzamy słowa kandydatów zamiast sumować tysiące zbiorów
+                    doc_text, needle = self._doc_text, " " + word
+                    result = {i for i in result if needle in doc_text[i]}
+                    continue
+                ids = self._prefix_ids(word, tokens) if tokens else set()
+                if not ids and fuzzy and len(word) >= 3:
+                    ids = self._fuzzy_ids(word)
+                result = ids if result is None else result & ids
+
+            # Zbiory z indeksu są współdzielone - na zewnątrz zawsze kopia
+            return set(result)
+
+    def facet_counts(self, name, ids=None):
+        """Liczniki wartości filtra (np. lat) - dla wszystkich albo tylko wśród ids"""
+        with self._lock:
+            if ids is None:
+                return {value: len(bucket) for value, bucket in self._facets[name].items()}
+            return {value: len(bucket & ids) for value, bucket in self._facets[name].items() if bucket & ids}
@@ -0,0 +1,664 @@
+import os
+import json
+import time
+import sqlite3
+import threading
+from pathlib import Path
+from core.storage import BaseDataBase, _timed
+from core import metrics
+
+
+class SQLiteDataBase(BaseDataBase):
+    """
+    Biblioteka w lokalnym pliku SQLite - bez serwera i bez pymongo (instalacje jednoosobowe, testy).
+    To samo API i ten sam kształt dokumentów co DataBase (MongoDB); _id to liczba (rowid).
+    - tryb WAL: odczyty (lista w UI) nie czekają na zapis paczki skanu,
+    - indeksy na ścieżce (unikalny), tmdb_id, tytule, roku (z JSON-a) i odcisku treści,
+    - movie_details i fs_stat jako JSON w kolumnach tekstowych,
+    - zapisy paczkami: jedna transakcja na paczkę skanera zamiast zatwierdzania każdego wiersza.
+    Jedno połączenie współdzielone przez wątki (skan, wzbogacanie, UI) - pilnuje go lock.
+    """
+    COLUMNS = "id, file_path, title_scanned, episode_code, tmdb_id, movie_details, fs_stat, fingerprint, missing_since"
+    LIST_COLUMNS = "id, file_path, title_scanned, episode_code, tmdb_id, movie_details"
+    VISIBLE = "missing_since IS NULL"
+    # Pola sortowania (BaseDataBase.SORT_FIELDS) -> wyrażenia SQL (każde ma indeks)
+    SORT_COLUMNS = {
+        "title_scanned": "title_scanned",
+        "movie_details.release_year": "json_extract(movie_details, '$.release_year')",
+        "_id": "id",
+    }
+
+    def __init__(self, cache=True, details_cache_size=256, path=None):
+        super().__init__(cache, details_cache_size)
+        if path is None:
+            path = os.getenv("SQLITE_PATH") or Path.home() / ".local" / "share" / "movie-manager" / "library.sqlite"
+        self.path = str(path)
+        if self.path != ":memory:":
+            Path(self.path).parent.mkdir(parents=True, exist_ok=True)
+
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(self.path, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        # Przy WAL "NORMAL" nie traci spójności, a zatwierdzenie nie czeka na fsync
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.ensure_indexes()
+
+    def ping(self):
+        with self.lock:
+            self.conn.execute("SELECT 1").fetchone()
+
+    def close(self):
+        with self.lock:
+            self.conn.close()
+
+    # --- Zamiana wierszy na dokumenty ---
+
+    @staticmethod
+    def _to_doc(row):
+        movie_id, path, title, episode, tmdb_id, details, fs_stat, fingerprint, missing = row
+        doc = {"_id": movie_id, "file_path": path, "title_scanned": title,
+               "movie_details": json.loads(details) if details else {}, "tmdb_id": tmdb_id}
+        # Pola, których rekord nie ma, są pomijane (jak w dokumencie MongoDB)
+        if episode is not None:
+            doc["episode_code"] = episode
+        if fs_stat is not None:
+            doc["fs_stat"] = json.loads(fs_stat)
+        if fingerprint is not None:
+            doc["fingerprint"] = fingerprint
+        if missing is not None:
+            doc["missing_since"] = missing
+        return doc
+
+    def _to_list_doc(self, row):
+        return self._list_shape(self._to_doc(row + (None, None, None)))
+
+    @staticmethod
+    def _dump(value):
+        return json.dumps(value, ensure_ascii=False) if value is not None else None
+
+    @staticmethod
+    def _prefix_range(root):
+        """Ścieżki pod katalogiem root jako przedział [prefiks, prefiks z następnym znakiem) - korzysta z indeksu"""
+        prefix = os.path.join(os.path.normpath(root), '')
+        return prefix, prefix[:-1] + chr(ord(prefix[-1]) + 1)
+
+    @staticmethod
+    def _marks(values):
+        return ",".join("?" * len(values))
+
+    def _select(self, sql, params=()):
+        with self.lock:
+            return self.conn.execute(sql, params).fetchall()
+
+    # --- Zapytania dla BaseDataBase ---
+
+    def _to_oid(self, movie_id):
+        return int(movie_id) if isinstance(movie_id, str) else movie_id
+
+    def _find_movie(self, oid):
+        rows = self._select(f"SELECT {self.COLUMNS} FROM movies WHERE id = ?", (oid,))
+        return self._to_doc(rows[0]) if rows else None
+
+    def _find_movie_by_path(self, path):
+        rows = self._select(f"SELECT {self.COLUMNS} FROM movies WHERE file_path = ?", (path,))
+        return self._to_doc(rows[0]) if rows else None
+
+    def _load_list(self):
+        rows = self._select(f"SELECT {self.LIST_COLUMNS} FROM movies WHERE {self.VISIBLE}")
+        return [self._to_list_doc(row) for row in rows]
+
+    def _iter_list(self, batch_size):
+        # Stronicowanie po (tytuł, id) - każda paczka to osobne krótkie zapytanie pod lockiem
+        last = ("", -1)
+        while True:
+            rows = self._select(
+                f"SELECT {self.LIST_COLUMNS} FROM movies WHERE {self.VISIBLE} AND (title_scanned, id) > (?, ?) "
+                f"ORDER BY title_scanned, id LIMIT ?", (*last, batch_size)
+            )
+            for row in rows:
+                yield self._to_list_doc(row)
+            if len(rows) < batch_size:
+                return
+            last = (rows[-1][2], rows[-1][0])
+
+    def _query_list(self, field, descending):
+        order = f"{self.SORT_COLUMNS[field]} {'DESC' if descending else 'ASC'}"
+        rows = self._select(f"SELECT {self.LIST_COLUMNS} FROM movies WHERE {self.VISIBLE} ORDER BY {order}")
+        return [self._to_list_doc(row) for row in rows]
+
+    def _library_root_paths(self):
+        return [row[0] for row in self._select("SELECT path FROM library_roots")]
+
+    # --- Schemat ---
+
+    @_timed("ensure_indexes")
+    def ensure_indexes(self):
+        """Tabele i indeksy (idempotentne - wołane przy otwarciu pliku)"""
+        with self.lock, self.conn:
+            self.conn.execute("""
+                CREATE TABLE IF NOT EXISTS movies (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    file_path TEXT NOT NULL UNIQUE,
+                    title_scanned TEXT NOT NULL DEFAULT '',
+                    episode_code TEXT,
+                    tmdb_id INTEGER,
+                    movie_details TEXT NOT NULL DEFAULT '{}',
+                    fs_stat TEXT,
+                    fingerprint TEXT,
+                    missing_since REAL
+                )
+            """)
+            self.conn.execute("CREATE INDEX IF NOT EXISTS idx_movies_title ON movies(title_scanned)")
+            self.conn.execute("CREATE INDEX IF NOT EXISTS idx_movies_tmdb ON movies(tmdb_id)")
+            self.conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_movies_year ON movies(json_extract(movie_details, '$.release_year'))"
+            )
+            # Tylko rekordy z odciskiem / oznaczone jako brakujące - indeksy częściowe są małe
+            self.conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_movies_fingerprint ON movies(fingerprint) WHERE fingerprint IS NOT NULL"
+            )
+            self.conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_movies_missing ON movies(missing_since) WHERE missing_since IS NOT NULL"
+            )
+            self.conn.execute("""
+                CREATE TABLE IF NOT EXISTS scan_dirs (
+                    path TEXT PRIMARY KEY,
+                    mtime_ns INTEGER NOT NULL,
+                    subdirs TEXT NOT NULL
+                )
+            """)
+            self.conn.execute("CREATE TABLE IF NOT EXISTS library_roots (path TEXT PRIMARY KEY, added_at REAL)")
+
+    def ensure_text_index(self):
+        """Bez osobnego indeksu - text_search przegląda tytuły (lista i tak jest w pamięci UI)"""
+
+    @_timed("text_search")
+    def text_search(self, query, limit=100):
+        """Rekordy, których tytuł (ze skanera, z TMDB, oryginalny) albo gatunek zawiera każde słowo zapytania"""
+        words = query.split()
+        if not words:
+            return []
+        haystack = ("(title_scanned || ' ' || COALESCE(json_extract(movie_details, '$.title'), '') || ' ' || "
+                    "COALESCE(json_extract(movie_details, '$.original_title'), '') || ' ' || "
+                    "COALESCE(json_extract(movie_details, '$.genres'), ''))")
+        conditions = " AND ".join(f"{haystack} LIKE ? ESCAPE '\\'" for _ in words)
+        params = ["%" + w.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_") + "%" for w in words]
+        rows = self._select(
+            f"SELECT {self.LIST_COLUMNS} FROM movies WHERE {self.VISIBLE} AND {conditions} "
+            f"ORDER BY title_scanned LIMIT ?", (*params, limit)
+        )
+        return [self._to_list_doc(row) for row in rows]
+
+    def start_change_stream(self):
+        """Plik ma jednego użytkownika - zmiany przychodzą z własnych zapisów (nic do śledzenia)"""
+
+    # --- Zapis ---
+
+    @_timed("add_movie")
+    def add_movie(self, file_path, title_scanned):
+        """
+        Dodaje film i zwraca jego ID.
+        Jeśli film już istnieje, zwraca ID istniejącego.
+        """
+        with self.lock, self.conn:
+            row = self.conn.execute("SELECT id FROM movies WHERE file_path = ?", (file_path,)).fetchone()
+            if row:
+                return row[0]
+            movie_id = self.conn.execute(
+                "INSERT INTO movies (file_path, title_scanned) VALUES (?, ?)", (file_path, title_scanned or "")
+            ).lastrowid
+        if self.cache is not None:
+            movie_doc = {"_id": movie_id, "file_path": file_path, "title_scanned": title_scanned,
+                         "movie_details": {}, "tmdb_id": None}
+            light = self.cache.put(movie_doc) if self.cache.loaded else self._list_shape(movie_doc)
+            self.cache.notify('insert', [light])
+        return movie_id
+
+    @_timed("upsert_scanned_files")
+    def upsert_scanned_files(self, records, batch_size=1000):
+        """
+        Zapisuje paczkę wyników skanera (jedna transakcja na batch_size rekordów).
+        Nowe pliki są wstawiane z pustymi danymi TMDB, istniejące zostają nietknięte
+        (poza kodem odcinka, stanem pliku i odciskiem). Zwraca słownik {file_path: id}.
+        """
+        path_to_id = {}
+
+        for start in range(0, len(records), batch_size):
+            batch = records[start:start + batch_size]
+            inserted_docs, updates = [], []
+            with self.lock, self.conn:
+                paths = [f['filepath'] for f in batch]
+                existing = dict(self.conn.execute(
+                    f"SELECT file_path, id FROM movies WHERE file_path IN ({self._marks(paths)})", paths
+                ))
+                for f in batch:
+                    to_set = {}
+                    if f.get('episode_code'):
+                        to_set["episode_code"] = f['episode_code']
+                    if f.get('fs_stat'):
+                        to_set["fs_stat"] = f['fs_stat']
+                    if f.get('fingerprint'):
+                        to_set["fingerprint"] = f['fingerprint']
+
+                    movie_id = existing.get(f['filepath'])
+                    if movie_id is None:
+                        movie_id = self.conn.execute(
+                            "INSERT INTO movies (file_path, title_scanned, episode_code, fs_stat, fingerprint) "
+                            "VALUES (?, ?, ?, ?, ?)",
+                            (f['filepath'], f['title_guess'] or "", to_set.get("episode_code"),
+                             self._dump(to_set.get("fs_stat")), to_set.get("fingerprint"))
+                        ).lastrowid
+                        existing[f['filepath']] = movie_id
+                        inserted_docs.append(dict(to_set, _id=movie_id, file_path=f['filepath'],
+                                                  title_scanned=f['title_guess'], movie_details={}, tmdb_id=None))
+                    elif to_set:
+                        updates.append((movie_id, to_set))
+                    path_to_id[f['filepath']] = movie_id
+
+                self.conn.executemany(
+                    "UPDATE movies SET episode_code = COALESCE(?, episode_code), fs_stat = COALESCE(?, fs_stat), "
+                    "fingerprint = COALESCE(?, fingerprint) WHERE id = ?",
+                    [(s.get("episode_code"), self._dump(s.get("fs_stat")), s.get("fingerprint"), movie_id)
+                     for movie_id, s in updates]
+                )
+            metrics.DB_DOCUMENTS.inc(len(batch), op="upsert")
+
+            if self.cache is not None:
+                if self.cache.loaded:
+                    inserted_docs = [self.cache.put(doc) for doc in inserted_docs]
+                updated_docs = []
+                for movie_id, to_set in updates:
+                    updated_docs += self._cache_patch([movie_id], to_set)
+                self.cache.notify('insert', inserted_docs)
+                self.cache.notify('update', updated_docs)
+
+        return path_to_id
+
+    @_timed("get_scan_state")
+    def get_scan_state(self, root):
+        """
+        Stan poprzedniego skanu pod katalogiem root:
+        ({file_path: fs_stat}, {katalog: {'mtime_ns': ..., 'subdirs': [...]}})
+        """
+        low, high = self._prefix_range(root)
+        rows = self._select("SELECT file_path, fs_stat FROM movies WHERE file_path >= ? AND file_path < ?", (low, high))
+        files = {path: json.loads(fs_stat) if fs_stat else None for path, fs_stat in rows}
+
+        rows = self._select(
+            "SELECT path, mtime_ns, subdirs FROM scan_dirs WHERE path = ? OR (path >= ? AND path < ?)",
+            (os.path.normpath(root), low, high)
+        )
+        dirs = {path: {'mtime_ns': mtime_ns, 'subdirs': json.loads(subdirs)} for path, mtime_ns, subdirs in rows}
+        return files, dirs
+
+    @_timed("add_library_root")
+    def add_library_root(self, root):
+        with self.lock, self.conn:
+            self.conn.execute("INSERT OR REPLACE INTO library_roots (path, added_at) VALUES (?, ?)",
+                              (os.path.normpath(root), time.time()))
+
+    @_timed("remove_library_root")
+    def remove_library_root(self, root):
+        with self.lock, self.conn:
+            self.conn.execute("DELETE FROM library_roots WHERE path = ?", (os.path.normpath(root),))
+
+    @_timed("save_dir_states")
+    def save_dir_states(self, root, dirs, batch_size=1000):
+        """Zapisuje stan katalogów po skanie; usuwa wpisy katalogów, których już nie ma"""
+        low, high = self._prefix_range(root)
+        with self.lock, self.conn:
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO scan_dirs (path, mtime_ns, subdirs) VALUES (?, ?, ?)",
+                [(path, st['mtime_ns'], json.dumps(st['subdirs'], ensure_ascii=False)) for path, st in dirs.items()]
+            )
+            known = self.conn.execute(
+                "SELECT path FROM scan_dirs WHERE path = ? OR (path >= ? AND path < ?)",
+                (os.path.normpath(root), low, high)
+            ).fetchall()
+            self.conn.executemany("DELETE FROM scan_dirs WHERE path = ?", [row for row in known if row[0] not in dirs])
+
+    @_timed("move_movies")
+    def move_movies(self, moves, batch_size=1000):
+        """
+        Przenosi rekordy na nowe ścieżki (zmiana nazwy/folderu) bez utraty danych z TMDB.
+        moves: lista par (stara_ścieżka, rekord ze skanera).
+        """
+        changes = []
+        for old_path, rec in moves:
+            fields = {
+                "file_path": rec['filepath'],
+                "fs_stat": rec.get('fs_stat'),
+                "episode_code": rec.get('episode_code', "")
+            }
+            if rec.get('fingerprint'):
+                fields["fingerprint"] = rec['fingerprint']
+            changes.append((old_path, fields))
+        # Rekord oznaczony jako brakujący (prune_missing soft) po przeniesieniu wraca na listę
+        params = [(f["file_path"], self._dump(f["fs_stat"]), f["episode_code"], f.get("fingerprint"), old_path)
+                  for old_path, f in changes]
+        sources = {old_path for old_path, _ in changes}
+        occupied = []
+        for start in range(0, len(params), batch_size):
+            batch = params[start:start + batch_size]
+            targets = [p[0] for p in batch]
+            with self.lock, self.conn:
+                # Rekord, który już zajmuje nową ścieżkę (np. brakujący po starym pliku),
+                # ustępuje przeniesionemu z danymi TMDB (jak w DataBase)
+                stale = [{"_id": movie_id, "file_path": path} for movie_id, path in self.conn.execute(
+                    f"SELECT id, file_path FROM movies WHERE file_path IN ({self._marks(targets)})", targets
+                ) if path not in sources]
+                if stale:
+                    ids = [doc['_id'] for doc in stale]
+                    self.conn.execute(f"DELETE FROM movies WHERE id IN ({self._marks(ids)})", ids)
+                    occupied += stale
+                self.conn.executemany(
+                    "UPDATE movies SET file_path = ?, fs_stat = ?, episode_code = ?, "
+                    "fingerprint = COALESCE(?, fingerprint), missing_since = NULL WHERE file_path = ?",
+                    batch
+                )
+        metrics.DB_DOCUMENTS.inc(len(params), op="move")
+
+        self._cache_delete(occupied)
+        self._clear_details()
+        if self.cache is not None and self.cache.loaded:
+            docs, revived = [], []
+            for old_path, fields in changes:
+                doc = self.cache.patch_by_path(old_path, fields)
+                if doc is not None:
+                    docs.append(doc)
+                else:
+                    revived.append(fields["file_path"])
+            self.cache.notify('update', docs)
+            if revived:
+                rows = self._select(
+                    f"SELECT {self.LIST_COLUMNS} FROM movies WHERE file_path IN ({self._marks(revived)})", revived
+                )
+                self.cache.notify('insert', [self.cache.put(self._to_list_doc(row)) for row in rows])
+
+    @_timed("find_by_fingerprints")
+    def find_by_fingerprints(self, fingerprints, batch_size=1000):
+        """
+        Rekordy o podanych odciskach treści (także oznaczone jako brakujące):
+        {odcisk: [{'_id', 'file_path', 'missing_since'}, ...]}
+        """
+        fingerprints = list({fp for fp in fingerprints if fp})
+        found = {}
+        for start in range(0, len(fingerprints), batch_size):
+            chunk = fingerprints[start:start + batch_size]
+            rows = self._select(
+                f"SELECT id, file_path, fingerprint, missing_since FROM movies "
+                f"WHERE fingerprint IN ({self._marks(chunk)})", chunk
+            )
+            for movie_id, path, fingerprint, missing in rows:
+                doc = {"_id": movie_id, "file_path": path, "fingerprint": fingerprint}
+                if missing is not None:
+                    doc["missing_since"] = missing
+                found.setdefault(fingerprint, []).append(doc)
+        return found
+
+    @_timed("delete_by_paths")
+    def delete_by_paths(self, paths, batch_size=1000):
+        """Usuwa rekordy plików, których już nie ma na dysku"""
+        paths = list(paths)
+        for start in range(0, len(paths), batch_size):
+            chunk = paths[start:start + batch_size]
+            with self.lock, self.conn:
+                self.conn.execute(f"DELETE FROM movies WHERE file_path IN ({self._marks(chunk)})", chunk)
+        metrics.DB_DOCUMENTS.inc(len(paths), op="delete")
+
+        self._clear_details()
+        if self.cache is not None:
+            if self.cache.loaded:
+                docs = [self.cache.remove_path(p) for p in paths]
+                docs = [d for d in docs if d is not None]
+            else:
+                docs = [{"file_path": p} for p in paths]
+            self.cache.notify('delete', docs)
+
+    @_timed("prune_missing")
+    def prune_missing(self, root, present_paths, soft=False, batch_size=1000):
+        """
+        Sprzątanie po skanie katalogu root: rekordy spod root, których ścieżek nie ma
+        w present_paths, są usuwane (soft=False) albo tylko oznaczane missing_since
+        (soft=True - np. odmontowany dysk nie kasuje dopasowań z TMDB).
+        Oznaczone rekordy, których pliki znów są w present_paths, wracają na listę.
+        Zwraca listę ścieżek usuniętych/oznaczonych w tym wywołaniu.
+        """
+        present = set(present_paths)
+        stale, revived = [], []
+        low, high = self._prefix_range(root)
+        rows = self._select(
+            "SELECT id, file_path, missing_since FROM movies WHERE file_path >= ? AND file_path < ?", (low, high)
+        )
+        for movie_id, path, missing_since in rows:
+            missing = missing_since is not None
+            if path in present:
+                if missing:
+                    revived.append(movie_id)
+            elif not (soft and missing):
+                stale.append({"_id": movie_id, "file_path": path})
+
+        stale_ids = [doc['_id'] for doc in stale]
+        now = time.time()
+        with self.lock, self.conn:
+            for start in range(0, len(stale_ids), batch_size):
+                chunk = stale_ids[start:start + batch_size]
+                if soft:
+                    self.conn.execute(f"UPDATE movies SET missing_since = ? WHERE id IN ({self._marks(chunk)})",
+                                      (now, *chunk))
+                else:
+                    self.conn.execute(f"DELETE FROM movies WHERE id IN ({self._marks(chunk)})", chunk)
+            for start in range(0, len(revived), batch_size):
+                chunk = revived[start:start + batch_size]
+                self.conn.execute(f"UPDATE movies SET missing_since = NULL WHERE id IN ({self._marks(chunk)})", chunk)
+        metrics.DB_DOCUMENTS.inc(len(stale_ids), op="tombstone" if soft else "delete")
+
+        if stale_ids or revived:
+            self._forget_details(stale_ids + revived)
+        if self.cache is not None:
+            if self.cache.loaded:
+                gone = [self.cache.remove(mid) for mid in stale_ids]
+                gone = [d for d in gone if d is not None]
+            else:
+                gone = stale
+            self.cache.notify('delete', gone)
+            if revived:
+                rows = self._select(
+                    f"SELECT {self.LIST_COLUMNS} FROM movies WHERE id IN ({self._marks(revived)})", revived
+                )
+                back = [self._to_list_doc(row) for row in rows]
+                if self.cache.loaded:
+                    back = [self.cache.put(doc) for doc in back]
+                self.cache.notify('insert', back)
+        return [doc['file_path'] for doc in stale]
+
+    def _missing_where(self, root=None, older_than=0):
+        sql, params = "missing_since IS NOT NULL AND missing_since <= ?", [time.time() - older_than]
+        if root is not None:
+            sql += " AND file_path >= ? AND file_path < ?"
+            params.extend(self._prefix_range(root))
+        return sql, params
+
+    @_timed("purge_missing")
+    def purge_missing(self, root=None, older_than=0):
+        """Ostatecznie usuwa rekordy oznaczone jako brakujące dłużej niż older_than sekund"""
+        where, params = self._missing_where(root, older_than)
+        with self.lock, self.conn:
+            return self.conn.execute(f"DELETE FROM movies WHERE {where}", params).rowcount
+
+    @_timed("count_missing")
+    def count_missing(self, root=None, older_than=0):
+        """Ile rekordów usunęłoby purge_missing z tymi samymi argumentami"""
+        where, params = self._missing_where(root, older_than)
+        return self._select(f"SELECT COUNT(*) FROM movies WHERE {where}", params)[0][0]
+
+    @_timed("iter_unenriched")
+    def iter_unenriched(self, root=None, limit=0):
+        """Widoczne rekordy bez danych z TMDB (np. po braku wyniku albo przerwanym skanie)"""
+        sql, params = f"SELECT id, file_path FROM movies WHERE {self.VISIBLE} AND tmdb_id IS NULL", []
+        if root is not None:
+            sql += " AND file_path >= ? AND file_path < ?"
+            params.extend(self._prefix_range(root))
+        rows = self._select(sql + " ORDER BY id LIMIT ?", (*params, limit or -1))
+        return [{"_id": movie_id, "file_path": path} for movie_id, path in rows]
+
+    @_timed("get_stats")
+    def get_stats(self):
+        """Liczniki biblioteki: wszystkie, widoczne, brakujące, bez danych TMDB i według typu"""
+        total, visible, unenriched = self._select(
+            f"SELECT COUNT(*), COUNT(*) FILTER (WHERE {self.VISIBLE}), "
+            f"COUNT(*) FILTER (WHERE {self.VISIBLE} AND tmdb_id IS NULL) FROM movies"
+        )[0]
+        by_type = {
+            (kind or "brak"): count
+            for kind, count in self._select(
+                f"SELECT json_extract(movie_details, '$.type'), COUNT(*) FROM movies WHERE {self.VISIBLE} GROUP BY 1"
+            )
+        }
+        return {
+            "total": total,
+            "visible": visible,
+            "missing": total - visible,
+            "unenriched": unenriched,
+            "by_type": by_type,
+            "roots": self.get_library_roots(),
+        }
+
+    @_timed("get_unenriched_ids")
+    def get_unenriched_ids(self, movie_ids):
+        """Zwraca te ID z podanych, które nie mają jeszcze danych z TMDB"""
+        movie_ids = list(movie_ids)
+        result = set()
+        for start in range(0, len(movie_ids), 1000):
+            chunk = movie_ids[start:start + 1000]
+            rows = self._select(
+                f"SELECT id FROM movies WHERE tmdb_id IS NULL AND id IN ({self._marks(chunk)})", chunk
+            )
+            result.update(row[0] for row in rows)
+        return result
+
+    @_timed("update_movie_details")
+    def update_movie_details(self, movie_id, details, tmdb_id):
+        """Aktualizuje rekord o dane z API (ID jako liczba albo tekst)"""
+        try:
+            oid = self._to_oid(movie_id)
+            with self.lock, self.conn:
+                matched = self.conn.execute(
+                    "UPDATE movies SET movie_details = ?, tmdb_id = ? WHERE id = ?",
+                    (self._dump(details), tmdb_id, oid)
+                ).rowcount
+            self._forget_details([oid])
+
+            if self.cache is not None and matched:
+                fields = {"movie_details": details, "tmdb_id": tmdb_id}
+                self.cache.notify('update', self._cache_patch([oid], fields))
+
+            if matched:
+                print(f"Zaktualizowano rekord {oid}")
+            else:
+                print(f"Nie znaleziono ID {oid} do aktualizacji!")
+
+        except ValueError:
+            print(f"Nieprawidłowy format ID: {movie_id}")
+        except Exception as e:
+            print(f" BŁĄD KRYTYCZNY: {e}")
+
+    @_timed("update_many_details")
+    def update_many_details(self, movie_ids, details, tmdb_id):
+        """Ten sam wynik z TMDB dla wielu rekordów (np. odcinki jednego serialu) - jedno UPDATE"""
+        try:
+            oids = [self._to_oid(m) for m in movie_ids]
+            with self.lock, self.conn:
+                modified = self.conn.execute(
+                    f"UPDATE movies SET movie_details = ?, tmdb_id = ? WHERE id IN ({self._marks(oids)})",
+                    (self._dump(details), tmdb_id, *oids)
+                ).rowcount
+            metrics.DB_DOCUMENTS.inc(modified, op="details")
+            self._forget_details(oids)
+            if self.cache is not None:
+                fields = {"movie_details": details, "tmdb_id": tmdb_id}
+                self.cache.notify('update', self._cache_patch(oids, fields))
+            print(f"Zaktualizowano {modified}/{len(oids)} rekordów ({details.get('title')})")
+        except ValueError:
+            print(f"Nieprawidłowy format ID w: {movie_ids}")
+        except Exception as e:
+            print(f" BŁĄD KRYTYCZNY: {e}")
+
+    @_timed("get_all_movies")
+    def get_all_movies(self):
+        """Pobiera wszystkie filmy - pełne dokumenty (do listy lepiej list_movies)"""
+        try:
+            rows = self._select(f"SELECT {self.COLUMNS} FROM movies WHERE {self.VISIBLE} ORDER BY title_scanned")
+            return [self._to_doc(row) for row in rows]
+        except Exception as e:
+            print(f"Błąd pobierania listy: {e}")
+            return []
+
+    # --- Migracja między backendami (storage.migrate) ---
+
+    def iter_documents(self, batch_size=1000):
+        """Wszystkie rekordy (także brakujące) w kolejności dodania - pełne dokumenty"""
+        last = 0
+        while True:
+            rows = self._select(f"SELECT {self.COLUMNS} FROM movies WHERE id > ? ORDER BY id LIMIT ?",
+                                (last, batch_size))
+            for row in rows:
+                yield self._to_doc(row)
+            if len(rows) < batch_size:
+                return
+            last = rows[-1][0]
+
+    @_timed("import_documents")
+    def import_documents(self, docs):
+        """Zapis pełnych dokumentów z innej bazy (nadpisuje rekord o tej samej ścieżce)"""
+        params = [(doc['file_path'], doc.get('title_scanned') or "", doc.get('episode_code'), doc.get('tmdb_id'),
+                   self._dump(doc.get('movie_details') or {}), self._dump(doc.get('fs_stat')),
+                   doc.get('fingerprint'), doc.get('missing_since'))
+                  for doc in docs]
+        with self.lock, self.conn:
+            self.conn.executemany(
+                "INSERT INTO movies (file_path, title_scanned, episode_code, tmdb_id, movie_details, fs_stat, "
+                "fingerprint, missing_since) VALUES (?, ?, ?, ?, ?, ?, ?, ?) "
+                "ON CONFLICT(file_path) DO UPDATE SET title_scanned = excluded.title_scanned, "
+                "episode_code = excluded.episode_code, tmdb_id = excluded.tmdb_id, "
+                "movie_details = excluded.movie_details, fs_stat = excluded.fs_stat, "
+                "fingerprint = excluded.fingerprint, missing_since = excluded.missing_since",
+                params
+            )
+        metrics.DB_DOCUMENTS.inc(len(params), op="import")
+        self._clear_details()
+        if self.cache is not None and self.cache.loaded:
+            self.cache.clear()
+            self.cache.loaded = False
+            self.cache.notify('reset', [])
+        return len(params)
+
+    def export_state(self):
+        """Stan skanów i foldery biblioteki: {'dirs': {katalog: stan}, 'roots': {folder: dodano}}"""
+        return {
+            "dirs": {path: {'mtime_ns': mtime_ns, 'subdirs': json.loads(subdirs)}
+                     for path, mtime_ns, subdirs in self._select("SELECT path, mtime_ns, subdirs FROM scan_dirs")},
+            "roots": dict(self._select("SELECT path, added_at FROM library_roots")),
+        }
+
+    def import_state(self, state):
+        with self.lock, self.conn:
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO scan_dirs (path, mtime_ns, subdirs) VALUES (?, ?, ?)",
+                [(path, st['mtime_ns'], json.dumps(st['subdirs'], ensure_ascii=False))
+                 for path, st in state["dirs"].items()]
+            )
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO library_roots (path, added_at) VALUES (?, ?)",
+                [(root, added_at or time.time()) for root, added_at in state["roots"].items()]
+            )
+
+    @_timed("clear_database")
+    def clear_database(self):
+        with self.lock, self.conn:
+            self.conn.execute("DELETE FROM movies")
+        self._clear_details()
+        if self.cache is not None:
+            self.cache.clear()
+            self.cache.notify('reset', [])
+        print("Baza danych wyczyszczona.")
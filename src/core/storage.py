@@ -0,0 +1,285 @@
+import os
+import threading
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from core.library_cache import LibraryCache
+from core.search_index import SearchIndex
+from core import metrics, tracing
+
+BACKENDS = ("mongo", "sqlite")
+
+
+def _timed(op):
+    """Czas operacji: histogram db_operation_seconds{op=...} i span na osi czasu (gdy włączone)"""
+    def decorator(func):
+        return tracing.traced(f"db.{op}", cat="db")(metrics.timed(metrics.DB_OPERATION_SECONDS, op=op)(func))
+    return decorator
+
+
+def open_database(backend=None, **kwargs):
+    """
+    Baza biblioteki wybranego backendu: argument, zmienna DB_BACKEND albo "mongo".
+    Backend importowany dopiero tutaj - SQLite działa bez zainstalowanego pymongo.
+    kwargs idą do konstruktora (cache, details_cache_size, a dla SQLite path).
+    """
+    backend = (backend or os.getenv("DB_BACKEND") or "mongo").lower()
+    if backend == "sqlite":
+        from core.sqlite_database import SQLiteDataBase
+        return SQLiteDataBase(**kwargs)
+    if backend == "mongo":
+        from core.database import DataBase
+        return DataBase(**kwargs)
+    raise ValueError(f"Nieznany backend bazy: {backend} (dostępne: {', '.join(BACKENDS)})")
+
+
+def migrate(source, target, batch_size=1000, progress=None):
+    """
+    Kopiuje bibliotekę między backendami: wszystkie rekordy (z danymi TMDB, odciskami
+    i oznaczeniem brakujących), stan katalogów ze skanów i foldery biblioteki.
+    Rekord o tej samej ścieżce w docelowej bazie jest nadpisywany, więc migrację można
+    powtórzyć. ID są nadawane na nowo (ObjectId <-> liczba), kolejność dodania zostaje.
+    progress(skopiowane): wołane po każdej paczce. Zwraca {'movies', 'dirs', 'roots'}.
+    """
+    copied, batch = 0, []
+    for doc in source.iter_documents(batch_size):
+        batch.append(doc)
+        if len(batch) >= batch_size:
+            copied += target.import_documents(batch)
+            batch = []
+            if progress:
+                progress(copied)
+    if batch:
+        copied += target.import_documents(batch)
+        if progress:
+            progress(copied)
+
+    state = source.export_state()
+    target.import_state(state)
+    return {"movies": copied, "dirs": len(state["dirs"]), "roots": len(state["roots"])}
+
+
+class BaseDataBase(ABC):
+    """
+    Część wspólna backendów biblioteki - DataBase (MongoDB) i SQLiteDataBase (plik SQLite):
+    kopia listy w pamięci z powiadomieniami o zmianach, LRU pełnych dokumentów i indeks
+    wyszukiwania. Backend dostarcza zapytania (_find_movie, _find_movie_by_path, _load_list,
+    _iter_list, _query_list, _library_root_paths, _to_oid) i wszystkie zapisy.
+    Dokumenty w obu backendach mają ten sam kształt (jak w MongoDB), więc UI, skaner
+    i CLI nie wiedzą, który backend działa - różni się tylko typ _id.
+    """
+    # Pola potrzebne liście (tabela w UI i wyszukiwanie) - reszta (opis, URL-e) ładowana dopiero po wybraniu
+    LIST_DETAILS = ("title", "original_title", "release_year", "genres", "type")
+    # Klucze sortowania listy -> pole w bazie (każde ma indeks; data dodania = kolejność _id)
+    SORT_FIELDS = {
+        "title": "title_scanned",
+        "year": "movie_details.release_year",
+        "added": "_id",
+    }
+
+    def __init__(self, cache=True, details_cache_size=256):
+        # Kopia biblioteki w pamięci (ładowana przy pierwszym odczycie listy), cache=False dla skryptów
+        self.cache = LibraryCache(shape=self._list_shape) if cache else None
+        # Pełne dokumenty (z opisem itd.) tylko dla ostatnio oglądanych pozycji
+        self._details = OrderedDict()
+        self._details_size = details_cache_size
+        self._details_lock = threading.Lock()
+        self._search_index = None
+        self._search_index_lock = threading.Lock()
+        if self.cache is not None:
+            metrics.LIBRARY_SIZE.set_function(lambda: len(self.cache))
+
+    @staticmethod
+    def _list_shape(doc):
+        """Dokument przycięty do pól listy (to samo, co zwraca baza z projekcją listy)"""
+        light = {k: doc[k] for k in ("_id", "file_path", "title_scanned", "episode_code", "tmdb_id") if k in doc}
+        details = doc.get("movie_details")
+        if details is not None:
+            light["movie_details"] = {k: details[k] for k in BaseDataBase.LIST_DETAILS if k in details}
+        return light
+
+    def _forget_details(self, movie_ids):
+        with self._details_lock:
+            for mid in movie_ids:
+                self._details.pop(mid, None)
+
+    def _clear_details(self):
+        with self._details_lock:
+            self._details.clear()
+
+    # --- Cache w pamięci i powiadomienia o zmianach ---
+
+    def subscribe(self, callback):
+        """
+        Powiadomienia o zmianach dokumentów: callback(rodzaj, dokumenty),
+        rodzaj: 'insert' / 'update' / 'delete' / 'reset'. Zwraca funkcję do wypisania się.
+        """
+        if self.cache is None:
+            raise RuntimeError("Powiadomienia wymagają bazy z cache=True")
+        return self.cache.subscribe(callback)
+
+    def _ensure_cache(self):
+        if self.cache is not None and not self.cache.loaded:
+            with metrics.DB_OPERATION_SECONDS.time(op="load_cache"), tracing.span("db.load_cache", cat="db"):
+                self.cache.load(self._load_list())
+
+    def _cache_patch(self, movie_ids, fields):
+        """Nanosi zmianę na cache i zwraca dokumenty do powiadomienia"""
+        self._forget_details(movie_ids)
+        docs = []
+        for mid in movie_ids:
+            doc = self.cache.patch(mid, fields) if self.cache.loaded else None
+            docs.append(doc if doc is not None else self._list_shape(dict(fields, _id=mid)))
+        return docs
+
+    def _cache_delete(self, docs):
+        """Usunięte rekordy ({'_id', 'file_path'}) znikają z cache; subskrybenci dostają 'delete'"""
+        self._forget_details([d['_id'] for d in docs])
+        if self.cache is not None:
+            if self.cache.loaded:
+                gone = [self.cache.remove_path(d['file_path']) for d in docs]
+                docs = [d for d in gone if d is not None]
+            self.cache.notify('delete', docs)
+
+    # --- Odczyt ---
+
+    @_timed("get_movie")
+    def get_movie(self, movie_id):
+        """
+        Pełny dokument (z opisem, gatunkami, URL-ami) po ID - ładowany dopiero, gdy potrzebny,
+        i trzymany w małym LRU ostatnio oglądanych pozycji.
+        """
+        oid = self._to_oid(movie_id)
+        with self._details_lock:
+            doc = self._details.get(oid)
+            if doc is not None:
+                self._details.move_to_end(oid)
+                return doc
+
+        doc = self._find_movie(oid)
+        if doc is not None and self._details_size:
+            with self._details_lock:
+                self._details[oid] = doc
+                while len(self._details) > self._details_size:
+                    self._details.popitem(last=False)
+        return doc
+
+    @_timed("get_movie_by_path")
+    def get_movie_by_path(self, path):
+        """Pełny dokument po ścieżce pliku (ID z pamięci, gdy lista jest wczytana)"""
+        if self.cache is not None and self.cache.loaded:
+            light = self.cache.get_by_path(path)
+            if light is not None:
+                return self.get_movie(light['_id'])
+        return self._find_movie_by_path(path)
+
+    @_timed("list_movies")
+    def list_movies(self, sort_by="title", descending=False):
+        """
+        Lekka lista do tabeli: tylko pola listy, posortowana po
+        'title', 'year' albo 'added'. Po pierwszym wczytaniu serwowana z pamięci.
+        """
+        field = self.SORT_FIELDS[sort_by]
+        try:
+            if self.cache is not None:
+                self._ensure_cache()
+                return self.cache.all(key=self._sort_key(field), reverse=descending)
+            return self._query_list(field, descending)
+        except Exception as e:
+            print(f"Błąd pobierania listy: {e}")
+            return []
+
+    def iter_movie_batches(self, batch_size=1000):
+        """
+        Ta sama lista co list_movies() (po tytule), ale oddawana paczkami w trakcie czytania
+        kursora - pierwsze wiersze są w tabeli po jednej podróży do bazy, a nie po całej bibliotece.
+        Przejście do końca wczytuje też cache (kolejne list_movies() są już z pamięci).
+        Zapisy w trakcie przejścia nie trafiają do tej migawki - wołający wstrzymuje je
+        do końca ładowania (okno włącza Scan i Watch dopiero po load_finished).
+        Błędy połączenia lecą dalej - wołający (wątek ładowania UI) pokazuje je użytkownikowi.
+        """
+        if self.cache is not None and self.cache.loaded:
+            docs = self.list_movies()
+            for start in range(0, len(docs), batch_size):
+                yield docs[start:start + batch_size]
+            return
+
+        loaded, batch = [], []
+        with metrics.DB_OPERATION_SECONDS.time(op="load_cache"), tracing.span("db.load_cache", cat="db"):
+            for doc in self._iter_list(batch_size):
+                batch.append(doc)
+                if len(batch) >= batch_size:
+                    loaded.extend(batch)
+                    yield batch
+                    batch = []
+            if batch:
+                loaded.extend(batch)
+                yield batch
+            if self.cache is not None and not self.cache.loaded:
+                self.cache.load(loaded)
+
+    def search_index(self):
+        """
+        Indeks wyszukiwania (SearchIndex) nad listą - budowany przy pierwszym wywołaniu,
+        potem aktualizowany z powiadomień o zmianach. Budowa trwa (sekundy przy 100k
+        pozycji), więc okno woła to w wątku ładowania (LibraryLoader), nie przy pierwszym klawiszu.
+        """
+        with self._search_index_lock:
+            if self._search_index is None:
+                index = SearchIndex()
+                # Najpierw subskrypcja - zmiany w trakcie ładowania nie przepadną
+                self.subscribe(index.apply)
+                index.load(self.list_movies())
+                self._search_index = index
+            return self._search_index
+
+    @staticmethod
+    def _sort_key(field):
+        if field == "_id":
+            return lambda d: d["_id"]
+        parts = field.split(".")
+
+        def key(doc):
+            value = doc
+            for part in parts:
+                value = value.get(part) if isinstance(value, dict) else None
+            return value or ""
+        return key
+
+    @_timed("get_library_roots")
+    def get_library_roots(self):
+        """Foldery biblioteki bez zagnieżdżonych (podfolder zeskanowanego folderu nie jest osobnym korzeniem)"""
+        roots = []
+        for path in sorted(self._library_root_paths()):
+            if not any(path.startswith(os.path.join(r, '')) for r in roots):
+                roots.append(path)
+        return roots
+
+    # --- Zapytania backendu ---
+
+    @abstractmethod
+    def _to_oid(self, movie_id):
+        """ID z API (np. tekst z UI) -> ID w bazie"""
+
+    @abstractmethod
+    def _find_movie(self, oid):
+        """Pełny dokument po ID (None, gdy go nie ma)"""
+
+    @abstractmethod
+    def _find_movie_by_path(self, path):
+        """Pełny dokument po ścieżce pliku (None, gdy go nie ma)"""
+
+    @abstractmethod
+    def _load_list(self):
+        """Wszystkie widoczne rekordy w kształcie listy (do wczytania cache)"""
+
+    @abstractmethod
+    def _iter_list(self, batch_size):
+        """Widoczne rekordy w kształcie listy, po tytule, czytane paczkami"""
+
+    @abstractmethod
+    def _query_list(self, field, descending):
+        """Widoczne rekordy w kształcie listy, posortowane w bazie po polu z SORT_FIELDS"""
+
+    @abstractmethod
+    def _library_root_paths(self):
+        """Wszystkie zapisane foldery biblioteki (także zagnieżdżone)"""
@@ -1,15 +1,136 @@
 import os
+import time
+import random
+import threading
+from email.utils import parsedate_to_datetime
 import requests
+from requests.adapters import HTTPAdapter
 from dotenv import load_dotenv
+from core.tmdb_cache import TMDBCache
+from core import metrics, tracing
 
 load_dotenv()
 
 class TMDBClient:
-    def __init__(self):
+    RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+    DEFAULT_BASE_URL = "https://api.themoviedb.org/3"
+
+    def __init__(self, cache=None, pool_size=16, timeout=(3.05, 10), max_retries=4, backoff_base=0.5, backoff_max=30,
+                 base_url=None):
+        """
+        cache: obiekt TMDBCache, None = domyślny cache na dysku, False = bez cache.
+        base_url: adres API (domyślnie TMDB_BASE_URL albo api.themoviedb.org) - np. lokalny
+        serwer z benchmarks/fake_tmdb.py.
+        Cache można też wyłączyć zmienną środowiskową TMDB_CACHE=0.
+        pool_size: ile połączeń keep-alive trzymamy (ustawić >= liczba wątków wzbogacania).
+        timeout: (connect, read) w sekundach.
+        max_retries / backoff_*: ponawianie przy 429, 5xx i błędach sieci (wykładniczo z jitterem).
+        """
         self.api_key = os.getenv("TMDB_API_KEY")
-        self.BASE_URL = "https://api.themoviedb.org/3"
+        self.BASE_URL = (base_url or os.getenv("TMDB_BASE_URL") or self.DEFAULT_BASE_URL).rstrip("/")
         self.IMAGE_BASE_URL = "https://image.tmdb.org/t/p/w500"
         self.BACKDROP_BASE_URL = "https://image.tmdb.org/t/p/w1280"
+        # Opcjonalny limiter (np. TokenBucket z core.enrichment), wspólny dla wszystkich wątków
+        self.rate_limiter = None
+
+        if cache is None and os.getenv("TMDB_CACHE", "1") != "0":
+            cache = TMDBCache()
+        # Uwaga: pusty TMDBCache ma len() == 0, więc nie sprawdzamy go przez 'if cache'
+        self.cache = cache if cache is not False else None
+
+        # Jedna sesja = pula połączeń keep-alive (bez nowego handshake TLS na każdy tytuł)
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+
+        # Liczniki (czytane np. przez diagnostykę) - aktualizowane z wielu wątków
+        self.stats = {"requests": 0, "retries": 0, "throttled": 0, "errors": 0}
+        self._stats_lock = threading.Lock()
+
+    def _count(self, name):
+        with self._stats_lock:
+            self.stats[name] += 1
+
+    def _retry_delay(self, attempt, res=None):
+        """Czas oczekiwania: nagłówek Retry-After, a jeśli go nie ma - backoff z pełnym jitterem"""
+        retry_after = res.headers.get("Retry-After") if res is not None else None
+        if retry_after:
+            try:
+                return min(self.backoff_max, max(0.0, float(retry_after)))
+            except ValueError:
+                try:
+                    return min(self.backoff_max, max(0.0, parsedate_to_datetime(retry_after).timestamp() - time.time()))
+                except (TypeError, ValueError):
+                    pass
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * (2 ** attempt)))
+
+    def _get(self, url, params):
+        """
+        Jedno miejsce na wszystkie żądania HTTP do TMDB.
+        Ponawia 429/5xx/błędy sieci; po wyczerpaniu prób zwraca ostatnią odpowiedź albo rzuca wyjątek.
+        """
+        kind = "search" if "/search/" in url else "details"
+        for attempt in range(self.max_retries + 1):
+            if self.rate_limiter:
+                self.rate_limiter.acquire()
+            self._count("requests")
+            try:
+                with metrics.TMDB_REQUEST_SECONDS.time(kind=kind), \
+                        tracing.span(f"tmdb {kind}", cat="tmdb", url=url[len(self.BASE_URL):], attempt=attempt) as span:
+                    res = self.session.get(url, params=params, timeout=self.timeout)
+                    span.set(status=res.status_code)
+            except (requests.ConnectionError, requests.Timeout):
+                self._count("errors")
+                metrics.TMDB_RESPONSES.inc(kind=kind, status="error")
+                if attempt == self.max_retries:
+                    raise
+                res = None
+                reason = "network"
+            else:
+                metrics.TMDB_RESPONSES.inc(kind=kind, status=res.status_code)
+                if res.status_code not in self.RETRY_STATUSES or attempt == self.max_retries:
+                    return res
+                if res.status_code == 429:
+                    self._count("throttled")
+                else:
+                    self._count("errors")
+                reason = res.status_code
+
+            self._count("retries")
+            metrics.TMDB_RETRIES.inc(reason=reason)
+            time.sleep(self._retry_delay(attempt, res))
+
+    def _fetch(self, kind, path, params):
+        """
+        Pobiera JSON z {BASE_URL}{path}, najpierw sprawdzając cache.
+        kind: 'search' albo 'details' (decyduje o TTL). Zwraca None, gdy TMDB nic nie ma (404).
+        """
+        key = None
+        if self.cache is not None:
+            key = TMDBCache.make_key(path, params)
+            hit, data = self.cache.get(key)
+            metrics.TMDB_CACHE.inc(kind=kind, result="hit" if hit else "miss")
+            if hit:
+                return data
+
+        res = self._get(f"{self.BASE_URL}{path}", params)
+        if res.status_code == 404:
+            data = None
+        else:
+            # Inne błędy (401, 429, 5xx) nie trafiają do cache
+            res.raise_for_status()
+            data = res.json()
+
+        if self.cache is not None:
+            negative = data is None or (kind == 'search' and not data.get('results'))
+            self.cache.set(key, kind, data, negative=negative)
+        return data
 
     def _format_result(self, item, media_type=None):
         if not item: return None
@@ -18,10 +139,12 @@ class TMDBClient:
 
         if m_type == 'tv':
             title = item.get('name')
+            original_title = item.get('original_name')
             date = item.get('first_air_date', '')
             final_type = 'tv'
         else:
             title = item.get('title')
+            original_title = item.get('original_title')
             date = item.get('release_date', '')
             final_type = 'movie'
 
@@ -31,6 +154,7 @@ class TMDBClient:
         return {
             "tmdb_id": item.get('id'),
             "title": title,
+            "original_title": original_title,
             "release_year": found_year,
             "poster_url": f"{self.IMAGE_BASE_URL}{item.get('poster_path')}" if item.get('poster_path') else None,
             "backdrop_url": f"{self.BACKDROP_BASE_URL}{item.get('backdrop_path')}" if item.get('backdrop_path') else None,
@@ -49,13 +173,12 @@ class TMDBClient:
             return self._search_specific(query, year, 'tv')
         
         try:
-            url = f"{self.BASE_URL}/search/multi"
             params = {
                 "api_key": self.api_key, "query": query, 
                 "language": "en-EN", "include_adult": "false"
             }
-            res = requests.get(url, params=params)
-            results = res.json().get('results', [])
+            data = self._fetch('search', "/search/multi", params)
+            results = (data or {}).get('results', [])
             
             valid = [r for r in results if r['media_type'] in ['movie', 'tv']]
             if not valid: return None
@@ -76,14 +199,13 @@ class TMDBClient:
 
     def _search_specific(self, query, year, endpoint):
         try:
-            url = f"{self.BASE_URL}/search/{endpoint}"
             params = {"api_key": self.api_key, "query": query, "language": "pl-PL"}
             if year:
                 if endpoint == 'movie': params["primary_release_year"] = year
                 else: params["first_air_date_year"] = year
 
-            res = requests.get(url, params=params)
-            results = res.json().get('results', [])
+            data = self._fetch('search', f"/search/{endpoint}", params)
+            results = (data or {}).get('results', [])
             if not results: return None
             
             return self._get_details_by_id(results[0]['id'], endpoint)
@@ -123,11 +245,11 @@ class TMDBClient:
 
     def _get_details_by_id(self, tmdb_id, endpoint):
         try:
-            url = f"{self.BASE_URL}/{endpoint}/{tmdb_id}"
             params = {"api_key": self.api_key, "language": "en-EN"}
-            res = requests.get(url, params=params)
-            if res.status_code == 200:
-                return self._format_result(res.json(), endpoint) 
+            data = self._fetch('details', f"/{endpoint}/{str(tmdb_id).strip()}", params)
+            if data:
+                return self._format_result(data, endpoint) 
             return None
-        except:
+        except (requests.RequestException, ValueError) as e:
+            print(f"Błąd pobierania {endpoint}/{tmdb_id}: {e}")
             return None
\ No newline at end of file
@@ -0,0 +1,155 @@
+import os
+import json
+import time
+import sqlite3
+import threading
+from pathlib import Path
+from urllib.parse import urlencode
+
+DAY = 24 * 3600
+
+
+class TMDBCache:
+    """
+    Trwały cache odpowiedzi TMDB w lokalnym pliku SQLite.
+    - osobny TTL dla każdego rodzaju wpisu (wyszukiwanie, szczegóły, brak wyniku),
+    - cache negatywny: "nic nie znaleziono" też jest zapamiętywane (krócej),
+    - limit liczby wpisów z usuwaniem najdawniej używanych (LRU).
+    Czasy dostępu z get() czekają w pamięci i trafiają do pliku razem z najbliższym
+    zapisem (set), sprzątaniem, zamknięciem albo po ACCESS_FLUSH_SIZE trafieniach -
+    trafienie nie płaci za UPDATE i commit.
+    """
+    DEFAULT_TTLS = {
+        'search': 7 * DAY,
+        'details': 30 * DAY,
+        'negative': 1 * DAY,
+    }
+    # Parametry, które oznaczają rok - sprowadzamy je do jednego klucza
+    YEAR_PARAMS = ('year', 'primary_release_year', 'first_air_date_year')
+    # Po tylu zbuforowanych czasach dostępu zapis idzie od razu (długie skany bez nowych wpisów)
+    ACCESS_FLUSH_SIZE = 1000
+
+    def __init__(self, path=None, max_entries=100000, ttls=None):
+        if path is None:
+            path = os.getenv("TMDB_CACHE_PATH") or Path.home() / ".cache" / "movie-manager" / "tmdb_cache.sqlite"
+        self.path = str(path)
+        if self.path != ":memory:":
+            Path(self.path).parent.mkdir(parents=True, exist_ok=True)
+
+        self.max_entries = max_entries
+        self.ttls = dict(self.DEFAULT_TTLS, **(ttls or {}))
+        self.hits = 0
+        self.misses = 0
+        self._writes = 0
+        self._accessed = {}  # klucz -> czas ostatniego trafienia, jeszcze niezapisany
+
+        # Jedno połączenie współdzielone przez wątki wzbogacania - pilnuje go lock
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(self.path, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS responses (
+                key TEXT PRIMARY KEY,
+                kind TEXT NOT NULL,
+                payload TEXT,
+                expires_at REAL NOT NULL,
+                last_access REAL NOT NULL
+            )
+        """)
+        self.conn.execute("CREATE INDEX IF NOT EXISTS idx_last_access ON responses(last_access)")
+        self.conn.commit()
+
+    @classmethod
+    def make_key(cls, endpoint, params=None):
+        """
+        Normalizowany klucz: endpoint (z ID w ścieżce) + zapytanie, rok, język itd.
+        Klucz API nie wchodzi do klucza, wielkość liter i spacje w zapytaniu nie mają znaczenia.
+        """
+        norm = {}
+        for name, value in (params or {}).items():
+            if name == 'api_key' or value is None:
+                continue
+            if name == 'query':
+                value = " ".join(str(value).split()).casefold()
+            elif name in cls.YEAR_PARAMS:
+                name = 'year'
+            norm[name] = str(value).strip()
+        endpoint = "/" + "/".join(p.strip().lower() for p in endpoint.strip("/").split("/"))
+        return f"{endpoint}?{urlencode(sorted(norm.items()))}"
+
+    def get(self, key):
+        """Zwraca (trafienie, dane). Dane None przy trafieniu = zapamiętany brak wyniku."""
+        now = time.time()
+        with self.lock:
+            row = self.conn.execute(
+                "SELECT payload, expires_at FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None or row[1] < now:
+                self.misses += 1
+                return False, None
+            self._accessed[key] = now
+            if len(self._accessed) >= self.ACCESS_FLUSH_SIZE:
+                self._flush_access()
+                self.conn.commit()
+            self.hits += 1
+        return True, json.loads(row[0]) if row[0] is not None else None
+
+    def set(self, key, kind, payload, negative=False):
+        """Zapisuje odpowiedź. negative=True -> krótszy TTL dla 'brak wyniku'."""
+        now = time.time()
+        ttl = self.ttls['negative'] if negative else self.ttls[kind]
+        data = json.dumps(payload) if payload is not None else None
+        with self.lock:
+            self._accessed.pop(key, None)
+            self._flush_access()
+            self.conn.execute(
+                "INSERT OR REPLACE INTO responses (key, kind, payload, expires_at, last_access) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (key, kind, data, now + ttl, now)
+            )
+            self.conn.commit()
+            self._writes += 1
+            # Liczenie wpisów nie przy każdym zapisie, tylko co jakiś czas
+            if self._writes % 100 == 0:
+                self._evict()
+
+    def _flush_access(self):
+        """Zbuforowane czasy dostępu do pliku (wołać pod lockiem, commit robi wołający)"""
+        if self._accessed:
+            self.conn.executemany("UPDATE responses SET last_access = ? WHERE key = ?",
+                                  [(t, k) for k, t in self._accessed.items()])
+            self._accessed.clear()
+
+    def _evict(self):
+        """LRU: usuwa przeterminowane i najdawniej używane wpisy ponad limit (wołać pod lockiem)"""
+        self._flush_access()
+        self.conn.execute("DELETE FROM responses WHERE expires_at < ?", (time.time(),))
+        count = self.conn.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+        if count > self.max_entries:
+            # Schodzimy do 90% limitu, żeby nie sprzątać przy każdym kolejnym zapisie
+            excess = count - int(self.max_entries * 0.9)
+            self.conn.execute(
+                "DELETE FROM responses WHERE key IN "
+                "(SELECT key FROM responses ORDER BY last_access ASC LIMIT ?)", (excess,)
+            )
+        self.conn.commit()
+
+    def evict(self):
+        with self.lock:
+            self._evict()
+
+    def __len__(self):
+        with self.lock:
+            return self.conn.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+
+    def clear(self):
+        with self.lock:
+            self._accessed.clear()
+            self.conn.execute("DELETE FROM responses")
+            self.conn.commit()
+
+    def close(self):
+        with self.lock:
+            self._flush_access()
+            self.conn.commit()
+            self.conn.close()
@@ -0,0 +1,166 @@
+import os
+import json
+import time
+import atexit
+import threading
+from collections import deque
+from functools import wraps
+
+
+class Tracer:
+    """
+    Oś czasu wykonania w formacie Chrome Trace Event (chrome://tracing, ui.perfetto.dev).
+    Każdy span to zdarzenie "X" (początek + czas trwania) z id wątku, więc widać, co robią
+    równolegle wątki skanu, wzbogacania i GUI. Wyłączony tracer (domyślnie) kończy każdy
+    span na sprawdzeniu jednej flagi. Włączenie: TRACE_FILE=ścieżka.json, flaga --trace
+    albo TRACER.start(ścieżka) - plik zapisuje save() albo (dla TRACER) wyjście z programu.
+    Bufor ma limit zdarzeń (najstarsze wypadają), żeby wielogodzinny skan nie zjadł pamięci.
+    """
+    def __init__(self, max_events=2_000_000):
+        self.enabled = False
+        self.path = None
+        self.dropped = 0
+        self._events = deque(maxlen=max_events)
+        self._threads = {}
+        self._pid = os.getpid()
+        self._origin = time.perf_counter_ns()
+
+    def start(self, path=None):
+        self.path = path or self.path
+        self.enabled = True
+
+    def stop(self):
+        self.enabled = False
+
+    def clear(self):
+        self._events.clear()
+        self._threads.clear()
+        self.dropped = 0
+
+    def now_us(self):
+        return (time.perf_counter_ns() - self._origin) / 1000
+
+    def _tid(self):
+        tid = threading.get_native_id()
+        if tid not in self._threads:
+            self._threads[tid] = threading.current_thread().name
+        return tid
+
+    def _append(self, event):
+        if len(self._events) == self._events.maxlen:
+            self.dropped += 1
+        self._events.append(event)
+
+    # --- Zdarzenia ---
+
+    def span(self, name, cat="app", **args):
+        """with tracer.span("nazwa", cat="db", op=...): ... - mierzy blok w bieżącym wątku"""
+        if not self.enabled:
+            return _NULL_SPAN
+        return _Span(self, name, cat, args)
+
+    def complete(self, name, start_us, cat="app", **args):
+        """Span zamknięty ręcznie (np. pobranie sieciowe rozpoczęte w innym wywołaniu)"""
+        if self.enabled:
+            self._complete(name, start_us, cat, args)
+
+    def _complete(self, name, start_us, cat, args):
+        self._append({"name": name, "cat": cat, "ph": "X", "ts": start_us, "dur": self.now_us() - start_us,
+                      "pid": self._pid, "tid": self._tid(), "args": args})
+
+    def instant(self, name, cat="app", **args):
+        if not self.enabled:
+            return
+        self._append({"name": name, "cat": cat, "ph": "i", "s": "t", "ts": self.now_us(),
+                      "pid": self._pid, "tid": self._tid(), "args": args})
+
+    def counter(self, name, **values):
+        """Wykres wartości w czasie (np. długość kolejki do TMDB)"""
+        if not self.enabled:
+            return
+        self._append({"name": name, "ph": "C", "ts": self.now_us(), "pid": self._pid, "args": values})
+
+    # --- Zapis ---
+
+    def events(self):
+        meta = [{"name": "thread_name", "ph": "M", "pid": self._pid, "tid": tid, "args": {"name": name}}
+                for tid, name in list(self._threads.items())]
+        return meta + list(self._events)
+
+    def save(self, path=None):
+        path = path or self.path
+        if not path:
+            return None
+        data = {"traceEvents": self.events(), "displayTimeUnit": "ms",
+                "otherData": {"dropped_events": self.dropped}}
+        tmp = f"{path}.{os.getpid()}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(data, f, default=str)
+        os.replace(tmp, path)
+        return path
+
+    def _save_at_exit(self):
+        if self.path and self._events:
+            path = self.save()
+            print(f"Zapisano ślad wykonania: {path} ({len(self._events)} zdarzeń)")
+
+
+class _NullSpan:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def set(self, **args):
+        pass
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class _Span:
+    def __init__(self, tracer, name, cat, args):
+        self.tracer = tracer
+        self.name = name
+        self.cat = cat
+        self.args = args
+
+    def set(self, **args):
+        """Dopisuje argumenty znane dopiero w trakcie (np. status odpowiedzi)"""
+        self.args.update(args)
+
+    def __enter__(self):
+        self.start = self.tracer.now_us()
+        return self
+
+    def __exit__(self, exc_type, *exc):
+        if exc_type is not None:
+            self.args["error"] = exc_type.__name__
+        self.tracer._complete(self.name, self.start, self.cat, self.args)
+        return False
+
+
+TRACER = Tracer()
+if os.getenv("TRACE_FILE"):
+    TRACER.start(os.getenv("TRACE_FILE"))
+atexit.register(TRACER._save_at_exit)
+
+
+def span(name, cat="app", **args):
+    return TRACER.span(name, cat, **args)
+
+
+def traced(name=None, cat="app"):
+    """Dekorator: każde wywołanie funkcji to span (nazwa domyślnie = nazwa funkcji)"""
+    def decorator(func):
+        label = name or func.__qualname__
+
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            if not TRACER.enabled:
+                return func(*args, **kwargs)
+            with _Span(TRACER, label, cat, {}):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
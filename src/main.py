@@ -12,12 +12,11 @@ sys.path.append(str(current_dir / 'src'))
 # Ładowanie zmiennych środowiskowych (.env)
 load_dotenv(current_dir / '.env')
 
-# Import modułów
+# Import modułów (baza, FileScanner i TMDBClient dopiero w create_backend - pymongo
+# i requests to większość czasu importów, a okno ich do namalowania nie potrzebuje)
 try:
-    from core.database import DataBase
-    from core.file_scanner import FileScanner
-    from core.tmdb_api import TMDBClient
     from ui.main_window import MovieLibrary
+    from core import metrics, tracing
 except ImportError as e:
     print(f"BŁĄD KRYTYCZNY: Nie znaleziono modułów.\nSzczegóły: {e}")
     print("Upewnij się, że struktura folderów to: src/core oraz src/ui")
@@ -48,30 +47,47 @@ def load_stylesheet(app):
 
     print(f"Nie znaleziono pliku style.qss. Sprawdzono lokalizacje: {[str(p) for p in possible_paths]}")
 
+def create_backend():
+    """Backend aplikacji - wołane w wątku ładowania okna (LibraryLoader), nie przed pokazaniem okna"""
+    from core.storage import open_database
+    from core.file_scanner import FileScanner
+    from core.tmdb_api import TMDBClient
+
+    db = open_database()    # MongoDB albo plik SQLite (DB_BACKEND)
+    scanner = FileScanner() # Skaner plików
+    tmdb = TMDBClient()     # Klient API (Filmy + Seriale)
+    print("Backend zainicjalizowany pomyślnie.")
+    return db, scanner, tmdb
+
 def main():
+    # Ślad wykonania (Chrome/Perfetto): --trace plik.json albo TRACE_FILE=plik.json
+    if "--trace" in sys.argv:
+        pos = sys.argv.index("--trace")
+        trace_path = sys.argv[pos + 1] if pos + 1 < len(sys.argv) else "trace.json"
+        del sys.argv[pos:pos + 2]
+        tracing.TRACER.start(trace_path)
+
     # 1. Inicjalizacja aplikacji Qt
     app = QApplication(sys.argv)
     
     # 2. Załadowanie stylów
     load_stylesheet(app)
 
-    # 3. Inicjalizacja komponentów
-    try:
-        db = DataBase() 
-        scanner = FileScanner() # Skaner plików
-        tmdb = TMDBClient()     # Klient API (Filmy + Seriale)
-        
-        print("Backend zainicjalizowany pomyślnie.")
-    except Exception as e:
-        print(f"Błąd inicjalizacji backendu: {e}")
-        sys.exit(1)
+    # Metryki (METRICS=1): endpoint Prometheusa (METRICS_PORT) i/lub plik przy zamknięciu (METRICS_FILE)
+    if metrics.REGISTRY.enabled and os.getenv("METRICS_PORT"):
+        port = metrics.REGISTRY.serve(int(os.getenv("METRICS_PORT")))
+        print(f"Metryki: http://127.0.0.1:{port}/metrics")
 
-    # 4. Uruchomienie głównego okna
-    window = MovieLibrary(db, scanner, tmdb)
+    # 3. Okno od razu; backend (baza, skaner, TMDB) i lista biblioteki dochodzą w tle.
+    # Błąd połączenia z bazą pokazuje się w oknie zamiast blokować start.
+    window = MovieLibrary(backend=create_backend)
     window.show()
 
-    # 5. Pętla główna aplikacji
-    sys.exit(app.exec())
+    # 4. Pętla główna aplikacji
+    code = app.exec()
+    if metrics.REGISTRY.enabled and os.getenv("METRICS_FILE"):
+        metrics.REGISTRY.write_file(os.getenv("METRICS_FILE"))
+    sys.exit(code)
 
 if __name__ == "__main__":
     main()
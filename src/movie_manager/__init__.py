@@ -0,0 +1 @@
+"""Biblioteka filmów bez okna: python -m movie_manager scan|enrich|prune|stats"""
@@ -0,0 +1,10 @@
+import sys
+from pathlib import Path
+
+# Moduły core leżą obok pakietu (w src)
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+
+from movie_manager.cli import main
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,321 @@
+"""
+Biblioteka filmów bez okna (np. nocny skan z crona na NAS-ie).
+
+    python -m movie_manager scan FOLDER [--full] [--dry-run]
+    python -m movie_manager enrich [FOLDER] [--limit N] [--dry-run]
+    python -m movie_manager prune [FOLDER] [--older-than DNI] [--dry-run]
+    python -m movie_manager stats
+    python -m movie_manager migrate --from mongo --to sqlite [--sqlite-path PLIK]
+
+Ten sam potok co przycisk Scan (FileScanner -> DataBase -> TMDB), ale bez PyQt:
+szybszy start i mniej pamięci. Backend bazy: zmienna DB_BACKEND (mongo/sqlite).
+--json: jedno zdarzenie JSON na linię na stdout
+(komunikaty modułów core trafiają wtedy na stderr).
+"""
+import os
+import sys
+import json
+import time
+import argparse
+import threading
+import contextlib
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+
+from dotenv import load_dotenv
+
+load_dotenv(Path(__file__).resolve().parents[2] / '.env')
+
+from core import metrics, tracing
+from core.file_scanner import FileScanner
+from core.filename_parser import FilenameParser
+from core.storage import BACKENDS
+
+
+class Output:
+    """Zdarzenia dla człowieka (tekst) albo dla skryptów (JSON lines); bezpieczne dla wątków"""
+    def __init__(self, json_lines=False, stream=None):
+        self.json_lines = json_lines
+        self.stream = stream or sys.stdout
+        self._lock = threading.Lock()
+
+    def emit(self, event, text=None, **data):
+        """text - linia dla człowieka (None = zdarzenie tylko w trybie JSON)"""
+        if self.json_lines:
+            line = json.dumps(dict(event=event, **data), ensure_ascii=False, default=str)
+        elif text is None:
+            return
+        else:
+            line = text
+        with self._lock:
+            self.stream.write(line + "\n")
+            self.stream.flush()
+
+
+def run_cancellable(func):
+    """
+    func(cancel) w wątku roboczym; Ctrl+C ustawia cancel i czeka na porządne zakończenie
+    (zapisane paczki zostają, brakujące pliki nie są sprzątane). Zwraca (wynik, przerwano).
+    """
+    cancel = threading.Event()
+    result, error = {}, []
+
+    def target():
+        try:
+            result['value'] = func(cancel)
+        except BaseException as e:
+            error.append(e)
+
+    worker = threading.Thread(target=target, name="cli-worker", daemon=True)
+    worker.start()
+    while worker.is_alive():
+        try:
+            worker.join(0.2)
+        except KeyboardInterrupt:
+            cancel.set()
+    if error:
+        raise error[0]
+    return result.get('value'), cancel.is_set()
+
+
+def make_enricher(args):
+    from core.tmdb_api import TMDBClient
+    from core.enrichment import TMDBEnricher, TokenBucket
+    client = TMDBClient(pool_size=max(16, args.tmdb_workers))
+    if not client.api_key:
+        raise SystemExit("Brak TMDB_API_KEY (zmienna środowiskowa albo plik .env)")
+    return TMDBEnricher(client, max_workers=args.tmdb_workers, rate_limiter=TokenBucket(rate=args.rate))
+
+
+def open_database(backend=None, **kwargs):
+    from core.storage import open_database as open_backend
+    # Bez kopii biblioteki w pamięci - CLI nie pokazuje listy
+    return open_backend(backend, cache=False, **kwargs)
+
+
+def record_for(path, parser):
+    """Rekord jak ze skanera (bez stat) - dla wzbogacania rekordów już zapisanych w bazie"""
+    title, year, is_tv, episode = parser.analyze(os.path.basename(path))
+    return {'filepath': path, 'title_guess': title, 'year_guess': year,
+            'is_tv_guess': is_tv, 'episode_code': episode}
+
+
+# --- Komendy ---
+
+def cmd_scan(args, out, db):
+    folder = os.path.abspath(args.folder)
+    if not os.path.isdir(folder):
+        raise SystemExit(f"Nie ma katalogu: {folder}")
+    if args.dry_run:
+        return scan_dry_run(args, out, db, folder)
+
+    from core.scan_pipeline import ScanPipeline
+    pipeline = ScanPipeline(db, FileScanner(max_workers=args.workers), make_enricher(args),
+                            batch_size=args.batch_size, soft_delete=not args.hard_delete)
+    last_progress = [0.0]
+
+    def on_event(kind, data):
+        if kind == 'progress':
+            now = time.monotonic()
+            if now - last_progress[0] >= args.progress_interval:
+                last_progress[0] = now
+                out.emit('progress', f"Znaleziono: {data['found']}  Zapisano: {data['inserted']}  "
+                                     f"TMDB: {data['enriched']}  Bez wyniku: {data['failed']}", **data)
+        elif kind == 'stored':
+            for doc in data:
+                out.emit('stored', path=doc['file_path'], title=doc['title_scanned'])
+        elif kind == 'moved':
+            for old_path, new_path in data:
+                out.emit('moved', f"Przeniesiono: {old_path} -> {new_path}", old_path=old_path, path=new_path)
+        elif kind == 'removed':
+            for path in data:
+                out.emit('removed', f"Brak pliku: {path}", path=path)
+
+    summary, interrupted = run_cancellable(lambda cancel: pipeline.run(
+        folder, incremental=not args.full, callback=on_event, cancel=cancel))
+    if not summary['cancelled']:
+        db.add_library_root(folder)
+    out.emit('summary', f"{'Skan przerwany' if summary['cancelled'] else 'Skan zakończony'}: "
+                        f"nowe {summary['added']}, zmienione {summary['modified']}, przeniesione {summary['moved']}, "
+                        f"usunięte {summary['removed']}, bez zmian {summary['unchanged']}, "
+                        f"TMDB {summary['enriched']} (bez wyniku {summary['not_found']})",
+             command='scan', folder=folder, **summary)
+    return 130 if interrupted else 0
+
+
+def scan_dry_run(args, out, db, folder):
+    """Co zmieniłby skan - bez zapisów do bazy i bez zapytań do TMDB"""
+    known_files, known_dirs = db.get_scan_state(folder)
+    scanner = FileScanner(max_workers=args.workers, fingerprints=False)
+    counts = {'added': 0, 'modified': 0, 'moved': 0, 'removed': 0, 'unchanged': 0}
+    for kind, data in scanner.iter_incremental(folder, known_files, None if args.full else known_dirs):
+        if kind == 'done':
+            counts['unchanged'] = data['unchanged']
+        elif kind == 'moved':
+            counts['moved'] += 1
+            out.emit('moved', f"przeniesienie: {data[0]} -> {data[1]['filepath']}",
+                     old_path=data[0], path=data[1]['filepath'])
+        elif kind == 'removed':
+            counts['removed'] += 1
+            out.emit('removed', f"brak pliku: {data}", path=data)
+        else:
+            counts[kind] += 1
+            out.emit(kind, f"{'nowy' if kind == 'added' else 'zmieniony'}: {data['filepath']} "
+                           f"-> {data['title_guess']}{' ' + data['episode_code'] if data['episode_code'] else ''}",
+                     path=data['filepath'], title=data['title_guess'], year=data['year_guess'],
+                     episode=data['episode_code'])
+    out.emit('summary', "Bez zmian w bazie (--dry-run): " + ", ".join(f"{k} {v}" for k, v in counts.items()),
+             command='scan', folder=folder, dry_run=True, **counts)
+    return 0
+
+
+def cmd_enrich(args, out, db):
+    """Ponowne zapytania do TMDB dla rekordów bez dopasowania"""
+    from core.enrichment import TMDBEnricher
+    root = os.path.abspath(args.folder) if args.folder else None
+    parser = FilenameParser()
+    jobs = [(doc['_id'], record_for(doc['file_path'], parser)) for doc in db.iter_unenriched(root, args.limit)]
+
+    if args.dry_run:
+        groups = {}
+        for _, record in jobs:
+            groups.setdefault(TMDBEnricher.group_key(record), []).append(record['filepath'])
+        for (title, year, is_tv), paths in groups.items():
+            out.emit('query', f"{'serial' if is_tv else 'film'}: {title}{f' ({year})' if year else ''} "
+                              f"- plików: {len(paths)}", title=title, year=year, tv=is_tv, files=len(paths))
+        out.emit('summary', f"Rekordów bez danych: {len(jobs)}, zapytań do TMDB: {len(groups)} (--dry-run)",
+                 command='enrich', dry_run=True, records=len(jobs), queries=len(groups))
+        return 0
+
+    enricher = make_enricher(args)
+
+    def on_result(movie_ids, details):
+        if details:
+            out.emit('enriched', f"{details['title']} ({details['release_year']}) - plików: {len(movie_ids)}",
+                     ids=[str(i) for i in movie_ids], title=details['title'], tmdb_id=details['tmdb_id'])
+        else:
+            out.emit('not_found', ids=[str(i) for i in movie_ids])
+
+    (found, missing), interrupted = run_cancellable(
+        lambda cancel: enricher.enrich_into(db, iter(jobs), on_result=on_result, cancel=cancel))
+    out.emit('summary', f"Dopasowano: {found}, bez wyniku: {missing}",
+             command='enrich', records=len(jobs), enriched=found, not_found=missing, cancelled=interrupted)
+    return 130 if interrupted else 0
+
+
+def cmd_prune(args, out, db):
+    """Ostateczne usunięcie rekordów oznaczonych jako brakujące (skan z soft delete)"""
+    root = os.path.abspath(args.folder) if args.folder else None
+    older_than = args.older_than * 24 * 3600
+    if args.dry_run:
+        count = db.count_missing(root, older_than)
+        out.emit('summary', f"Do usunięcia: {count} (--dry-run)", command='prune', dry_run=True, removed=count)
+    else:
+        count = db.purge_missing(root, older_than)
+        out.emit('summary', f"Usunięto: {count}", command='prune', removed=count)
+    return 0
+
+
+def cmd_stats(args, out, db):
+    stats = db.get_stats()
+    types = ", ".join(f"{k}: {v}" for k, v in sorted(stats['by_type'].items()))
+    out.emit('stats', f"Pozycji: {stats['visible']} (w bazie {stats['total']}, brakujących {stats['missing']})\n"
+                      f"Bez danych TMDB: {stats['unenriched']}\nWedług typu: {types}\n"
+                      f"Foldery: {', '.join(stats['roots']) or '-'}", **stats)
+    return 0
+
+
+def cmd_migrate(args, out, db):
+    """Kopia biblioteki między backendami (np. MongoDB -> plik SQLite); powtórzenie nadpisuje rekordy"""
+    from core.storage import migrate
+    if args.source == args.target:
+        raise SystemExit("Źródło i cel migracji to ten sam backend")
+    sqlite = {"path": args.sqlite_path} if args.sqlite_path else {}
+    source = open_database(args.source, **(sqlite if args.source == "sqlite" else {}))
+    target = open_database(args.target, **(sqlite if args.target == "sqlite" else {}))
+
+    result = migrate(source, target, batch_size=args.batch_size,
+                     progress=lambda copied: out.emit('progress', f"Skopiowano: {copied}", copied=copied))
+    out.emit('summary', f"Przeniesiono {result['movies']} rekordów, {result['dirs']} katalogów, "
+                        f"{result['roots']} folderów ({args.source} -> {args.target})",
+             command='migrate', source=args.source, target=args.target, **result)
+    return 0
+
+
+COMMANDS = {"scan": cmd_scan, "enrich": cmd_enrich, "prune": cmd_prune, "stats": cmd_stats, "migrate": cmd_migrate}
+
+
+def build_parser():
+    ap = argparse.ArgumentParser(prog="movie_manager", description=__doc__,
+                                 formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--json", action="store_true", help="zdarzenia jako JSON lines na stdout")
+    ap.add_argument("--trace", metavar="PLIK", help="ślad wykonania (Chrome/Perfetto JSON)")
+    ap.add_argument("--metrics", metavar="PLIK", help="metryki w formacie Prometheusa po zakończeniu")
+    sub = ap.add_subparsers(dest="command", required=True)
+
+    def concurrency(p):
+        p.add_argument("--workers", type=int, default=8, help="równoległe listowanie katalogów")
+        p.add_argument("--tmdb-workers", type=int, default=8, help="równoległe zapytania do TMDB")
+        p.add_argument("--rate", type=float, default=None, help="limit żądań/s do TMDB (domyślnie TMDB_RATE_LIMIT albo 40)")
+
+    p = sub.add_parser("scan", help="skan folderu (przyrostowy) z dopasowaniem w TMDB")
+    p.add_argument("folder")
+    p.add_argument("--full", action="store_true", help="listuj wszystkie katalogi (bez pomijania po mtime)")
+    p.add_argument("--hard-delete", action="store_true", help="usuwaj rekordy brakujących plików zamiast oznaczać")
+    p.add_argument("--batch-size", type=int, default=500)
+    p.add_argument("--progress-interval", type=float, default=2.0, help="co ile sekund zdarzenie postępu")
+    p.add_argument("--dry-run", action="store_true", help="tylko pokaż zmiany (bez zapisu i bez TMDB)")
+    concurrency(p)
+
+    p = sub.add_parser("enrich", help="dopasowanie w TMDB rekordów, które go nie mają")
+    p.add_argument("folder", nargs="?")
+    p.add_argument("--limit", type=int, default=0, help="maks. rekordów (0 = wszystkie)")
+    p.add_argument("--dry-run", action="store_true", help="tylko pokaż zapytania")
+    concurrency(p)
+
+    p = sub.add_parser("prune", help="usuń rekordy plików oznaczonych jako brakujące")
+    p.add_argument("folder", nargs="?")
+    p.add_argument("--older-than", type=float, default=0, help="tylko brakujące dłużej niż tyle dni")
+    p.add_argument("--dry-run", action="store_true", help="tylko policz")
+
+    sub.add_parser("stats", help="liczniki biblioteki")
+
+    p = sub.add_parser("migrate", help="skopiuj bibliotekę do innego backendu bazy")
+    p.add_argument("--from", dest="source", choices=BACKENDS, required=True)
+    p.add_argument("--to", dest="target", choices=BACKENDS, required=True)
+    p.add_argument("--sqlite-path", help="plik SQLite (domyślnie SQLITE_PATH albo ~/.local/share/movie-manager)")
+    p.add_argument("--batch-size", type=int, default=1000)
+    return ap
+
+
+def main(argv=None, db=None):
+    args = build_parser().parse_args(argv)
+    out = Output(json_lines=args.json)
+    if args.trace:
+        tracing.TRACER.start(args.trace)
+    if args.metrics:
+        metrics.REGISTRY.enable()
+
+    # W trybie JSON stdout należy do zdarzeń - komunikaty z core idą na stderr
+    redirect = contextlib.redirect_stdout(sys.stderr) if args.json else contextlib.nullcontext()
+    try:
+        with redirect:
+            # migrate otwiera obie bazy sam (--from / --to)
+            if db is None and args.command != "migrate":
+                db = open_database()
+            with tracing.span(f"cli.{args.command}", cat="cli"):
+                return COMMANDS[args.command](args, out, db)
+    except SystemExit as e:
+        if isinstance(e.code, str):
+            out.emit('error', f"Błąd: {e.code}", message=e.code)
+            return 1
+        raise
+    except Exception as e:
+        out.emit('error', f"Błąd: {e}", message=str(e))
+        return 1
+    finally:
+        if args.metrics:
+            metrics.REGISTRY.write_file(args.metrics)
+        if args.trace:
+            tracing.TRACER.save()
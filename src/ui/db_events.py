@@ -0,0 +1,19 @@
+from PyQt6.QtCore import QObject, pyqtSignal
+
+
+class DbEventBridge(QObject):
+    """
+    Przerzuca powiadomienia o zmianach z DataBase (przychodzą z dowolnego wątku,
+    np. wątku skanowania) do wątku GUI jako sygnał Qt.
+    """
+    changed = pyqtSignal(str, list)  # (rodzaj, dokumenty)
+
+    def __init__(self, db, parent=None):
+        super().__init__(parent)
+        self._unsubscribe = db.subscribe(self._on_change)
+
+    def _on_change(self, kind, docs):
+        self.changed.emit(kind, list(docs))
+
+    def close(self):
+        self._unsubscribe()
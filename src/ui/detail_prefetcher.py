@@ -0,0 +1,51 @@
+import threading
+from PyQt6.QtCore import QThread, pyqtSignal
+
+
+class DetailPrefetcher(QThread):
+    """
+    Pełne dokumenty sąsiednich wierszy (DataBase.get_movie) w tle.
+    Wątek GUI tylko zleca ID (request) - nowe zlecenie zastępuje nieobsłużone, więc
+    szybkie przewijanie nie ustawia zapytań w kolejce. Pobrany dokument zostaje w LRU
+    bazy (kolejne on_select go nie odpytuje), a sygnał loaded oddaje go do prefetchu obrazków.
+    """
+    loaded = pyqtSignal(dict)
+
+    def __init__(self, db, parent=None):
+        super().__init__(parent)
+        self.db = db
+        self._pending = []
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+
+    def request(self, movie_ids):
+        with self._lock:
+            self._pending = [mid for mid in movie_ids if mid is not None]
+        self._wake.set()
+        if not self.isRunning():
+            self.start()
+
+    def stop(self):
+        self.requestInterruption()
+        self._wake.set()
+        self.wait()
+
+    def _next_id(self):
+        with self._lock:
+            return self._pending.pop(0) if self._pending else None
+
+    def run(self):
+        while not self.isInterruptionRequested():
+            self._wake.wait()
+            self._wake.clear()
+            while not self.isInterruptionRequested():
+                movie_id = self._next_id()
+                if movie_id is None:
+                    break
+                try:
+                    doc = self.db.get_movie(movie_id)
+                except Exception as e:
+                    print(f"Błąd wczytywania sąsiedniego filmu: {e}")
+                    continue
+                if doc:
+                    self.loaded.emit(doc)
@@ -0,0 +1,90 @@
+from PyQt6.QtWidgets import (QDialog, QVBoxLayout, QHBoxLayout, QTableWidget, QTableWidgetItem,
+                             QHeaderView, QPushButton, QCheckBox, QFileDialog, QLabel)
+from PyQt6.QtCore import QTimer
+from core import metrics
+
+
+class DiagnosticsPanel(QDialog):
+    """
+    Podgląd metryk (core.metrics) na żywo: liczniki, wartości chwilowe i opóźnienia
+    (liczba, średnia, p50, p99) - odświeżany co sekundę, z eksportem do pliku Prometheusa.
+    """
+    def __init__(self, registry=None, parent=None):
+        super().__init__(parent)
+        self.registry = registry or metrics.REGISTRY
+        self.setWindowTitle("Diagnostyka")
+        self.resize(760, 520)
+
+        layout = QVBoxLayout(self)
+        top = QHBoxLayout()
+        self.enabled_box = QCheckBox("Zbieranie metryk")
+        self.enabled_box.setChecked(self.registry.enabled)
+        self.enabled_box.toggled.connect(self._on_toggled)
+        top.addWidget(self.enabled_box)
+        top.addStretch()
+        self.hint = QLabel("")
+        top.addWidget(self.hint)
+        layout.addLayout(top)
+
+        self.table = QTableWidget(0, 3)
+        self.table.setHorizontalHeaderLabels(["Metryka", "Etykiety", "Wartość"])
+        self.table.horizontalHeader().setSectionResizeMode(0, QHeaderView.ResizeMode.ResizeToContents)
+        self.table.horizontalHeader().setSectionResizeMode(1, QHeaderView.ResizeMode.ResizeToContents)
+        self.table.horizontalHeader().setSectionResizeMode(2, QHeaderView.ResizeMode.Stretch)
+        self.table.verticalHeader().setVisible(False)
+        self.table.setEditTriggers(QTableWidget.EditTrigger.NoEditTriggers)
+        layout.addWidget(self.table)
+
+        buttons = QHBoxLayout()
+        btn_reset = QPushButton("Wyzeruj")
+        btn_reset.clicked.connect(self._on_reset)
+        btn_export = QPushButton("Eksportuj...")
+        btn_export.clicked.connect(self.export)
+        buttons.addWidget(btn_reset)
+        buttons.addWidget(btn_export)
+        layout.addLayout(buttons)
+
+        self.timer = QTimer(self)
+        self.timer.setInterval(1000)
+        self.timer.timeout.connect(self.refresh)
+        self.refresh()
+
+    @staticmethod
+    def format_value(kind, value):
+        if kind != "histogram":
+            return f"{value:g}" if isinstance(value, (int, float)) else str(value)
+        if not value['count']:
+            return "-"
+        mean = value['sum'] / value['count'] * 1000
+        return (f"n={value['count']}  śr. {mean:.2f} ms  "
+                f"p50 {value['p50'] * 1000:.2f} ms  p99 {value['p99'] * 1000:.2f} ms")
+
+    def refresh(self):
+        rows = self.registry.snapshot()
+        self.hint.setText("" if self.registry.enabled else "Wyłączone (METRICS=1 przy starcie)")
+        self.table.setRowCount(len(rows))
+        for row, (name, kind, labels, value) in enumerate(rows):
+            label_text = ", ".join(f"{k}={v}" for k, v in labels.items())
+            for col, text in enumerate((name, label_text, self.format_value(kind, value))):
+                self.table.setItem(row, col, QTableWidgetItem(text))
+
+    def export(self):
+        path, _ = QFileDialog.getSaveFileName(self, "Eksport metryk", "metrics.prom", "Prometheus (*.prom)")
+        if path:
+            self.registry.write_file(path)
+
+    def _on_toggled(self, enabled):
+        self.registry.enable(enabled)
+        self.refresh()
+
+    def _on_reset(self):
+        self.registry.reset()
+        self.refresh()
+
+    def showEvent(self, event):
+        self.timer.start()
+        super().showEvent(event)
+
+    def hideEvent(self, event):
+        self.timer.stop()
+        super().hideEvent(event)
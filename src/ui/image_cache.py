@@ -0,0 +1,124 @@
+from collections import OrderedDict
+from PyQt6.QtCore import QObject, QUrl, pyqtSignal
+from PyQt6.QtGui import QPixmap
+from PyQt6.QtNetwork import QNetworkAccessManager, QNetworkRequest, QNetworkReply
+
+from core.image_store import ImageStore
+from core import tracing
+
+
+class ImageCache(QObject):
+    """
+    Obrazki z TMDB w dwóch warstwach:
+    1. zdekodowane QPixmap w pamięci (LRU z limitem w bajtach),
+    2. skompresowane oryginały na dysku (ImageStore) - przeżywają restart aplikacji.
+    cached(url) odpowiada od razu (bez sieci), fetch(url) pobiera brakujący obrazek
+    i ogłasza go sygnałem loaded. Kilka próśb o ten sam URL to jedno pobranie.
+    Pobrania mogą nieść numer pokolenia (np. kolejnego wyboru w liście) - abort_older
+    przerywa te, które już nikogo nie interesują.
+    """
+    loaded = pyqtSignal(str, QPixmap)
+    failed = pyqtSignal(str)
+
+    def __init__(self, store=None, memory_bytes=96 * 1024 * 1024, parent=None):
+        super().__init__(parent)
+        # store=False - bez cache na dysku (tylko pamięć)
+        self.store = ImageStore() if store is None else (store or None)
+        self.memory_bytes = memory_bytes
+        self._memory = OrderedDict()    # url -> (QPixmap, rozmiar w bajtach)
+        self._memory_used = 0
+        self._pending = {}              # url -> (QNetworkReply, pokolenie)
+        self._fetch_started = {}        # url -> początek pobrania (tylko przy włączonym śladzie)
+        self.network_manager = QNetworkAccessManager(self)
+        self.network_manager.finished.connect(self._on_finished)
+
+    @staticmethod
+    def _pixmap_bytes(pixmap):
+        return pixmap.width() * pixmap.height() * max(pixmap.depth(), 8) // 8
+
+    def _remember(self, url, pixmap):
+        size = self._pixmap_bytes(pixmap)
+        if size > self.memory_bytes:
+            return  # Większy niż cały limit - nie wypychamy dla niego wszystkiego innego
+        old = self._memory.pop(url, None)
+        if old is not None:
+            self._memory_used -= old[1]
+        self._memory[url] = (pixmap, size)
+        self._memory_used += size
+        while self._memory_used > self.memory_bytes:
+            _, (_, evicted) = self._memory.popitem(last=False)
+            self._memory_used -= evicted
+
+    def cached(self, url):
+        """QPixmap z pamięci albo z dysku (dekodowany tu, synchronicznie); None, gdy trzeba pobrać"""
+        entry = self._memory.get(url)
+        if entry is not None:
+            self._memory.move_to_end(url)
+            return entry[0]
+        if self.store is None:
+            return None
+        with tracing.span("image_disk_load", cat="image", url=url):
+            data = self.store.get(url)
+            if data is None:
+                return None
+            pixmap = QPixmap()
+            if not pixmap.loadFromData(data):
+                return None
+        self._remember(url, pixmap)
+        return pixmap
+
+    def contains(self, url):
+        """Czy obrazek jest w pamięci albo na dysku (bez dekodowania)"""
+        return url in self._memory or (self.store is not None and self.store.contains(url))
+
+    def fetch(self, url, generation=None, priority=QNetworkRequest.Priority.NormalPriority):
+        """Pobiera obrazek w tle (wynik przez sygnał loaded/failed)"""
+        pending = self._pending.get(url)
+        if pending is not None:
+            # Już w drodze - przejmuje nowsze pokolenie, żeby abort_older go nie przerwał
+            if generation is not None and (pending[1] is None or pending[1] < generation):
+                self._pending[url] = (pending[0], generation)
+            return
+        req = QNetworkRequest(QUrl(url))
+        req.setAttribute(QNetworkRequest.Attribute.User, url)
+        req.setPriority(priority)
+        self._pending[url] = (self.network_manager.get(req), generation)
+        if tracing.TRACER.enabled:
+            self._fetch_started[url] = tracing.TRACER.now_us()
+
+    def abort_older(self, generation):
+        """Przerywa pobrania z pokoleń starszych niż generation (bez pokolenia - nie rusza)"""
+        stale = [url for url, (_, gen) in self._pending.items() if gen is not None and gen < generation]
+        for url in stale:
+            reply, _ = self._pending.pop(url)
+            reply.abort()
+
+    def _on_finished(self, reply):
+        url = reply.request().attribute(QNetworkRequest.Attribute.User)
+        if url in self._pending and self._pending[url][0] is reply:
+            del self._pending[url]
+        started = self._fetch_started.pop(url, None)
+        if started is not None:
+            tracing.TRACER.complete("image_fetch", started, cat="image", url=url, error=int(reply.error().value))
+        try:
+            if reply.error() == QNetworkReply.NetworkError.OperationCanceledError:
+                return  # Przerwane przez abort_older
+            if reply.error() != QNetworkReply.NetworkError.NoError:
+                self.failed.emit(url)
+                return
+            data = bytes(reply.readAll())
+            pixmap = QPixmap()
+            with tracing.span("image_decode", cat="image", url=url, bytes=len(data)):
+                decoded = pixmap.loadFromData(data)
+            if not decoded:
+                self.failed.emit(url)
+                return
+            if self.store is not None:
+                self.store.put(url, data)
+            self._remember(url, pixmap)
+            self.loaded.emit(url, pixmap)
+        finally:
+            reply.deleteLater()
+
+    def memory_usage(self):
+        return self._memory_used
@@ -0,0 +1,55 @@
+from PyQt6.QtCore import QThread, pyqtSignal
+from core import tracing
+
+
+class LibraryLoader(QThread):
+    """
+    Start aplikacji bez blokowania okna: w tle tworzy backend (import pymongo/requests,
+    połączenie z bazą) i wczytuje listę paczkami (DataBase.iter_movie_batches).
+    Okno maluje się od razu, a wiersze dochodzą do tabeli w trakcie ładowania.
+    Na koniec buduje indeks wyszukiwania (DataBase.search_index) - przy 100k pozycji
+    to kilka sekund, których pierwsze wciśnięcie klawisza w wyszukiwarce nie może płacić.
+
+    backend: gotowa krotka (db, scanner, tmdb) albo funkcja, która ją zwraca
+    (wołana w tym wątku - tu płacimy za importy i konfigurację klientów).
+    """
+    backend_ready = pyqtSignal(object)     # (db, scanner, tmdb)
+    batch_loaded = pyqtSignal(list)        # lekkie dokumenty listy (jak z list_movies)
+    load_finished = pyqtSignal(int)        # liczba wczytanych pozycji
+    load_failed = pyqtSignal(str)
+
+    def __init__(self, backend, batch_size=1000, parent=None):
+        super().__init__(parent)
+        self.backend = backend
+        self.batch_size = batch_size
+
+    @tracing.traced("LibraryLoader.run", cat="startup")
+    def run(self):
+        try:
+            with tracing.span("create_backend", cat="startup"):
+                backend = self.backend() if callable(self.backend) else self.backend
+        except Exception as e:
+            print(f"Błąd inicjalizacji backendu: {e}")
+            self.load_failed.emit(f"Błąd inicjalizacji backendu: {e}")
+            return
+        self.backend_ready.emit(backend)
+
+        db = backend[0]
+        count = 0
+        try:
+            for batch in db.iter_movie_batches(self.batch_size):
+                if self.isInterruptionRequested():
+                    return  # Zamykanie okna w trakcie ładowania
+                count += len(batch)
+                self.batch_loaded.emit(batch)
+        except Exception as e:
+            print(f"Błąd wczytywania biblioteki: {e}")
+            self.load_failed.emit(f"Brak połączenia z bazą: {e}")
+            return
+
+        # Lista jest już w cache - indeks z pamięci, bez zapytań do bazy
+        with tracing.span("search_index", cat="startup"):
+            db.search_index()
+        if self.isInterruptionRequested():
+            return
+        self.load_finished.emit(count)
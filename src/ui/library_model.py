@@ -0,0 +1,220 @@
+from PyQt6.QtCore import Qt, QAbstractTableModel, QModelIndex
+
+
+class LibraryTableModel(QAbstractTableModel):
+    """
+    Model listy biblioteki dla QTableView.
+    Trzyma tylko to, co widać w tabeli (zwarty wiersz na dokument), a tekst komórek
+    powstaje dopiero, gdy widok o niego poprosi - czyli tylko dla widocznych wierszy.
+    Pojedyncze zmiany (nowy plik, poprawka dopasowania) idą przez rowsInserted/dataChanged,
+    bez przebudowy całej tabeli.
+    set_filter(ids) zawęża widok do wyników wyszukiwania - numery wierszy w API
+    (path_at, id_at, row_of_*) dotyczą wtedy widocznych wierszy.
+    """
+    HEADERS = ["TYTUŁ", "ROK"]
+    # Pola wiersza
+    ID, PATH, TITLE, YEAR, EPISODE = range(5)
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._rows = []
+        self._row_of_path = {}
+        self._path_of_id = {}
+        # Wyszukiwanie: zbiór widocznych ID (None = wszystkie) i ich pozycje w _rows
+        self._filter = None
+        self._view = None
+        self._view_pos = None
+
+    # --- API Qt ---
+
+    def rowCount(self, parent=QModelIndex()):
+        if parent.isValid():
+            return 0
+        return len(self._view) if self._view is not None else len(self._rows)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.HEADERS)
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid():
+            return None
+        row = self._row(index.row())
+        if role == Qt.ItemDataRole.DisplayRole:
+            if index.column() == 0:
+                # Doklejanie kodu odcinka (S01E01)
+                if row[self.EPISODE]:
+                    return f"{row[self.TITLE]}   {row[self.EPISODE]}"
+                return row[self.TITLE]
+            return row[self.YEAR]
+        if role == Qt.ItemDataRole.TextAlignmentRole and index.column() == 1:
+            return Qt.AlignmentFlag.AlignCenter
+        return None
+
+    def headerData(self, section, orientation, role=Qt.ItemDataRole.DisplayRole):
+        if role == Qt.ItemDataRole.DisplayRole and orientation == Qt.Orientation.Horizontal:
+            return self.HEADERS[section]
+        return None
+
+    # --- Dostęp do wierszy ---
+
+    def _row(self, row):
+        return self._rows[self._view[row] if self._view is not None else row]
+
+    def _to_view(self, i):
+        """Pozycja w _rows -> numer widocznego wiersza (None, gdy odfiltrowany)"""
+        if i is None or self._view is None:
+            return i
+        return self._view_pos.get(i)
+
+    def path_at(self, row):
+        return self._row(row)[self.PATH] if 0 <= row < self.rowCount() else None
+
+    def id_at(self, row):
+        return self._row(row)[self.ID] if 0 <= row < self.rowCount() else None
+
+    def row_of_path(self, path):
+        return self._to_view(self._row_of_path.get(path))
+
+    def row_of_id(self, movie_id):
+        return self._to_view(self._index_of_id(movie_id))
+
+    def _index_of_id(self, movie_id):
+        """Pozycja w _rows (niezależna od filtra) - do zmian wierszy"""
+        return self._row_of_path.get(self._path_of_id.get(movie_id))
+
+    def contains(self, path):
+        """Czy dokument jest w modelu (także odfiltrowany)"""
+        return path in self._row_of_path
+
+    @classmethod
+    def _make_row(cls, doc):
+        details = doc.get('movie_details') or {}
+        title = details.get('title') or doc.get('title_scanned')
+        return [doc['_id'], doc['file_path'], str(title),
+                str(details.get('release_year', '')), doc.get('episode_code', '')]
+
+    def _reindex(self):
+        self._row_of_path = {r[self.PATH]: i for i, r in enumerate(self._rows)}
+
+    def _rebuild_view(self):
+        if self._filter is None:
+            self._view = self._view_pos = None
+            return
+        self._view = [i for i, r in enumerate(self._rows) if r[self.ID] in self._filter]
+        self._view_pos = {i: n for n, i in enumerate(self._view)}
+
+    def _emit_row_changed(self, i):
+        row = self._to_view(i)
+        if row is not None:
+            self.dataChanged.emit(self.index(row, 0), self.index(row, len(self.HEADERS) - 1))
+
+    # --- Zmiany ---
+
+    def reset(self, docs):
+        """Pełne załadowanie listy (start aplikacji)"""
+        self.beginResetModel()
+        self._rows = [self._make_row(d) for d in docs]
+        self._path_of_id = {r[self.ID]: r[self.PATH] for r in self._rows}
+        self._reindex()
+        self._rebuild_view()
+        self.endResetModel()
+
+    def set_filter(self, ids):
+        """Pokazuje tylko wiersze o podanych ID (None = wszystkie)"""
+        self.beginResetModel()
+        self._filter = ids if ids is None or isinstance(ids, set) else set(ids)
+        self._rebuild_view()
+        self.endResetModel()
+
+    def upsert(self, doc):
+        """
+        Dodaje wiersz albo aktualizuje istniejący (po ID, a potem po ścieżce).
+        Zmiana ścieżki (przeniesienie pliku) aktualizuje też indeks ścieżek.
+        """
+        if 'file_path' not in doc:
+            return  # Niepełny dokument - nie ma czego pokazać
+        row = self._make_row(doc)
+        i = self._index_of_id(row[self.ID])
+        if i is None:
+            i = self._row_of_path.get(row[self.PATH])
+        if i is None:
+            self.append([doc])
+            return
+        old_path = self._rows[i][self.PATH]
+        if old_path != row[self.PATH]:
+            self._row_of_path.pop(old_path, None)
+            self._row_of_path[row[self.PATH]] = i
+        self._rows[i] = row
+        self._path_of_id[row[self.ID]] = row[self.PATH]
+        self._emit_row_changed(i)
+
+    def append(self, docs):
+        """Nowe wiersze na końcu - jedno rowsInserted na całą paczkę"""
+        rows = [self._make_row(d) for d in docs]
+        if not rows:
+            return
+        first = len(self._rows)
+        if self._filter is None:
+            visible = len(rows)
+        else:
+            visible = sum(1 for r in rows if r[self.ID] in self._filter)
+        shown = self.rowCount()
+        if visible:
+            self.beginInsertRows(QModelIndex(), shown, shown + visible - 1)
+        for offset, row in enumerate(rows):
+            self._rows.append(row)
+            self._row_of_path[row[self.PATH]] = first + offset
+            self._path_of_id[row[self.ID]] = row[self.PATH]
+            if self._view is not None and row[self.ID] in self._filter:
+                self._view_pos[first + offset] = len(self._view)
+                self._view.append(first + offset)
+        if visible:
+            self.endInsertRows()
+
+    # Powyżej tylu ciągłych bloków do usunięcia taniej jest przebudować widok (beginResetModel)
+    RESET_AFTER_RUNS = 16
+
+    def remove_paths(self, paths):
+        """
+        Usuwa wiersze: ciągłe bloki widocznych wierszy idą jednym beginRemoveRows na blok
+        (od końca, żeby numery wcześniejszych się nie rozjechały), a _rows jest przepisywane
+        raz na końcu. Przy wielu rozproszonych blokach - jeden reset modelu.
+        """
+        removed = {self._row_of_path[p] for p in paths if p in self._row_of_path}
+        if not removed:
+            return
+        if self._view is None:
+            visible = sorted(removed)
+        else:
+            visible = sorted(self._view_pos[i] for i in removed if i in self._view_pos)
+
+        runs = []
+        for row in visible:
+            if runs and runs[-1][1] == row - 1:
+                runs[-1][1] = row
+            else:
+                runs.append([row, row])
+
+        if len(runs) > self.RESET_AFTER_RUNS:
+            self.beginResetModel()
+            self._drop_rows(removed)
+            self.endResetModel()
+            return
+        for first, last in reversed(runs):
+            self.beginRemoveRows(QModelIndex(), first, last)
+            # Widok kurczy się od razu; pozycje w _rows zostają ważne do _drop_rows
+            if self._view is None:
+                del self._rows[first:last + 1]
+                removed.difference_update(range(first, last + 1))
+            else:
+                del self._view[first:last + 1]
+            self.endRemoveRows()
+        self._drop_rows(removed)
+
+    def _drop_rows(self, removed):
+        """Wyrzuca pozycje z _rows jednym przejściem i odbudowuje indeksy"""
+        if removed:
+            self._rows = [r for i, r in enumerate(self._rows) if i not in removed]
+        self._path_of_id = {r[self.ID]: r[self.PATH] for r in self._rows}
+        self._reindex()
+        self._rebuild_view()
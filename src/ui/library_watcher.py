@@ -0,0 +1,214 @@
+import os
+import time
+from PyQt6.QtCore import QObject, QFileSystemWatcher, QTimer, pyqtSignal
+from ui.scan_worker import ScanWorker
+
+
+class LibraryWatcher(QObject):
+    """
+    Tryb "na żywo": obserwuje foldery biblioteki (QFileSystemWatcher, na Linuksie inotify)
+    i przepuszcza zmienione katalogi przez ten sam ScanPipeline co ręczny skan.
+    - seria zdarzeń (np. klient torrent zapisujący wiele plików) zbiera się w jedną paczkę:
+      paczka startuje po `debounce_ms` ciszy, ale najpóźniej po `max_delay_ms`,
+    - skanowane są tylko zmienione poddrzewa (katalog zmiany jako korzeń skanu), a nie cała biblioteka,
+    - świeżo zapisane pliki są obserwowane jeszcze przez `file_watch_s` sekund - dopisywanie
+      do pliku nie zmienia katalogu, a bez tego zostałby odcisk niepełnego pliku.
+    Obserwowane są katalogi (nie wszystkie pliki) - limit inotify starcza na duże biblioteki.
+    """
+    batch_started = pyqtSignal(str)        # korzeń skanowanego poddrzewa
+    batch_finished = pyqtSignal(dict)      # podsumowanie z ScanPipeline.run + 'folder'
+
+    def __init__(self, db, pipeline, debounce_ms=2000, max_delay_ms=10000, file_watch_s=300, parent=None):
+        super().__init__(parent)
+        self.db = db
+        self.pipeline = pipeline
+        self.debounce_ms = debounce_ms
+        self.max_delay_ms = max_delay_ms
+        self.file_watch_s = file_watch_s
+        self.roots = []
+        self.paused = False
+        self._dirty = set()
+        self._first_dirty = None
+        self._queue = []                   # [(korzeń, zmienione katalogi)]
+        self._files = {}                   # obserwowany plik -> czas dodania
+        self.worker = None
+        self._preempted = None             # paczka przerwana przez set_paused (wróciła do kolejki)
+
+        self.fs_watcher = QFileSystemWatcher(self)
+        self.fs_watcher.directoryChanged.connect(self._on_dir_changed)
+        self.fs_watcher.fileChanged.connect(self._on_file_changed)
+
+        self.timer = QTimer(self)
+        self.timer.setSingleShot(True)
+        self.timer.timeout.connect(self._flush)
+
+    # --- Foldery ---
+
+    def add_root(self, root):
+        root = os.path.normpath(root)
+        if root in self.roots:
+            return
+        self.roots.append(root)
+        self._watch_dirs(root)
+
+    def remove_root(self, root):
+        root = os.path.normpath(root)
+        if root not in self.roots:
+            return
+        self.roots.remove(root)
+        prefix = os.path.join(root, '')
+        paths = [p for p in self.fs_watcher.directories() + self.fs_watcher.files()
+                 if p == root or p.startswith(prefix)]
+        if paths:
+            self.fs_watcher.removePaths(paths)
+        for path in paths:
+            self._files.pop(path, None)
+
+    def _watch_dirs(self, root):
+        """Katalogi znane z poprzedniego skanu (DataBase.get_scan_state) - bez przechodzenia drzewa"""
+        dirs = set(self.db.get_scan_state(root)[1]) | {root}
+        new = sorted(set(p for p in dirs if os.path.isdir(p)) - set(self.fs_watcher.directories()))
+        if new:
+            self.fs_watcher.addPaths(new)
+
+    def _root_of(self, path):
+        for root in self.roots:
+            if path == root or path.startswith(os.path.join(root, '')):
+                return root
+        return None
+
+    # --- Zdarzenia ---
+
+    def _on_dir_changed(self, path):
+        self._mark(path)
+
+    def _on_file_changed(self, path):
+        self._mark(os.path.dirname(path))
+
+    def _mark(self, path):
+        self._dirty.add(os.path.normpath(path))
+        if self._first_dirty is None:
+            self._first_dirty = time.monotonic()
+        # Debounce z górnym limitem - ciągły zapis nie odkłada paczki w nieskończoność
+        remaining = self.max_delay_ms - (time.monotonic() - self._first_dirty) * 1000
+        self.timer.start(max(0, int(min(self.debounce_ms, remaining))))
+
+    def set_paused(self, paused):
+        """
+        Wstrzymanie na czas ręcznego skanu - zdarzenia są zbierane i obsłużone po wznowieniu.
+        Trwająca paczka jest przerywana (czekamy na jej koniec) i wraca na początek kolejki:
+        inaczej pisałaby do bazy równolegle z ręcznym skanem tego samego drzewa, a jego
+        prune_missing mógłby oznaczyć pliki, które paczka dodała już po przejściu skanu.
+        """
+        self.paused = paused
+        if paused and self.worker is not None and self.worker.isRunning():
+            self._enqueue(self.worker.folder, self.worker.changed_dirs, front=True)
+            self._preempted = self.worker
+            self.worker.cancel()
+            self.worker.wait()
+        if not paused and (self._dirty or self._queue):
+            self.timer.start(0)
+
+    # --- Paczki ---
+
+    @staticmethod
+    def group(dirs, roots):
+        """
+        Zmienione katalogi -> {korzeń skanu: zmienione katalogi pod nim}.
+        Usunięty katalog zastępuje najbliższy istniejący rodzic (w obrębie folderu biblioteki),
+        katalogi zagnieżdżone w innym zmienionym skanuje skan rodzica.
+        """
+        existing = set()
+        for path in dirs:
+            root = next((r for r in roots if path == r or path.startswith(os.path.join(r, ''))), None)
+            if root is None:
+                continue
+            while path != root and not os.path.isdir(path):
+                path = os.path.dirname(path)
+            # Zniknął cały folder biblioteki (np. odmontowany dysk) - nie ma czego skanować
+            if os.path.isdir(path):
+                existing.add(path)
+
+        groups = {}
+        for path in sorted(existing):
+            parent = next((g for g in groups if path.startswith(os.path.join(g, ''))), None)
+            if parent is None:
+                groups[path] = [path]
+            else:
+                groups[parent].append(path)
+        return groups
+
+    def _flush(self):
+        if self.paused or (self.worker is not None and self.worker.isRunning()):
+            return
+        if self._dirty:
+            groups = self.group(self._dirty, self.roots)
+            self._dirty.clear()
+            self._first_dirty = None
+            for folder, changed in groups.items():
+                self._enqueue(folder, changed)
+        self._expire_files()
+        if self._queue:
+            self._start(*self._queue.pop(0))
+
+    def _enqueue(self, folder, changed_dirs, front=False):
+        """Poddrzewo do skanu; już czekające dostaje dodatkowe zmienione katalogi"""
+        for queued, queued_dirs in self._queue:
+            if queued == folder:
+                queued_dirs.extend(d for d in changed_dirs if d not in queued_dirs)
+                return
+        entry = (folder, list(changed_dirs))
+        if front:
+            self._queue.insert(0, entry)
+        else:
+            self._queue.append(entry)
+
+    def _start(self, folder, changed_dirs):
+        # Jeden skan naraz - kolejne poddrzewa czekają w kolejce
+        worker = self.worker = ScanWorker(self.pipeline, folder, changed_dirs=changed_dirs, parent=self)
+        worker.files_stored.connect(self._watch_files)
+        worker.scan_finished.connect(lambda summary: self._on_finished(worker, summary))
+        worker.scan_failed.connect(lambda message: self._on_finished(worker, {'error': message}))
+        self.batch_started.emit(folder)
+        worker.start()
+
+    def _on_finished(self, worker, summary):
+        worker.wait()
+        worker.deleteLater()
+        if self.worker is worker:
+            self.worker = None
+        folder = worker.folder
+        # Nowe podkatalogi (np. folder nowego sezonu) też trafiają pod obserwację
+        if self._root_of(folder) is not None:
+            self._watch_dirs(folder)
+        # Paczka przerwana przez set_paused czeka w kolejce - jej wynik nie jest ostateczny
+        if worker is self._preempted:
+            self._preempted = None
+        else:
+            self.batch_finished.emit(dict(summary, folder=folder))
+        if self._queue or self._dirty:
+            self.timer.start(0)
+
+    def _watch_files(self, paths):
+        now = time.monotonic()
+        new = [p for p in paths if p not in self._files and self._root_of(p) is not None]
+        for path in paths:
+            self._files[path] = now
+        if new:
+            self.fs_watcher.addPaths(new)
+
+    def _expire_files(self):
+        cutoff = time.monotonic() - self.file_watch_s
+        old = [p for p, added in self._files.items() if added < cutoff]
+        for path in old:
+            del self._files[path]
+        if old:
+            self.fs_watcher.removePaths(old)
+
+    def stop(self):
+        self.timer.stop()
+        self._queue.clear()
+        self._dirty.clear()
+        if self.worker is not None and self.worker.isRunning():
+            self.worker.cancel()
+            self.worker.wait()
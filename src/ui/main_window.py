@@ -1,20 +1,59 @@
 import re
 from PyQt6.QtWidgets import (QMainWindow, QWidget, QHBoxLayout, QVBoxLayout, 
-                             QPushButton, QTableWidget, QTableWidgetItem, 
+                             QPushButton, QTableView, 
                              QHeaderView, QFileDialog, QApplication, QFrame,
-                             QMenu, QInputDialog)
-from PyQt6.QtCore import Qt
+                             QMenu, QInputDialog, QLabel, QLineEdit)
+from PyQt6.QtCore import Qt, QTimer
+from PyQt6.QtGui import QShortcut, QKeySequence
 from ui.movie_tile import MovieTile
+from ui.library_model import LibraryTableModel
+from ui.scan_worker import ScanWorker
+from ui.library_watcher import LibraryWatcher
+from ui.library_loader import LibraryLoader
+from ui.detail_prefetcher import DetailPrefetcher
+from ui.db_events import DbEventBridge
 from core.vlc_player import VLCPlayer
+from core.enrichment import TMDBEnricher
+from core.scan_pipeline import ScanPipeline
+from core import tracing
 
 class MovieLibrary(QMainWindow):
-    def __init__(self, db, scanner, tmdb):
+    def __init__(self, db=None, scanner=None, tmdb=None, backend=None):
+        """
+        MovieLibrary(db, scanner, tmdb) - gotowy backend.
+        MovieLibrary(backend=funkcja) - funkcja zwraca (db, scanner, tmdb) i jest wołana w tle
+        (LibraryLoader), więc okno maluje się przed importem pymongo i połączeniem z bazą.
+        W obu przypadkach lista wczytuje się paczkami po pokazaniu okna.
+        """
         super().__init__()
-        self.db = db
-        self.scanner = scanner
-        self.tmdb = tmdb
+        self.db = self.scanner = self.tmdb = None
+        self.enricher = self.pipeline = self.watcher = self.db_events = None
+        self.scan_worker = None
+        self.loader = self.prefetcher = None
+        self.library_ready = False
         self.vlc = VLCPlayer()
         self.init_ui()
+        self._backend = backend
+        if backend is None:
+            self._attach_backend((db, scanner, tmdb))
+        QTimer.singleShot(0, self.load_library)
+
+    def _attach_backend(self, backend):
+        self.db, self.scanner, self.tmdb = backend
+        self.enricher = TMDBEnricher(self.tmdb)
+        self.pipeline = ScanPipeline(self.db, self.scanner, self.enricher)
+        # Tryb "na żywo" - zmiany w folderach biblioteki trafiają do bazy bez ręcznego skanu
+        self.watcher = LibraryWatcher(self.db, self.pipeline, parent=self)
+        self.watcher.batch_started.connect(self._on_watch_started)
+        self.watcher.batch_finished.connect(self._on_watch_finished)
+        # Zmiany w bazie (skan, poprawki, inne procesy) trafiają prosto do modelu tabeli
+        self.db_events = DbEventBridge(self.db, self)
+        self.db_events.changed.connect(self._on_db_changed)
+        # Sąsiednie wiersze zaznaczenia - pełne dokumenty dociągane w tle
+        self.prefetcher = DetailPrefetcher(self.db, parent=self)
+        self.prefetcher.loaded.connect(self._on_neighbour_loaded)
+        # Scan i Watch dopiero po wczytaniu listy (_on_load_finished): zapis w trakcie ładowania
+        # trafiłby tylko do modelu, a cache dostałby migawkę kursora bez tej zmiany
 
     def init_ui(self):
         self.setWindowTitle("Biblioteka filmów")
@@ -33,131 +72,265 @@ class MovieLibrary(QMainWindow):
         left_panel.setObjectName("sidebar")
         left_layout = QVBoxLayout(left_panel)
         left_layout.setContentsMargins(20, 40, 20, 20)
+
+        # Wyszukiwanie - indeks w pamięci, filtr przy każdym klawiszu
+        self.search_box = QLineEdit()
+        self.search_box.setObjectName("search_box")
+        self.search_box.setPlaceholderText("Szukaj...  (rok:1999  typ:serial  gatunek:dramat)")
+        self.search_box.setClearButtonEnabled(True)
+        self.search_box.textChanged.connect(self.apply_search)
+        left_layout.addWidget(self.search_box)
+
+        # Po zmianach w bazie wynik wyszukiwania liczymy od nowa, ale nie przy każdej paczce skanu
+        self.research_timer = QTimer(self)
+        self.research_timer.setSingleShot(True)
+        self.research_timer.setInterval(300)
+        self.research_timer.timeout.connect(lambda: self.apply_search(self.search_box.text()))
         
-        self.table = QTableWidget(0, 3) 
-        self.table.setHorizontalHeaderLabels(["TYTUŁ", "ROK", "PATH"])
-        self.table.setColumnHidden(2, True)
+        # Widok nad modelem - wiersze renderowane na żądanie, ścieżka siedzi w modelu
+        self.model = LibraryTableModel(self)
+        self.table = QTableView()
+        self.table.setModel(self.model)
         
         header = self.table.horizontalHeader()
         header.setSectionResizeMode(0, QHeaderView.ResizeMode.Stretch)
         header.setSectionResizeMode(1, QHeaderView.ResizeMode.Fixed)
         self.table.setColumnWidth(1, 90)
         
-        self.table.setSelectionBehavior(QTableWidget.SelectionBehavior.SelectRows)
+        self.table.setSelectionBehavior(QTableView.SelectionBehavior.SelectRows)
+        self.table.setSelectionMode(QTableView.SelectionMode.SingleSelection)
         self.table.setShowGrid(False)
         self.table.setFocusPolicy(Qt.FocusPolicy.NoFocus)
         self.table.verticalHeader().setVisible(False)
-        self.table.itemSelectionChanged.connect(self.on_select)
+        # Stała wysokość wierszy - widok nie musi mierzyć 60k wierszy
+        self.table.verticalHeader().setSectionResizeMode(QHeaderView.ResizeMode.Fixed)
+        # Przy przytrzymanej strzałce zaznaczenie zmienia się co kilkadziesiąt ms -
+        # szczegóły i obrazki ładujemy dopiero, gdy się zatrzyma
+        self.select_timer = QTimer(self)
+        self.select_timer.setSingleShot(True)
+        self.select_timer.setInterval(60)
+        self.select_timer.timeout.connect(self.on_select)
+        self.table.selectionModel().selectionChanged.connect(self.select_timer.start)
         
         self.table.setContextMenuPolicy(Qt.ContextMenuPolicy.CustomContextMenu)
         self.table.customContextMenuRequested.connect(self.open_context_menu)
         
         left_layout.addWidget(self.table)
+
+        # Postęp skanowania w tle
+        self.scan_status = QLabel("")
+        self.scan_status.setObjectName("scan_status")
+        self.scan_status.setVisible(False)
+        left_layout.addWidget(self.scan_status)
         
         btn_layout = QHBoxLayout()
         self.btn_scan = QPushButton("Scan")
+        self.btn_scan.setEnabled(False)  # do czasu utworzenia backendu
         self.btn_scan.clicked.connect(self.scan)
         self.btn_play = QPushButton("Play")
         self.btn_play.setObjectName("play_btn")
         self.btn_play.clicked.connect(self.play)
         
+        self.btn_watch = QPushButton("Obserwuj")
+        self.btn_watch.setCheckable(True)
+        self.btn_watch.setEnabled(False)
+        self.btn_watch.toggled.connect(self.toggle_watch)
+        
         btn_layout.addWidget(self.btn_scan)
+        btn_layout.addWidget(self.btn_watch)
         btn_layout.addWidget(self.btn_play)
         left_layout.addLayout(btn_layout)
 
+        # Diagnostyka (metryki skanu, TMDB i bazy) pod F12
+        self.diagnostics = None
+        QShortcut(QKeySequence("F12"), self, activated=self.show_diagnostics)
+
         self.tile = MovieTile()
         layout.addWidget(left_panel, 35) 
         layout.addWidget(self.tile, 65)
-        
-        self.refresh()
+
+    # --- Wczytywanie biblioteki (w tle, po pokazaniu okna) ---
+
+    def load_library(self):
+        if self.loader is not None:
+            return
+        self.scan_status.setText("Wczytywanie biblioteki...")
+        self.scan_status.setVisible(True)
+        source = self._backend if self.db is None else (self.db, self.scanner, self.tmdb)
+        self.loader = LibraryLoader(source, parent=self)
+        if self.db is None:
+            self.loader.backend_ready.connect(self._attach_backend)
+        self.loader.batch_loaded.connect(self._on_batch_loaded)
+        self.loader.load_finished.connect(self._on_load_finished)
+        self.loader.load_failed.connect(self._on_load_failed)
+        self.loader.start()
+
+    def _on_batch_loaded(self, docs):
+        # Pliki dodane w trakcie ładowania mogły już przyjść z powiadomień o zmianach
+        self.model.append([d for d in docs if not self.model.contains(d['file_path'])])
+
+    def _on_load_finished(self, count):
+        # Sygnał przychodzi kolejką - wątek ładowania może jeszcze formalnie trwać (isRunning)
+        self.library_ready = True
+        self.btn_scan.setEnabled(True)
+        self.btn_watch.setEnabled(True)
+        if not (self.scan_worker and self.scan_worker.isRunning()):
+            self.scan_status.setVisible(False)
+        if self.search_box.text().strip():
+            self.apply_search(self.search_box.text())
+
+    def _on_load_failed(self, message):
+        self.scan_status.setText(message)
+        self.scan_status.setVisible(True)
+
+    def _loading(self):
+        return not self.library_ready
 
     def scan(self):
+        # Drugi klik w trakcie skanu = anulowanie
+        if self.scan_worker and self.scan_worker.isRunning():
+            self.scan_worker.cancel()
+            self.btn_scan.setEnabled(False)
+            self.btn_scan.setText("Anulowanie...")
+            return
+
         folder = QFileDialog.getExistingDirectory(self, "Wybierz folder")
         if not folder: return
-        QApplication.setOverrideCursor(Qt.CursorShape.WaitCursor)
-        try:
-            # 1. Pobierz aktualną listę plików z dysku
-            found_files = self.scanner.scan_folder(folder)
-            
-            # --- MODUŁ SPRZĄTAJĄCY (NOWOŚĆ) ---
-            # Tworzymy zbiór ścieżek, które fizycznie istnieją
-            found_paths = {f['filepath'] for f in found_files}
-            
-            # Pobieramy wszystko z bazy
-            all_db_movies = self.db.get_all_movies()
-            
-            for movie in all_db_movies:
-                db_path = movie['file_path']
-                
-                # Sprawdzamy tylko pliki, które powinny być w skanowanym folderze
-                if db_path.startswith(folder):
-                    # Jeśli plik jest w bazie, ale nie ma go na liście znalezionych -> USUŃ
-                    if db_path not in found_paths:
-                        self.db.collection.delete_one({'_id': movie['_id']})
-                        print(f"Usunieto nieistniejacy plik: {db_path}")
-
-            # 2. Standardowe dodawanie/aktualizacja
-            for f in found_files:
-                mid = self.db.add_movie(f['filepath'], f['title_guess'])
-                if mid:
-                    # Aktualizacja kodu odcinka
-                    if f.get('episode_code'):
-                        self.db.collection.update_one(
-                            {'_id': mid}, 
-                            {'$set': {'episode_code': f['episode_code']}}
-                        )
-                    
-                    print(f"Szukam: '{f['title_guess']}' (Serial? {f.get('is_tv_guess')})")
-                    
-                    data = self.tmdb.search_smart(
-                        f['title_guess'], 
-                        f.get('year_guess'), 
-                        f.get('is_tv_guess')
-                    )
-                    
-                    if data:
-                        print(f"   Znaleziono: {data['title']} [{data['type'].upper()}]")
-                        self.db.update_movie_details(mid, data, data['tmdb_id'])
-        finally:
-            QApplication.restoreOverrideCursor()
+
+        with tracing.span("MovieLibrary.scan", cat="ui", folder=folder):
+            # Skan przyrostowy w tle: tylko zmiany od ostatniego skanu tego folderu
+            self.scan_worker = ScanWorker(self.pipeline, folder, parent=self)
+            self.scan_worker.progress.connect(self._on_scan_progress)
+            self.scan_worker.scan_finished.connect(self._on_scan_finished)
+            self.scan_worker.scan_failed.connect(self._on_scan_failed)
+
+            # Ręczny skan i obserwowanie nie skanują naraz - zdarzenia poczekają,
+            # a trwająca paczka obserwowania jest przerywana i powtórzona po skanie
+            self.watcher.set_paused(True)
+            self.btn_scan.setText("Stop")
+            self.scan_status.setText("Skanowanie...")
+            self.scan_status.setVisible(True)
+            self.scan_worker.start()
+
+    def _on_scan_progress(self, p):
+        self.scan_status.setText(
+            f"Znaleziono: {p['found']}  |  Zapisano: {p['inserted']}  |  "
+            f"TMDB: {p['enriched']}  |  Bez wyniku: {p['failed']}"
+        )
+
+    @tracing.traced("MovieLibrary._on_db_changed", cat="ui")
+    def _on_db_changed(self, kind, docs):
+        if kind == 'insert':
+            self.model.append([d for d in docs if not self.model.contains(d['file_path'])])
+        elif kind == 'update':
+            for doc in docs:
+                self.model.upsert(doc)
+        elif kind == 'delete':
+            self.model.remove_paths([d['file_path'] for d in docs])
+        elif kind == 'reset':
             self.refresh()
+        if self.search_box.text().strip():
+            self.research_timer.start()
+
+    def _on_scan_finished(self, summary):
+        print(f"Skan zakończony: {summary}")
+        status = "Skan przerwany" if summary.get('cancelled') else "Skan zakończony"
+        self.scan_status.setText(
+            f"{status}: nowe {summary['added']}, zmienione {summary['modified']}, "
+            f"przeniesione {summary['moved']}, usunięte {summary['removed']}"
+        )
+        if not summary.get('cancelled'):
+            # Zeskanowany folder staje się folderem biblioteki (obserwowanym w trybie "na żywo")
+            self.db.add_library_root(self.scan_worker.folder)
+            if self.btn_watch.isChecked():
+                self.watcher.add_root(self.scan_worker.folder)
+        self._reset_scan_button()
+
+    def _on_scan_failed(self, message):
+        self.scan_status.setText(f"Błąd skanowania: {message}")
+        self._reset_scan_button()
+
+    def _reset_scan_button(self):
+        self.btn_scan.setEnabled(True)
+        self.btn_scan.setText("Scan")
+        self.watcher.set_paused(False)
+
+    def toggle_watch(self, enabled):
+        if enabled:
+            roots = self.db.get_library_roots()
+            for root in roots:
+                self.watcher.add_root(root)
+            self.scan_status.setText(
+                f"Obserwowane foldery: {len(roots)}" if roots else "Brak folderów - najpierw zeskanuj folder"
+            )
+        else:
+            for root in list(self.watcher.roots):
+                self.watcher.remove_root(root)
+            self.watcher.stop()
+            self.scan_status.setText("Obserwowanie wyłączone")
+        self.scan_status.setVisible(True)
 
+    def _on_watch_started(self, folder):
+        self.scan_status.setText(f"Zmiany w: {folder}")
+        self.scan_status.setVisible(True)
+
+    def _on_watch_finished(self, summary):
+        if 'error' in summary:
+            self.scan_status.setText(f"Błąd obserwowania: {summary['error']}")
+            return
+        self.scan_status.setText(
+            f"Na żywo: nowe {summary['added']}, zmienione {summary['modified']}, "
+            f"przeniesione {summary['moved']}, usunięte {summary['removed']}"
+        )
+
+    def show_diagnostics(self):
+        if self.diagnostics is None:
+            # Import dopiero przy pierwszym otwarciu - panel nie jest potrzebny do startu
+            from ui.diagnostics_panel import DiagnosticsPanel
+            self.diagnostics = DiagnosticsPanel(parent=self)
+        self.diagnostics.show()
+        self.diagnostics.raise_()
+
+    @tracing.traced("MovieLibrary.refresh", cat="ui")
     def refresh(self):
-        self.table.setRowCount(0)
-        movies = self.db.get_all_movies()
-        for m in movies:
-            row = self.table.rowCount()
-            self.table.insertRow(row)
-            details = m.get('movie_details', {})
-            
-            title = details.get('title') or m.get('title_scanned')
-            year = details.get('release_year', '')
-            
-            # Doklejanie kodu odcinka (S01E01)
-            ep_code = m.get('episode_code', '')
-            display_title = str(title)
-            if ep_code:
-                display_title += f"   {ep_code}"
-
-            self.table.setItem(row, 0, QTableWidgetItem(display_title))
-            
-            item_year = QTableWidgetItem(str(year))
-            item_year.setTextAlignment(Qt.AlignmentFlag.AlignCenter)
-            self.table.setItem(row, 1, item_year)
-            self.table.setItem(row, 2, QTableWidgetItem(m['file_path']))
+        self.model.reset(self.db.list_movies())
+
+    @tracing.traced("MovieLibrary.apply_search", cat="ui")
+    def apply_search(self, text):
+        if not text.strip():
+            self.model.set_filter(None)
+            return
+        if self.db is None or self._loading():
+            return  # Wyszukanie po wczytaniu listy (_on_load_finished)
+        # Indeks zbudowany w wątku ładowania (LibraryLoader), potem aktualizuje się sam
+        self.model.set_filter(self.db.search_index().search(text))
 
+    def _selected_row(self):
+        rows = self.table.selectionModel().selectedRows()
+        return rows[0].row() if rows else None
+
+    @tracing.traced("MovieLibrary.on_select", cat="ui")
     def on_select(self):
-        sel = self.table.selectedItems()
-        if not sel: return
-        path = self.table.item(sel[0].row(), 2).text()
-        doc = self.db.collection.find_one({"file_path": path})
-        if doc: self.tile.update_info(doc)
+        row = self._selected_row()
+        if row is None: return
+        # Pełny dokument (LRU w DataBase albo jedno zapytanie po _id)
+        doc = self.db.get_movie(self.model.id_at(row))
+        if not doc: return
+        self.tile.update_info(doc)
+
+        # Sąsiednie wiersze - dokumenty z bazy w tle (DetailPrefetcher), potem obrazki
+        self.prefetcher.request([self.model.id_at(row + 1), self.model.id_at(row - 1)])
+
+    def _on_neighbour_loaded(self, doc):
+        # Zaznaczenie mogło już pójść dalej - obrazki tylko dla obecnych sąsiadów
+        row = self._selected_row()
+        if row is not None and doc['_id'] in (self.model.id_at(row + 1), self.model.id_at(row - 1)):
+            self.tile.prefetch(doc)
 
     def play(self):
-        sel = self.table.selectedItems()
-        if sel:
-            path = self.table.item(sel[0].row(), 2).text()
-            self.vlc.play(path)
+        row = self._selected_row()
+        if row is not None:
+            self.vlc.play(self.model.path_at(row))
 
     def open_context_menu(self, position):
         menu = QMenu()
@@ -166,10 +339,10 @@ class MovieLibrary(QMainWindow):
         if action == fix_action: self.fix_match()
 
     def fix_match(self):
-        sel = self.table.selectedItems()
-        if not sel: return
-        row = sel[0].row()
-        file_path = self.table.item(row, 2).text()
+        row = self._selected_row()
+        if row is None or self._loading(): return
+        file_path = self.model.path_at(row)
+        movie_id = self.model.id_at(row)
         
         tmdb_id, ok = QInputDialog.getText(self, "Napraw", 
             "Podaj ID")
@@ -185,16 +358,25 @@ class MovieLibrary(QMainWindow):
                 data = self.tmdb.get_smart_by_id(tmdb_id.strip(), prefer_tv=looks_like_tv)
                 
                 if data:
-                    doc = self.db.collection.find_one({"file_path": file_path})
-                    self.db.update_movie_details(doc['_id'], data, data['tmdb_id'])
+                    # Wiersz tabeli odświeży się z powiadomienia o zmianie
+                    self.db.update_movie_details(movie_id, data, data['tmdb_id'])
                     print(f"Naprawiono na: {data['title']} ({data['type']})")
                 else:
                     print("Nie znaleziono ID")
             finally:
                 QApplication.restoreOverrideCursor()
-                self.refresh()
                 self.on_select()
 
     def closeEvent(self, event):
+        if self.loader is not None:
+            self.loader.requestInterruption()
+            self.loader.wait()
+        if self.prefetcher is not None:
+            self.prefetcher.stop()
+        if self.watcher is not None:
+            self.watcher.stop()
+        if self.scan_worker and self.scan_worker.isRunning():
+            self.scan_worker.cancel()
+            self.scan_worker.wait()
         self.vlc.stop()
         event.accept()
\ No newline at end of file
@@ -1,15 +1,31 @@
 from PyQt6.QtWidgets import QWidget, QVBoxLayout, QLabel, QHBoxLayout
 from PyQt6.QtGui import QPixmap, QPainter, QColor, QBrush, QLinearGradient
-from PyQt6.QtCore import Qt, QUrl, QRect
-from PyQt6.QtNetwork import QNetworkAccessManager, QNetworkRequest, QNetworkReply
+from PyQt6.QtCore import Qt, QRect, QSize, QTimer
+from PyQt6.QtNetwork import QNetworkRequest
+
+from ui.image_cache import ImageCache
+from core import tracing
 
 class MovieTile(QWidget):
-    def __init__(self):
+    def __init__(self, image_cache=None):
         super().__init__()
-        self.network_manager = QNetworkAccessManager()
-        self.network_manager.finished.connect(self._on_image_loaded)
-        
-        self.backdrop_pixmap = None 
+        # Plakaty i tła z cache (pamięć + dysk) - powrót do oglądanego tytułu nie pobiera ich znowu
+        self.image_cache = image_cache or ImageCache(parent=self)
+        self.image_cache.loaded.connect(self._on_image_loaded)
+
+        # Tło gotowe do narysowania: przeskalowane do rozmiaru widżetu, z nałożonym gradientem.
+        # Oryginał (1280 px) nie jest tu trzymany - w razie potrzeby wraca z ImageCache.
+        self._render = None
+        self.poster_url = None
+        self.backdrop_url = None
+        # Numer kolejnego wyświetlanego filmu - pobrania dla poprzednich są przerywane
+        self.generation = 0
+
+        # Przy przeciąganiu okna skalujemy dopiero, gdy rozmiar przestanie się zmieniać
+        self._resize_timer = QTimer(self)
+        self._resize_timer.setSingleShot(True)
+        self._resize_timer.setInterval(120)
+        self._resize_timer.timeout.connect(self._rebuild_render)
         self.init_ui()
 
     def init_ui(self):
@@ -72,33 +88,73 @@ class MovieTile(QWidget):
 
         self.layout.addWidget(content_widget)
 
-    def paintEvent(self, event):
-        """Rysowanie tła (Backdrop) z przyciemnieniem"""
-        painter = QPainter(self)
+    def _pixel_size(self):
+        ratio = self.devicePixelRatioF()
+        return QSize(round(self.width() * ratio), round(self.height() * ratio))
+
+    @tracing.traced("MovieTile._rebuild_render", cat="ui")
+    def _rebuild_render(self, source=None):
+        """Składa tło raz: czarna baza + przycięty backdrop + gradient (Vignette)"""
+        if source is None and self.backdrop_url:
+            source = self.image_cache.cached(self.backdrop_url)
+            if source is None:
+                self.image_cache.fetch(self.backdrop_url, self.generation)  # Wypadł z cache - dorysujemy po pobraniu
+
+        size = self._pixel_size()
+        if size.isEmpty():
+            self._render = None
+            return
+        render = QPixmap(size)
+        render.setDevicePixelRatio(self.devicePixelRatioF())
+        width, height = self.width(), self.height()
+
+        painter = QPainter(render)
         painter.setRenderHint(QPainter.RenderHint.Antialiasing)
 
         # 1. Czarne tło bazowe
-        painter.fillRect(self.rect(), QColor("#050505"))
+        painter.fillRect(0, 0, width, height, QColor("#050505"))
 
-        # 2. Rysuj obraz tła (jeśli jest)
-        if self.backdrop_pixmap and not self.backdrop_pixmap.isNull():
-            scaled = self.backdrop_pixmap.scaled(self.size(), Qt.AspectRatioMode.KeepAspectRatioByExpanding, Qt.TransformationMode.SmoothTransformation)
-            
+        # 2. Obraz tła (jeśli jest) - skalowany tylko tutaj, nie przy każdym odświeżeniu
+        if source is not None and not source.isNull():
+            scaled = source.scaled(size, Qt.AspectRatioMode.KeepAspectRatioByExpanding, Qt.TransformationMode.SmoothTransformation)
+            scaled.setDevicePixelRatio(self.devicePixelRatioF())
             # Wyśrodkowanie cropa
-            x = (self.width() - scaled.width()) // 2
-            y = (self.height() - scaled.height()) // 2
-            painter.drawPixmap(x, y, scaled)
+            x = (width - scaled.width() / self.devicePixelRatioF()) / 2
+            y = (height - scaled.height() / self.devicePixelRatioF()) / 2
+            painter.drawPixmap(round(x), round(y), scaled)
 
         # 3. PROFESJONALNY GRADIENT (Vignette)
         # Przyciemniamy dół (tam gdzie tekst) i górę
-        gradient = QLinearGradient(0, 0, 0, self.height())
+        gradient = QLinearGradient(0, 0, 0, height)
         gradient.setColorAt(0.0, QColor(0, 0, 0, 100))   # Góra - lekko ciemna
         gradient.setColorAt(0.4, QColor(0, 0, 0, 50))    # Środek - jasny (widać obraz)
         gradient.setColorAt(0.8, QColor(0, 0, 0, 220))   # Dół - ciemny (pod tekst)
         gradient.setColorAt(1.0, QColor(0, 0, 0, 255))   # Sam dół - czarny
-        
-        painter.fillRect(self.rect(), QBrush(gradient))
+        painter.fillRect(0, 0, width, height, QBrush(gradient))
+        painter.end()
+
+        self._render = render
+        self.update()
+
+    def resizeEvent(self, event):
+        super().resizeEvent(event)
+        if self._render is not None and self._render.size() != self._pixel_size():
+            self._resize_timer.start()
 
+    def paintEvent(self, event):
+        """Rysowanie tła (Backdrop) - jedno kopiowanie gotowej bitmapy"""
+        if self._render is None:
+            self._rebuild_render()
+            if self._render is None:
+                return
+        painter = QPainter(self)
+        if self._render.size() == self._pixel_size():
+            painter.drawPixmap(0, 0, self._render)
+        else:
+            # W trakcie zmiany rozmiaru - szybkie rozciągnięcie starej bitmapy, dokładne skalowanie po debounce
+            painter.drawPixmap(self.rect(), self._render)
+
+    @tracing.traced("MovieTile.update_info", cat="ui")
     def update_info(self, movie_doc):
         details = movie_doc.get('movie_details', {})
         
@@ -133,35 +189,41 @@ class MovieTile(QWidget):
 
         # Reset
         self.poster_label.clear()
-        self.backdrop_pixmap = None
-        self.update() # Odśwież tło
-
-        if poster_url:
-            req = QNetworkRequest(QUrl(poster_url))
-            req.setAttribute(QNetworkRequest.Attribute.User, "poster")
-            self.network_manager.get(req)
-        
-        if backdrop_url:
-            req = QNetworkRequest(QUrl(backdrop_url))
-            req.setAttribute(QNetworkRequest.Attribute.User, "backdrop")
-            self.network_manager.get(req)
-
-    def _on_image_loaded(self, reply):
-        if reply.error() == QNetworkReply.NetworkError.NoError:
-            data = reply.readAll()
-            pixmap = QPixmap()
-            pixmap.loadFromData(data)
-            
-            req_type = reply.request().attribute(QNetworkRequest.Attribute.User)
-
-            if req_type == "poster":
-                self.poster_label.setPixmap(pixmap.scaled(
-                    self.poster_label.size(),
-                    Qt.AspectRatioMode.KeepAspectRatioByExpanding,
-                    Qt.TransformationMode.SmoothTransformation
-                ))
-            elif req_type == "backdrop":
-                self.backdrop_pixmap = pixmap
-                self.update() # Wywołuje paintEvent
-        
-        reply.deleteLater()
\ No newline at end of file
+        self.poster_url = poster_url
+        self.backdrop_url = backdrop_url
+        self.generation += 1
+        self._rebuild_render(source=QPixmap())  # Samo tło z gradientem do czasu przyjścia obrazka
+
+        # Trafienia w cache rysujemy od razu, resztę pobieramy w tle
+        for url in (poster_url, backdrop_url):
+            if not url:
+                continue
+            pixmap = self.image_cache.cached(url)
+            if pixmap is not None:
+                self._show_image(url, pixmap)
+            else:
+                # Prefetch tego obrazka (poprzednie pokolenie) przejmuje nowe i nie zostanie przerwany
+                self.image_cache.fetch(url, self.generation, QNetworkRequest.Priority.HighPriority)
+        # Dopiero teraz przerywamy to, czego nowy film nie potrzebuje
+        self.image_cache.abort_older(self.generation)
+
+    def prefetch(self, movie_doc):
+        """Obrazki filmu, który pewnie będzie następny (sąsiedni wiersz) - do cache, bez wyświetlania"""
+        details = movie_doc.get('movie_details') or {}
+        for url in (details.get('poster_url'), details.get('backdrop_url')):
+            if url and not self.image_cache.contains(url):
+                self.image_cache.fetch(url, self.generation, QNetworkRequest.Priority.LowPriority)
+
+    def _show_image(self, url, pixmap):
+        if url == self.poster_url:
+            self.poster_label.setPixmap(pixmap.scaled(
+                self.poster_label.size(),
+                Qt.AspectRatioMode.KeepAspectRatioByExpanding,
+                Qt.TransformationMode.SmoothTransformation
+            ))
+        if url == self.backdrop_url:
+            self._rebuild_render(pixmap) # Wywołuje paintEvent
+
+    def _on_image_loaded(self, url, pixmap):
+        # Obrazek mógł przyjść już po wybraniu innego filmu - wtedy tylko zostaje w cache
+        self._show_image(url, pixmap)
@@ -0,0 +1,47 @@
+import threading
+from PyQt6.QtCore import QThread, pyqtSignal
+from core import tracing
+
+
+class ScanWorker(QThread):
+    """
+    Skanowanie w tle (ScanPipeline poza wątkiem GUI).
+    Sygnały przechodzą do wątku GUI przez kolejkę zdarzeń Qt, więc sloty mogą
+    bezpiecznie dotykać widżetów. Same wiersze tabeli aktualizują się z powiadomień
+    DataBase (DbEventBridge), więc worker raportuje tylko postęp.
+    """
+    progress = pyqtSignal(dict)            # found, inserted, enriched, failed
+    files_stored = pyqtSignal(list)        # ścieżki zapisanych (nowych/zmienionych) plików
+    scan_finished = pyqtSignal(dict)       # podsumowanie z ScanPipeline.run
+    scan_failed = pyqtSignal(str)
+
+    def __init__(self, pipeline, folder, incremental=True, changed_dirs=None, parent=None):
+        super().__init__(parent)
+        self.pipeline = pipeline
+        self.folder = folder
+        self.incremental = incremental
+        self.changed_dirs = changed_dirs
+        self._cancel = threading.Event()
+
+    def cancel(self):
+        """Prośba o przerwanie - skan kończy bieżące zapytania i wychodzi"""
+        self._cancel.set()
+
+    def _on_event(self, kind, data):
+        if kind == 'progress':
+            self.progress.emit(data)
+        elif kind == 'stored':
+            self.files_stored.emit([doc['file_path'] for doc in data])
+
+    @tracing.traced("ScanWorker.run", cat="scan")
+    def run(self):
+        try:
+            summary = self.pipeline.run(
+                self.folder, incremental=self.incremental,
+                callback=self._on_event, cancel=self._cancel, changed_dirs=self.changed_dirs
+            )
+        except Exception as e:
+            print(f"Błąd skanowania: {e}")
+            self.scan_failed.emit(str(e))
+            return
+        self.scan_finished.emit(summary)
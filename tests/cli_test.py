@@ -0,0 +1,33 @@
+import sys
+import json
+import subprocess
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parent.parent / 'src'))
+
+from movie_manager.cli import main
+from scan_pipeline_test import MemoryDB
+
+SRC = Path(__file__).resolve().parent.parent / 'src'
+
+
+def test_cli_does_not_import_qt():
+    code = "import sys; import movie_manager.cli; print('PyQt6' in sys.modules)"
+    result = subprocess.run([sys.executable, "-c", code], cwd=SRC, capture_output=True, text=True, check=True)
+    assert result.stdout.strip() == "False"
+
+
+def test_scan_dry_run_json(tmp_path, capsys):
+    (tmp_path / "Inception.2010.1080p.mkv").write_bytes(b"x")
+    (tmp_path / "Dark.S01E02.mkv").write_bytes(b"x")
+    db = MemoryDB()
+
+    assert main(["--json", "scan", str(tmp_path), "--dry-run"], db=db) == 0
+
+    events = [json.loads(line) for line in capsys.readouterr().out.splitlines()]
+    added = sorted(e['title'] for e in events if e['event'] == 'added')
+    assert added == ["Dark", "Inception"]
+    summary = events[-1]
+    assert summary['event'] == 'summary' and summary['dry_run'] and summary['added'] == 2
+    # Bez zapisów do bazy
+    assert db.docs == {}
@@ -0,0 +1,282 @@
+"""
+Testy wspólne dla backendów biblioteki (DataBase - MongoDB, SQLiteDataBase).
+Moduł nie importuje żadnego backendu - każdy plik *_test.py backendu robi
+`from database_contract import *` i dostarcza własny fixture `db`.
+"""
+import pytest
+
+
+def test_connection(db):
+    """Sprawdza czy w ogóle połączyliśmy się z bazą"""
+    # Pingowanie serwera
+    try:
+        db.ping()
+        assert True
+    except Exception as e:
+        pytest.fail(f"Nie można połączyć się z bazą: {e}")
+
+def test_add_movie(db):
+    """Sprawdza czy można dodać nowy film"""
+    path = "/home/user/Filmy/TestowyFilm.mkv"
+    title = "Testowy Film"
+    
+    # 1. Dodajemy film
+    movie_id = db.add_movie(path, title)
+    
+    # Sprawdzamy czy ID zostało zwrócone (czyli czy zapis się udał)
+    assert movie_id is not None
+    
+    # 2. Sprawdzamy czy film faktycznie jest w bazie
+    saved_movie = db.get_movie(movie_id)
+    assert saved_movie['file_path'] == path
+    assert saved_movie['title_scanned'] == title
+
+def test_no_duplicates(db):
+    """Sprawdza czy system blokuje dodawanie tego samego pliku dwa razy"""
+    path = "/home/user/Filmy/TenSam.mp4"
+    
+    # Pierwsze dodanie
+    id1 = db.add_movie(path, "Tytuł 1")
+    assert id1 is not None
+    
+    # Drugie dodanie tego samego pliku
+    id2 = db.add_movie(path, "Tytuł Inny")
+    
+    # Powinno zwrócić None (lub ID pierwszego filmu), zależnie od Twojej logiki w db_manager.
+    # Zakładając standardową logikę 'nie dodawaj duplikatów':
+    
+    # Sprawdźmy ile jest dokumentów - powinien być tylko 1
+    count = db.get_stats()['total']
+    assert count == 1
+
+def test_update_movie_details(db):
+    """Sprawdza czy dane z API (TMDB) poprawnie aktualizują rekord w bazie"""
+    # 1. Najpierw dodajemy 'pusty' film ze skanera
+    path = "/home/user/Avatar.mp4"
+    movie_id = db.add_movie(path, "Avatar")
+    
+    # 2. Symulujemy dane, które przyszłyby z API
+    tmdb_data = {
+        "title": "Avatar: Istota Wody",
+        "director": "James Cameron",
+        "release_year": "2022",
+        "poster_url": "http://obrazek.jpg",
+        "overview": "Opis filmu..."
+    }
+    
+    # 3. Aktualizujemy rekord
+    db.update_movie_details(movie_id, tmdb_data, tmdb_id=99999)
+    
+    # 4. Pobieramy film z powrotem i sprawdzamy zmiany
+    updated_movie = db.get_movie(movie_id)
+    
+    details = updated_movie.get('movie_details', {})
+    assert details['director'] == "James Cameron"
+    assert details['release_year'] == "2022"
+    assert updated_movie['tmdb_id'] == 99999
+
+def test_get_all_movies(db):
+    """Sprawdza czy pobieranie listy działa"""
+    db.add_movie("/a.mp4", "A")
+    db.add_movie("/b.mp4", "B")
+    
+    movies = db.get_all_movies()
+    assert len(movies) == 2
+
+def test_upsert_scanned_files(db):
+    """Sprawdza czy bulk upsert dodaje nowe pliki i zwraca mapę ścieżka -> ID"""
+    existing_id = db.add_movie("/filmy/stary.mkv", "Stary")
+    db.update_movie_details(existing_id, {"title": "Stary Film"}, tmdb_id=1)
+
+    records = [
+        {'filepath': "/filmy/stary.mkv", 'title_guess': "Inny", 'episode_code': ""},
+        {'filepath': "/seriale/show.s01e01.mkv", 'title_guess': "Show", 'episode_code': "S01E01"},
+    ]
+    path_to_id = db.upsert_scanned_files(records)
+
+    assert set(path_to_id) == {"/filmy/stary.mkv", "/seriale/show.s01e01.mkv"}
+    assert path_to_id["/filmy/stary.mkv"] == existing_id
+    assert db.get_stats()['total'] == 2
+
+    # Istniejący rekord nie traci danych z TMDB
+    old = db.get_movie(existing_id)
+    assert old['tmdb_id'] == 1
+    assert old['title_scanned'] == "Stary"
+
+    new = db.get_movie(path_to_id["/seriale/show.s01e01.mkv"])
+    assert new['episode_code'] == "S01E01"
+    assert new['tmdb_id'] is None
+
+    # Ponowny upsert nie tworzy duplikatów
+    db.upsert_scanned_files(records)
+    assert db.get_stats()['total'] == 2
+
+
+def test_scan_state_and_moves(db):
+    """Sprawdza zapis stanu skanu, przenoszenie i usuwanie rekordów"""
+    stat = {'size': 10, 'mtime_ns': 1, 'inode': 5}
+    records = [
+        {'filepath': "/lib/a/film.mkv", 'title_guess': "Film", 'fs_stat': stat},
+        {'filepath': "/lib/b/inny.mkv", 'title_guess': "Inny", 'fs_stat': stat},
+        {'filepath': "/library2/x.mkv", 'title_guess': "X", 'fs_stat': stat},
+    ]
+    path_to_id = db.upsert_scanned_files(records)
+    db.update_movie_details(path_to_id["/lib/a/film.mkv"], {"title": "Film"}, tmdb_id=7)
+    db.save_dir_states("/lib", {"/lib": {'mtime_ns': 3, 'subdirs': ["/lib/a", "/lib/b"]}})
+
+    files, dirs = db.get_scan_state("/lib")
+    # "/library2" nie jest podkatalogiem "/lib"
+    assert set(files) == {"/lib/a/film.mkv", "/lib/b/inny.mkv"}
+    assert files["/lib/a/film.mkv"] == stat
+    assert dirs["/lib"]['subdirs'] == ["/lib/a", "/lib/b"]
+
+    db.move_movies([("/lib/a/film.mkv", {'filepath': "/lib/b/film.mkv", 'fs_stat': stat})])
+    db.delete_by_paths(["/lib/b/inny.mkv"])
+
+    moved = db.get_movie_by_path("/lib/b/film.mkv")
+    assert moved['tmdb_id'] == 7
+    assert db.get_stats()['total'] == 2
+    assert db.get_unenriched_ids(path_to_id.values()) == {path_to_id["/library2/x.mkv"]}
+
+def test_update_many_details(db):
+    """Jeden wynik z TMDB trafia do wszystkich odcinków"""
+    ids = [db.add_movie(f"/seriale/show.s01e0{i}.mkv", "Show") for i in range(1, 4)]
+    db.update_many_details(ids[:2], {"title": "Show"}, tmdb_id=42)
+
+    assert [m['tmdb_id'] for m in db.list_movies("added")] == [42, 42, None]
+
+def test_cache_and_change_events(db):
+    """Po wczytaniu listy odczyty idą z pamięci, a zapisy wysyłają powiadomienia"""
+    movie_id = db.add_movie("/filmy/a.mkv", "A")
+    db.list_movies()  # ładuje cache
+    events = []
+    db.subscribe(lambda kind, docs: events.append((kind, [d['_id'] for d in docs])))
+
+    db.update_movie_details(movie_id, {"title": "Film A"}, tmdb_id=3)
+    assert events == [('update', [movie_id])]
+
+    # Dokument z pamięci ma już nowe dane
+    assert db.get_movie_by_path("/filmy/a.mkv")['tmdb_id'] == 3
+    assert db.get_movie(str(movie_id))['movie_details']['title'] == "Film A"
+
+    db.delete_by_paths(["/filmy/a.mkv"])
+    assert events[-1] == ('delete', [movie_id])
+    assert db.list_movies() == []
+
+def test_list_movies_projection_and_lazy_details(db):
+    """Lista ma tylko pola tabeli, pełny dokument dopiero przez get_movie"""
+    a = db.add_movie("/filmy/a.mkv", "A")
+    b = db.add_movie("/filmy/b.mkv", "B")
+    db.update_movie_details(a, {"title": "Film A", "release_year": "2001", "overview": "Długi opis"}, tmdb_id=1)
+    db.update_movie_details(b, {"title": "Film B", "release_year": "1999", "overview": "Inny opis"}, tmdb_id=2)
+
+    movies = db.list_movies()
+    assert [m['_id'] for m in movies] == [a, b]
+    assert movies[0]['movie_details'] == {"title": "Film A", "release_year": "2001"}
+    assert [m['_id'] for m in db.list_movies("year")] == [b, a]
+    assert [m['_id'] for m in db.list_movies("added", descending=True)] == [b, a]
+
+    assert db.get_movie(a)['movie_details']['overview'] == "Długi opis"
+    # Zapis unieważnia zapamiętany pełny dokument
+    db.update_movie_details(a, {"title": "Film A", "overview": "Nowy opis"}, tmdb_id=1)
+    assert db.get_movie(a)['movie_details']['overview'] == "Nowy opis"
+
+def test_prune_missing_soft_and_hard(db):
+    """Brakujące pliki spod katalogu są oznaczane albo usuwane jednym zapytaniem"""
+    a = db.add_movie("/dysk/filmy/a.mkv", "A")
+    db.add_movie("/dysk/filmy/b.mkv", "B")
+    db.add_movie("/dysk/filmy2/c.mkv", "C")  # inny katalog - nie ruszamy
+    db.update_movie_details(a, {"title": "Film A"}, tmdb_id=1)
+    db.list_movies()
+
+    assert db.prune_missing("/dysk/filmy", ["/dysk/filmy/b.mkv"], soft=True) == ["/dysk/filmy/a.mkv"]
+    assert db.get_movie(a)['tmdb_id'] == 1
+    assert [m['title_scanned'] for m in db.list_movies()] == ["B", "C"]
+    # Ponowne oznaczenie nie zmienia daty zniknięcia
+    assert db.prune_missing("/dysk/filmy", ["/dysk/filmy/b.mkv"], soft=True) == []
+
+    db.prune_missing("/dysk/filmy", ["/dysk/filmy/a.mkv", "/dysk/filmy/b.mkv"], soft=True)
+    assert [m['title_scanned'] for m in db.list_movies()] == ["A", "B", "C"]
+
+    assert db.prune_missing("/dysk/filmy", ["/dysk/filmy/b.mkv"]) == ["/dysk/filmy/a.mkv"]
+    assert db.get_stats()['total'] == 2
+
+def test_search_index_and_text_search(db):
+    """Indeks w pamięci śledzi zmiany, text_search szuka po stronie bazy"""
+    a = db.add_movie("/filmy/matrix.mkv", "Matrix")
+    index = db.search_index()
+    assert index.search("matr") == {a}
+
+    b = db.add_movie("/seriale/wiedzmin.s01e01.mkv", "Wiedzmin")
+    db.update_movie_details(b, {"title": "Wiedźmin", "original_title": "The Witcher", "genres": ["Dramat"]}, tmdb_id=7)
+    assert index.search("witch") == {b}
+    assert index.search("gatunek:dramat") == {b}
+
+    db.ensure_text_index()
+    assert [m['_id'] for m in db.text_search("witcher")] == [b]
+
+def test_fingerprint_lookup_and_move_revives_record(db):
+    """Rekord znaleziony po odcisku treści i przeniesiony wraca na listę z danymi TMDB"""
+    rec = {'filepath': "/dysk1/film.mkv", 'title_guess': "Film", 'episode_code': "",
+           'fs_stat': {'size': 1, 'mtime_ns': 1, 'inode': 1}, 'fingerprint': "1-abc"}
+    ids = db.upsert_scanned_files([rec])
+    db.update_movie_details(ids["/dysk1/film.mkv"], {"title": "Film"}, tmdb_id=5)
+    db.prune_missing("/dysk1", [], soft=True)
+
+    found = db.find_by_fingerprints(["1-abc", "2-zzz"])
+    assert [d['file_path'] for d in found["1-abc"]] == ["/dysk1/film.mkv"]
+
+    db.move_movies([("/dysk1/film.mkv", dict(rec, filepath="/dysk2/film.mkv"))])
+    moved = db.get_movie_by_path("/dysk2/film.mkv")
+    assert moved['tmdb_id'] == 5 and 'missing_since' not in moved
+    assert [m['file_path'] for m in db.list_movies()] == ["/dysk2/film.mkv"]
+
+def test_library_roots(db):
+    """Podfolder zeskanowanego folderu nie jest osobnym korzeniem"""
+    db.add_library_root("/dysk/filmy")
+    db.add_library_root("/dysk/filmy/nowe/")
+    db.add_library_root("/dysk/seriale")
+    assert db.get_library_roots() == ["/dysk/filmy", "/dysk/seriale"]
+
+    db.remove_library_root("/dysk/filmy")
+    assert db.get_library_roots() == ["/dysk/filmy/nowe", "/dysk/seriale"]
+
+def test_stats_and_unenriched(db):
+    """Liczniki dla CLI: brakujące nie są widoczne ani liczone jako niewzbogacone"""
+    a = db.add_movie("/dysk/filmy/a.mkv", "A")
+    db.add_movie("/dysk/filmy/b.mkv", "B")
+    db.add_movie("/dysk/seriale/c.mkv", "C")
+    db.update_movie_details(a, {"title": "Film A", "type": "movie"}, tmdb_id=1)
+    db.prune_missing("/dysk/seriale", [], soft=True)
+
+    assert [d['file_path'] for d in db.iter_unenriched()] == ["/dysk/filmy/b.mkv"]
+    assert db.count_missing() == 1 and db.count_missing("/dysk/filmy") == 0
+    stats = db.get_stats()
+    assert (stats['total'], stats['visible'], stats['missing'], stats['unenriched']) == (3, 2, 1, 1)
+    assert stats['by_type'] == {"movie": 1, "brak": 1}
+
+def test_movie_batches_stream_sorted_and_fill_cache(db):
+    """Lista paczkami w kolejności tytułów; po przejściu całości cache jest wczytany"""
+    for title in ("Cc", "Aa", "Bb"):
+        db.add_movie(f"/filmy/{title}.mkv", title)
+
+    batches = list(db.iter_movie_batches(batch_size=2))
+    assert [[d['title_scanned'] for d in b] for b in batches] == [["Aa", "Bb"], ["Cc"]]
+    assert db.cache.loaded and len(db.cache) == 3
+    assert [len(b) for b in db.iter_movie_batches(batch_size=2)] == [2, 1]
+
+def test_move_onto_occupied_path_replaces_record(db):
+    """Przeniesienie na ścieżkę zajętą przez inny rekord usuwa go - także z cache i listy subskrybentów"""
+    ids = db.upsert_scanned_files([{'filepath': "/lib/a.mkv", 'title_guess': "A"},
+                                   {'filepath': "/lib/b.mkv", 'title_guess': "B"}])
+    db.update_movie_details(ids["/lib/a.mkv"], {"title": "A"}, tmdb_id=1)
+    db.list_movies()
+    events = []
+    db.subscribe(lambda kind, docs: events.append((kind, [d['file_path'] for d in docs])))
+
+    db.move_movies([("/lib/a.mkv", {'filepath': "/lib/b.mkv", 'title_guess': "A"})])
+
+    assert [m['file_path'] for m in db.list_movies()] == ["/lib/b.mkv"]
+    assert db.get_movie_by_path("/lib/b.mkv")['tmdb_id'] == 1
+    assert db.get_stats()['total'] == 1
+    assert events[0] == ('delete', ["/lib/b.mkv"])
@@ -0,0 +1,124 @@
+import sys
+import time
+import queue
+import threading
+from pathlib import Path
+
+# Konfiguracja ścieżek (żeby widzieć folder src)
+sys.path.append(str(Path(__file__).resolve().parent.parent / 'src'))
+
+from core.enrichment import TokenBucket, TMDBEnricher
+
+
+class FakeTMDB:
+    """Udaje TMDBClient - zwraca dane po krótkim 'czasie sieci'"""
+    def __init__(self, delay=0.05):
+        self.delay = delay
+        self.rate_limiter = None
+        self.active = 0
+        self.max_active = 0
+        self.lock = threading.Lock()
+
+    def search_smart(self, query, year=None, force_tv=False):
+        with self.lock:
+            self.active += 1
+            self.max_active = max(self.max_active, self.active)
+        time.sleep(self.delay)
+        with self.lock:
+            self.active -= 1
+        if query == "Nieznany":
+            return None
+        return {"tmdb_id": len(query), "title": query, "type": "movie"}
+
+
+def test_token_bucket_limits_rate():
+    """Po wyczerpaniu 'wybuchu' limiter przepuszcza ok. rate żądań na sekundę"""
+    bucket = TokenBucket(rate=50, capacity=5)
+    start = time.monotonic()
+    for _ in range(15):
+        bucket.acquire()
+    elapsed = time.monotonic() - start
+    # 5 od razu, kolejne 10 po 20 ms
+    assert elapsed >= 0.18
+
+
+def test_enricher_runs_concurrently():
+    """Sprawdza czy wyszukiwania idą równolegle i wszystkie wyniki wracają"""
+    tmdb = FakeTMDB()
+    enricher = TMDBEnricher(tmdb, max_workers=4, rate_limiter=TokenBucket(rate=1000))
+    jobs = [(i, {'title_guess': f"Film {i}" if i % 2 else "Nieznany"}) for i in range(12)]
+
+    start = time.monotonic()
+    results = {}
+    for ids, details in enricher.enrich(jobs):
+        for movie_id in ids:
+            results[movie_id] = details
+    elapsed = time.monotonic() - start
+
+    assert set(results) == set(range(12))
+    assert results[1]['title'] == "Film 1"
+    assert results[0] is None
+    assert tmdb.max_active > 1
+    assert elapsed < 7 * tmdb.delay
+
+
+def test_enricher_coalesces_series_lookups():
+    """24 odcinki jednego sezonu = jedno zapytanie, wynik dla wszystkich"""
+    tmdb = FakeTMDB()
+    calls = []
+    original = tmdb.search_smart
+    tmdb.search_smart = lambda q, y=None, tv=False: calls.append(q) or original(q, y, tv)
+    enricher = TMDBEnricher(tmdb, max_workers=4, rate_limiter=TokenBucket(rate=1000))
+
+    jobs = [(i, {'title_guess': "Show  Name" if i % 2 else "show name", 'is_tv_guess': True})
+            for i in range(24)]
+    jobs.append((99, {'title_guess': "Show Name", 'is_tv_guess': False}))
+    groups = list(enricher.enrich(jobs))
+
+    assert len(calls) == 2
+    assert sorted(i for ids, _ in groups for i in ids) == list(range(24)) + [99]
+
+
+class FakeDB:
+    def __init__(self):
+        self.updates = []
+
+    def update_many_details(self, movie_ids, details, tmdb_id):
+        self.updates.append((list(movie_ids), tmdb_id))
+
+
+def test_enrich_into_updates_each_group_once():
+    enricher = TMDBEnricher(FakeTMDB(delay=0), rate_limiter=TokenBucket(rate=1000))
+    db = FakeDB()
+    jobs = [(i, {'title_guess': "Serial", 'is_tv_guess': True}) for i in range(5)]
+    jobs += [(10, {'title_guess': "Nieznany"})]
+
+    found, missing = enricher.enrich_into(db, jobs)
+
+    assert (found, missing) == (5, 1)
+    assert sum(len(ids) for ids, _ in db.updates) == 5
+    assert db.updates == [([0, 1, 2, 3, 4], len("Serial"))]
+
+
+
+def test_results_are_not_held_back_by_an_empty_job_queue():
+    """Kolejka skanera chwilowo pusta - gotowy wynik musi wyjść, zanim przyjdą kolejne pliki"""
+    enricher = TMDBEnricher(FakeTMDB(delay=0), rate_limiter=TokenBucket(rate=1000))
+    jobs = queue.Queue()
+    jobs.put((1, {'title_guess': "Matrix"}))
+    first_result = threading.Event()
+    waited = []
+
+    def scanner():
+        waited.append(first_result.wait(2))
+        jobs.put((2, {'title_guess': "Dune"}))
+        jobs.put(None)
+
+    threading.Thread(target=scanner, daemon=True).start()
+    results = []
+    for ids, details in enricher.enrich(jobs):
+        results.append((ids, details['title']))
+        first_result.set()
+
+    assert results == [([1], "Matrix"), ([2], "Dune")]
+    assert waited == [True]
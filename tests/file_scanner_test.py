@@ -0,0 +1,112 @@
+import os
+import sys
+from pathlib import Path
+
+# Konfiguracja ścieżek (żeby widzieć folder src)
+sys.path.append(str(Path(__file__).resolve().parent.parent / 'src'))
+
+from core.file_scanner import FileScanner
+
+
+def make_tree(root):
+    (root / "Filmy").mkdir()
+    (root / "Seriale" / "Show").mkdir(parents=True)
+    (root / "Filmy" / "Avatar.2009.1080p.mkv").write_bytes(b"a" * 10)
+    (root / "Seriale" / "Show" / "Show.S01E01.mkv").write_bytes(b"b" * 20)
+    (root / "Seriale" / "Show" / "notes.txt").write_text("x")
+
+
+def previous_state(delta):
+    """Symuluje to, co baza zapamiętała po skanie"""
+    files = {r['filepath']: r['fs_stat'] for r in delta['added'] + delta['modified']}
+    files.update({r['filepath']: r['fs_stat'] for _, r in delta['moved']})
+    return files, delta['dirs']
+
+
+def test_first_scan_reports_everything_as_added(tmp_path):
+    make_tree(tmp_path)
+    delta = FileScanner().scan_incremental(str(tmp_path))
+
+    paths = sorted(os.path.basename(r['filepath']) for r in delta['added'])
+    assert paths == ["Avatar.2009.1080p.mkv", "Show.S01E01.mkv"]
+    show = next(r for r in delta['added'] if r['is_tv_guess'])
+    assert show['episode_code'] == "S01E01"
+    assert show['fs_stat']['size'] == 20
+
+
+def test_rescan_without_changes_is_empty(tmp_path):
+    make_tree(tmp_path)
+    scanner = FileScanner()
+    files, dirs = previous_state(scanner.scan_incremental(str(tmp_path)))
+
+    delta = scanner.scan_incremental(str(tmp_path), files, dirs)
+    assert not (delta['added'] or delta['modified'] or delta['moved'] or delta['removed'])
+    assert delta['unchanged'] == 2
+
+
+def test_rescan_reports_delta(tmp_path):
+    make_tree(tmp_path)
+    scanner = FileScanner()
+    files, dirs = previous_state(scanner.scan_incremental(str(tmp_path)))
+
+    show_dir = tmp_path / "Seriale" / "Show"
+    (show_dir / "Show.S01E02.mkv").write_bytes(b"c" * 30)
+    os.rename(tmp_path / "Filmy" / "Avatar.2009.1080p.mkv", show_dir / "Avatar.mkv")
+    (tmp_path / "Filmy").rmdir()
+
+    delta = scanner.scan_incremental(str(tmp_path), files, dirs)
+
+    assert [os.path.basename(r['filepath']) for r in delta['added']] == ["Show.S01E02.mkv"]
+    assert len(delta['moved']) == 1
+    old_path, rec = delta['moved'][0]
+    assert old_path.endswith("Avatar.2009.1080p.mkv")
+    assert rec['filepath'] == str(show_dir / "Avatar.mkv")
+    assert delta['removed'] == []
+    assert str(tmp_path / "Filmy") not in delta['dirs']
+
+
+def test_unchanged_directory_is_not_listed(tmp_path, monkeypatch):
+    make_tree(tmp_path)
+    scanner = FileScanner()
+    files, dirs = previous_state(scanner.scan_incremental(str(tmp_path)))
+
+    listed = []
+    real_scandir = os.scandir
+    monkeypatch.setattr(os, "scandir", lambda p: listed.append(p) or real_scandir(p))
+    scanner.scan_incremental(str(tmp_path), files, dirs)
+    assert listed == []
+
+
+def test_iter_folder_filters_and_depth(tmp_path):
+    make_tree(tmp_path)
+    other = tmp_path / "Inny"
+    other.mkdir()
+    (other / "Sample.mkv").write_bytes(b"s")
+    (other / "Film.2010.mp4").write_bytes(b"f")
+    scanner = FileScanner(max_workers=2)
+
+    names = lambda recs: sorted(os.path.basename(r['filepath']) for r in recs)
+
+    assert names(scanner.iter_folder([tmp_path / "Filmy", other], exclude=["Sample*"])) == \
+        ["Avatar.2009.1080p.mkv", "Film.2010.mp4"]
+    assert names(scanner.iter_folder(tmp_path, include=["*.mp4"])) == ["Film.2010.mp4"]
+    assert names(scanner.iter_folder(tmp_path / "Seriale", max_depth=0)) == []
+    assert names(scanner.iter_folder(tmp_path, exclude=["*/Seriale"])) == \
+        ["Avatar.2009.1080p.mkv", "Film.2010.mp4", "Sample.mkv"]
+
+
+def test_fingerprint_reads_head_and_tail(tmp_path):
+    chunk = FileScanner.FINGERPRINT_CHUNK
+    a = tmp_path / "a.mkv"
+    a.write_bytes(b"x" * chunk + b"srodek" + b"y" * chunk)
+    b = tmp_path / "b.mkv"
+    b.write_bytes(b"x" * chunk + b"SRODEK" + b"y" * chunk)  # różnica tylko w środku
+    c = tmp_path / "c.mkv"
+    c.write_bytes(b"x" * chunk + b"srodek" + b"z" * chunk)
+
+    assert FileScanner.fingerprint(str(a)) == FileScanner.fingerprint(str(b))
+    assert FileScanner.fingerprint(str(a)) != FileScanner.fingerprint(str(c))
+    assert FileScanner.fingerprint(str(tmp_path / "brak.mkv")) is None
+
+    delta = FileScanner().scan_incremental(str(tmp_path))
+    assert all(r['fingerprint'] for r in delta['added'])
@@ -0,0 +1,38 @@
+import sys
+from pathlib import Path
+
+# Konfiguracja ścieżek (żeby widzieć folder src i benchmarks)
+project_root = Path(__file__).resolve().parent.parent
+sys.path.append(str(project_root / 'src'))
+sys.path.append(str(project_root / 'benchmarks'))
+
+from core.filename_parser import FilenameParser
+import filename_parser_bench
+
+
+def test_analyze_examples():
+    parser = FilenameParser()
+    assert parser.analyze("Avatar.2009.1080p.BluRay.x264.mkv") == ("Avatar", "2009", False, "")
+    assert parser.analyze("Breaking_Bad_S02E05_720p.mkv") == ("Breaking Bad", None, True, "S02E05")
+    assert parser.analyze("the office 3x07 [rarbg].avi") == ("the office", None, True, "3X07")
+    assert parser.analyze("Blade Runner 2049 (2017) PL.mp4") == ("Blade Runner 2049", "2017", False, "")
+    assert parser.analyze("[Grupa] Pan Tadeusz DUBBED.mkv") == ("Grupa Pan Tadeusz", None, False, "")
+
+
+def test_extra_junk_words_and_memo():
+    parser = FilenameParser(extra_junk=["Grupa"])
+    assert parser.analyze("[Grupa] Pan Tadeusz.mkv")[0] == "Pan Tadeusz"
+
+    names = ["Show.S01E01.mkv", "Show.S01E01.mp4", "Show.S01E02.mkv"]
+    results = parser.analyze_many(names)
+    assert [r[3] for r in results] == ["S01E01", "S01E01", "S01E02"]
+    # Ten sam "stem" z innym rozszerzeniem trafia w pamięć podręczną
+    assert parser.cache_info().hits == 1
+
+
+def test_parse_bench_smoke():
+    """Benchmark działa (bez progu czasu - próg wydajności: filename_parser_bench.py --min-rate)"""
+    result = filename_parser_bench.run(count=2000)
+    assert result['count'] == 2000 and result['cold_rate'] > 0
+    # Drugie przejście w całości z pamięci podręcznej
+    assert result['warm_hit_ratio'] == 1.0
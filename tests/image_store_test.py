@@ -0,0 +1,69 @@
+import os
+import sys
+from pathlib import Path
+
+# Bez ekranu (CI/serwer) - Qt rysuje "w pamięci"
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+# Konfiguracja ścieżek (żeby widzieć folder src)
+sys.path.append(str(Path(__file__).resolve().parent.parent / 'src'))
+
+from core.image_store import ImageStore
+
+
+def test_store_is_content_addressed_and_survives_reopen(tmp_path):
+    store = ImageStore(tmp_path)
+    a = store.put("https://img/w500/a.jpg", b"JPEG-A")
+    b = store.put("https://img/original/a.jpg", b"JPEG-A")  # ten sam obrazek, inny URL
+    assert a == b
+    assert len(list((tmp_path / "blobs").rglob(a))) == 1
+    store.close()
+
+    store = ImageStore(tmp_path)
+    assert store.get("https://img/w500/a.jpg") == b"JPEG-A"
+    assert store.get("https://img/brak.jpg") is None
+    assert (store.hits, store.misses) == (1, 1)
+
+
+def test_store_evicts_least_recently_used(tmp_path):
+    store = ImageStore(tmp_path, max_bytes=25)
+    store.put("a", b"a" * 10)
+    store.put("b", b"b" * 10)
+    store.get("a")  # "a" używany później niż "b"
+    store.put("c", b"c" * 10)
+
+    assert store.get("b") is None
+    assert store.get("a") == b"a" * 10
+    assert store.total_bytes() <= 25
+
+
+def test_memory_layer_is_bounded_in_bytes(qapp, tmp_path):
+    from PyQt6.QtGui import QPixmap, QColor
+    from ui.image_cache import ImageCache
+
+    pixmap = QPixmap(10, 10)
+    pixmap.fill(QColor("red"))
+    size = ImageCache._pixmap_bytes(pixmap)
+    cache = ImageCache(store=False, memory_bytes=size * 2)
+    for url in ("a", "b", "c"):
+        cache._remember(url, pixmap)
+
+    assert cache.cached("a") is None
+    assert cache.cached("c") is not None
+    assert cache.memory_usage() <= size * 2
+
+
+def test_superseded_fetches_are_aborted(qapp, qtbot):
+    from ui.image_cache import ImageCache
+
+    cache = ImageCache(store=False)
+    failed = []
+    cache.failed.connect(failed.append)
+    cache.fetch("http://127.0.0.1:9/stary.jpg", generation=1)
+    cache.fetch("http://127.0.0.1:9/nowy.jpg", generation=2)
+    cache.abort_older(2)
+
+    assert list(cache._pending) == ["http://127.0.0.1:9/nowy.jpg"]
+    # Przerwane pobranie nie jest zgłaszane jako błąd - tylko to, na które ktoś jeszcze czeka
+    qtbot.waitUntil(lambda: not cache._pending, timeout=5000)
+    assert failed == ["http://127.0.0.1:9/nowy.jpg"]
@@ -0,0 +1,45 @@
+import sys
+from pathlib import Path
+
+# Konfiguracja ścieżek (żeby widzieć folder src)
+sys.path.append(str(Path(__file__).resolve().parent.parent / 'src'))
+
+from core.library_cache import LibraryCache
+
+
+def test_cache_indexes_by_id_and_path():
+    cache = LibraryCache()
+    cache.load([{'_id': 1, 'file_path': "/a.mkv", 'title_scanned': "B"},
+                {'_id': 2, 'file_path': "/b.mkv", 'title_scanned': "A"}])
+
+    assert cache.get_by_path("/a.mkv")['_id'] == 1
+    assert [d['_id'] for d in cache.all()] == [2, 1]
+
+    # Zmiana ścieżki przenosi wpis w indeksie ścieżek
+    cache.patch(1, {'file_path': "/c.mkv"})
+    assert cache.get_by_path("/a.mkv") is None
+    assert cache.get_by_path("/c.mkv")['title_scanned'] == "B"
+
+    assert cache.remove_path("/b.mkv")['_id'] == 2
+    assert len(cache) == 1
+
+
+def test_subscribers_get_events_and_can_unsubscribe():
+    cache = LibraryCache()
+    events = []
+    unsubscribe = cache.subscribe(lambda kind, docs: events.append((kind, len(docs))))
+
+    cache.notify('update', [{'_id': 1}])
+    cache.notify('update', [])  # pusta zmiana nie budzi subskrybentów
+    unsubscribe()
+    cache.notify('delete', [{'_id': 1}])
+
+    assert events == [('update', 1)]
+
+
+def test_shape_trims_stored_documents():
+    cache = LibraryCache(shape=lambda d: {k: d[k] for k in ('_id', 'file_path') if k in d})
+    cache.load([{'_id': 1, 'file_path': "/a.mkv", 'overview': "Długi opis"}])
+    cache.patch(1, {'overview': "Inny opis"})
+
+    assert cache.get(1) == {'_id': 1, 'file_path': "/a.mkv"}
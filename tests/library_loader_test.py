@@ -0,0 +1,121 @@
+import os
+import sys
+import threading
+from pathlib import Path
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+sys.path.append(str(Path(__file__).resolve().parent.parent / 'src'))
+
+from core.file_scanner import FileScanner
+from core.search_index import SearchIndex
+from ui.main_window import MovieLibrary
+from scan_pipeline_test import MemoryDB, FakeTMDB
+
+
+class StreamingDB(MemoryDB):
+    """MemoryDB z listą dla okna, oddawaną paczkami jak DataBase.iter_movie_batches"""
+    def __init__(self, docs):
+        super().__init__()
+        self.rows = docs
+        self.index = self.index_thread = None
+
+    def subscribe(self, callback):
+        return lambda: None
+
+    def iter_movie_batches(self, batch_size=1000):
+        for start in range(0, len(self.rows), 2):
+            yield self.rows[start:start + 2]
+
+    def search_index(self):
+        if self.index is None:
+            self.index_thread = threading.current_thread()
+            self.index = SearchIndex()
+            self.index.load(self.rows)
+        return self.index
+
+
+def test_window_paints_before_backend_and_streams_rows(qapp, qtbot):
+    docs = [{'_id': i, 'file_path': f"/filmy/{i}.mkv", 'title_scanned': f"Film {i}", 'episode_code': ""}
+            for i in range(5)]
+    backend_allowed = threading.Event()
+
+    def backend():
+        # Wolny start bazy - okno nie może na niego czekać
+        backend_allowed.wait(5)
+        return StreamingDB(docs), FileScanner(), FakeTMDB()
+
+    window = MovieLibrary(backend=backend)
+    qtbot.addWidget(window)
+    window.show()
+    qtbot.waitUntil(lambda: window.loader is not None and window.loader.isRunning(), timeout=5000)
+    assert window.db is None and not window.btn_scan.isEnabled()
+    assert window.scan_status.text() == "Wczytywanie biblioteki..."
+
+    with qtbot.waitSignal(window.loader.load_finished, timeout=5000) as blocker:
+        backend_allowed.set()
+
+    assert blocker.args == [5]
+    assert window.model.rowCount() == 5 and window.model.path_at(4) == "/filmy/4.mkv"
+    assert window.btn_scan.isEnabled() and not window.scan_status.isVisible()
+
+
+def test_writes_stay_disabled_until_library_is_loaded(qapp, qtbot):
+    docs = [{'_id': i, 'file_path': f"/filmy/{i}.mkv", 'title_scanned': f"Film {i}", 'episode_code': ""}
+            for i in range(4)]
+    rest_allowed = threading.Event()
+
+    class SlowStreamingDB(StreamingDB):
+        def iter_movie_batches(self, batch_size=1000):
+            yield self.rows[:2]
+            # Reszta listy jeszcze w drodze - skan teraz rozjechałby się z cache
+            rest_allowed.wait(5)
+            yield self.rows[2:]
+
+    window = MovieLibrary(backend=lambda: (SlowStreamingDB(docs), FileScanner(), FakeTMDB()))
+    qtbot.addWidget(window)
+    window.show()
+    qtbot.waitUntil(lambda: window.model.rowCount() == 2, timeout=5000)
+    assert window.db is not None
+    assert not window.btn_scan.isEnabled() and not window.btn_watch.isEnabled()
+
+    with qtbot.waitSignal(window.loader.load_finished, timeout=5000):
+        rest_allowed.set()
+    assert window.btn_scan.isEnabled() and window.btn_watch.isEnabled()
+
+
+def test_search_index_is_built_off_the_gui_thread(qapp, qtbot):
+    docs = [{'_id': i, 'file_path': f"/filmy/{i}.mkv", 'title_scanned': title, 'episode_code': ""}
+            for i, title in enumerate(["Matrix", "Dune", "Alien"])]
+    db = StreamingDB(docs)
+    window = MovieLibrary(backend=lambda: (db, FileScanner(), FakeTMDB()))
+    qtbot.addWidget(window)
+    # Wpisane w trakcie ładowania - wyszukanie po load_finished
+    window.search_box.setText("dun")
+    qtbot.waitUntil(lambda: window.library_ready, timeout=5000)
+
+    assert db.index_thread is not threading.main_thread()
+    assert window.model.rowCount() == 1 and window.model.path_at(0) == "/filmy/1.mkv"
+
+
+def test_neighbours_are_fetched_off_the_gui_thread(qapp, qtbot):
+    docs = [{'_id': i, 'file_path': f"/filmy/{i}.mkv", 'title_scanned': f"Film {i}", 'episode_code': "",
+             'movie_details': {}} for i in range(5)]
+    fetched, prefetched = {}, []
+
+    class DetailDB(StreamingDB):
+        def get_movie(self, movie_id):
+            fetched[movie_id] = threading.current_thread()
+            return docs[movie_id]
+
+    window = MovieLibrary(backend=lambda: (DetailDB(docs), FileScanner(), FakeTMDB()))
+    qtbot.addWidget(window)
+    qtbot.waitUntil(lambda: window.library_ready, timeout=5000)
+    window.tile.prefetch = lambda doc: prefetched.append(doc['_id'])
+
+    window.table.selectRow(2)
+    qtbot.waitUntil(lambda: sorted(prefetched) == [1, 3], timeout=5000)
+    # Wybrany wiersz w wątku GUI, sąsiedzi w tle
+    assert fetched[2] is threading.main_thread()
+    assert fetched[1] is not threading.main_thread() and fetched[3] is not threading.main_thread()
+    window.close()
+    assert not window.prefetcher.isRunning()
@@ -0,0 +1,114 @@
+import os
+import sys
+from pathlib import Path
+
+# Bez ekranu (CI/serwer) - Qt rysuje "w pamięci"
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+# Konfiguracja ścieżek (żeby widzieć folder src)
+sys.path.append(str(Path(__file__).resolve().parent.parent / 'src'))
+
+from PyQt6.QtTest import QAbstractItemModelTester
+from ui.library_model import LibraryTableModel
+
+
+def doc(i, title="Film", **extra):
+    return dict({'_id': i, 'file_path': f"/filmy/{i}.mkv", 'title_scanned': title, 'movie_details': {}}, **extra)
+
+
+def test_model_incremental_updates(qapp):
+    model = LibraryTableModel()
+    QAbstractItemModelTester(model)
+    inserted, changed = [], []
+    model.rowsInserted.connect(lambda parent, first, last: inserted.append((first, last)))
+    model.dataChanged.connect(lambda tl, br: changed.append(tl.row()))
+
+    model.reset([doc(1), doc(2, episode_code="S01E02")])
+    assert model.rowCount() == 2
+    assert model.data(model.index(1, 0)) == "Film   S01E02"
+
+    model.append([doc(3), doc(4)])
+    assert inserted == [(2, 3)]
+
+    model.upsert(doc(3, movie_details={"title": "Matrix", "release_year": "1999"}))
+    assert changed == [2]
+    assert model.data(model.index(2, 0)) == "Matrix"
+    assert model.data(model.index(2, 1)) == "1999"
+
+    model.upsert(dict(doc(4), file_path="/inne/4.mkv"))
+    model.remove_paths(["/filmy/1.mkv"])
+    assert [model.path_at(r) for r in range(model.rowCount())] == ["/filmy/2.mkv", "/filmy/3.mkv", "/inne/4.mkv"]
+    assert model.row_of_id(4) == 2
+
+
+def test_model_filter(qapp):
+    model = LibraryTableModel()
+    tester = QAbstractItemModelTester(model)
+    model.reset([doc(i, f"Film {i}") for i in range(5)])
+
+    model.set_filter({1, 3})
+    assert model.rowCount() == 2
+    assert [model.id_at(r) for r in range(2)] == [1, 3]
+    assert model.row_of_id(3) == 1 and model.row_of_id(2) is None
+
+    # Nowe wiersze spoza filtra trafiają do modelu, ale nie do widoku
+    model.append([doc(5, "Film 5"), doc(3.5, "Film 3.5")])
+    assert model.rowCount() == 2 and model.contains("/filmy/5.mkv")
+    model.remove_paths(["/filmy/1.mkv"])
+    assert [model.id_at(r) for r in range(model.rowCount())] == [3]
+
+    model.set_filter(None)
+    assert model.rowCount() == 6
+
+
+def test_model_updates_under_filter_hit_the_right_row(qapp):
+    model = LibraryTableModel()
+    QAbstractItemModelTester(model)
+    model.reset([doc(i, f"Film {i}") for i in range(5)])
+    model.set_filter({3})
+    changed = []
+    model.dataChanged.connect(lambda tl, br: changed.append(tl.row()))
+
+    model.upsert(doc(3, "Film 3", movie_details={"title": "Matrix Reloaded"}))
+    assert changed == [0]
+    assert model.data(model.index(0, 0)) == "Matrix Reloaded"
+
+    model.set_filter(None)
+    assert [model.id_at(r) for r in range(model.rowCount())] == [0, 1, 2, 3, 4]
+    assert model.data(model.index(0, 0)) == "Film 0"
+
+
+def test_remove_paths_signals_one_removal_per_block(qapp):
+    model = LibraryTableModel()
+    QAbstractItemModelTester(model)
+    model.reset([doc(i) for i in range(10)])
+    removed, resets = [], []
+    model.rowsRemoved.connect(lambda parent, first, last: removed.append((first, last)))
+    model.modelReset.connect(lambda: resets.append(True))
+
+    model.remove_paths([f"/filmy/{i}.mkv" for i in (1, 2, 3, 7, 8, 42)])
+    assert removed == [(7, 8), (1, 3)] and not resets
+    assert [model.id_at(r) for r in range(model.rowCount())] == [0, 4, 5, 6, 9]
+    assert model.row_of_id(9) == 4 and model.row_of_id(2) is None
+
+    # Pod filtrem bloki liczone są w numeracji widoku, ukryte wiersze znikają bez sygnału
+    model.set_filter({0, 5, 6, 9})
+    model.remove_paths(["/filmy/4.mkv", "/filmy/5.mkv", "/filmy/6.mkv"])
+    assert removed[-1] == (1, 2)
+    assert [model.id_at(r) for r in range(model.rowCount())] == [0, 9]
+    model.set_filter(None)
+    assert [model.id_at(r) for r in range(model.rowCount())] == [0, 9]
+
+
+def test_remove_many_scattered_paths_resets_once(qapp):
+    model = LibraryTableModel()
+    QAbstractItemModelTester(model)
+    model.reset([doc(i) for i in range(100)])
+    removed, resets = [], []
+    model.rowsRemoved.connect(lambda parent, first, last: removed.append((first, last)))
+    model.modelReset.connect(lambda: resets.append(True))
+
+    model.remove_paths([f"/filmy/{i}.mkv" for i in range(0, 100, 2)])
+    assert not removed and len(resets) == 1
+    assert [model.id_at(r) for r in range(model.rowCount())] == list(range(1, 100, 2))
+    assert model.row_of_path("/filmy/99.mkv") == 49
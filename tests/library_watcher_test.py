@@ -0,0 +1,92 @@
+import os
+import sys
+import threading
+from pathlib import Path
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+sys.path.append(str(Path(__file__).resolve().parent.parent / 'src'))
+
+from ui.library_watcher import LibraryWatcher
+from scan_pipeline_test import MemoryDB, FakeTMDB, make_pipeline
+
+
+def test_group_merges_nested_and_deleted_dirs(tmp_path):
+    show = tmp_path / "Show"
+    (show / "Season 1").mkdir(parents=True)
+    root = str(tmp_path)
+    dirs = {str(show / "Season 1"), str(show), str(show / "Season 2"), "/poza/biblioteka"}
+
+    groups = LibraryWatcher.group(dirs, [root])
+
+    # Usunięty "Season 2" -> rodzic "Show", "Season 1" skanuje skan "Show"
+    assert list(groups) == [str(show)]
+    assert sorted(groups[str(show)]) == [str(show), str(show / "Season 1")]
+
+
+def test_new_file_is_scanned_without_rescan(qapp, qtbot, tmp_path):
+    season = tmp_path / "Show" / "Season 1"
+    season.mkdir(parents=True)
+    (season / "Show.S01E01.mkv").write_bytes(b"a")
+    db = MemoryDB()
+    pipeline = make_pipeline(db, FakeTMDB())
+    pipeline.run(str(tmp_path))
+
+    watcher = LibraryWatcher(db, pipeline, debounce_ms=50)
+    watcher.add_root(str(tmp_path))
+    assert str(season) in watcher.fs_watcher.directories()
+
+    with qtbot.waitSignal(watcher.batch_finished, timeout=5000) as blocker:
+        (season / "Show.S01E02.mkv").write_bytes(b"b")
+        (season / "Show.S01E03.mkv").write_bytes(b"c")
+
+    # Oba nowe odcinki w jednej paczce, skan tylko zmienionego katalogu
+    assert blocker.args[0]['folder'] == str(season)
+    assert blocker.args[0]['added'] == 2
+    assert str(season / "Show.S01E03.mkv") in db.docs
+    # Świeże pliki są obserwowane (dopisywanie nie zmienia katalogu)
+    assert str(season / "Show.S01E02.mkv") in watcher.fs_watcher.files()
+    watcher.stop()
+
+
+class BlockingPipeline:
+    """Pipeline, którego skan trwa aż do anulowania (block=True)"""
+    def __init__(self):
+        self.block = True
+        self.started = threading.Event()
+        self.calls = []
+
+    def run(self, folder, incremental=True, callback=None, cancel=None, changed_dirs=None):
+        self.calls.append((folder, list(changed_dirs)))
+        self.started.set()
+        if self.block:
+            cancel.wait(5)
+        return {'added': 0, 'modified': 0, 'moved': 0, 'removed': 0, 'cancelled': cancel.is_set()}
+
+
+def test_pause_cancels_running_batch_and_merges_queued_dirs(qapp, qtbot, tmp_path):
+    show = tmp_path / "Show"
+    (show / "Season 1").mkdir(parents=True)
+    pipeline = BlockingPipeline()
+    watcher = LibraryWatcher(MemoryDB(), pipeline, debounce_ms=0)
+    watcher.add_root(str(tmp_path))
+    finished = []
+    watcher.batch_finished.connect(finished.append)
+
+    watcher._start(str(show), [str(show)])
+    assert pipeline.started.wait(5)
+    # Ręczny skan: paczka obserwowania nie może pisać do bazy równolegle
+    watcher.set_paused(True)
+    assert not watcher.worker.isRunning()
+    assert watcher._queue == [(str(show), [str(show)])]
+
+    # Zmiany w trakcie ręcznego skanu dopisują katalogi do czekającej paczki
+    watcher._mark(str(show / "Season 1"))
+    watcher._mark(str(show))
+    pipeline.block = False
+    with qtbot.waitSignal(watcher.batch_finished, timeout=5000):
+        watcher.set_paused(False)
+
+    assert pipeline.calls[-1] == (str(show), [str(show), str(show / "Season 1")])
+    # Przerwana paczka nie jest zgłaszana jako zakończona
+    assert len(finished) == 1 and not finished[0]['cancelled']
+    watcher.stop()
@@ -0,0 +1,56 @@
+import sys
+import urllib.request
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parent.parent / 'src'))
+
+from core.metrics import Registry, Counter, Gauge, Histogram, timed
+
+
+def test_disabled_registry_records_nothing():
+    reg = Registry(enabled=False)
+    calls = Counter("calls_total", "Wywołania", ["op"], registry=reg)
+    latency = Histogram("op_seconds", "Czas", registry=reg)
+
+    @timed(latency)
+    def work():
+        return 42
+
+    calls.inc(op="a")
+    with latency.time():
+        pass
+    assert work() == 42
+    assert calls.values() == [] and latency.values() == []
+
+
+def test_prometheus_export(tmp_path):
+    reg = Registry(enabled=True)
+    calls = Counter("tmdb_responses_total", "Odpowiedzi", ["kind", "status"], registry=reg)
+    size = Gauge("library_documents", "Pozycje", registry=reg)
+    latency = Histogram("db_operation_seconds", "Czas", ["op"], registry=reg, buckets=(0.01, 0.1, 1))
+
+    calls.inc(kind="search", status=200)
+    calls.inc(2, kind="search", status=429)
+    size.set_function(lambda: 1234)
+    for value in (0.005, 0.05, 0.05, 0.5):
+        latency.observe(value, op="upsert_scanned_files")
+
+    text = reg.render()
+    assert 'tmdb_responses_total{kind="search",status="429"} 2' in text
+    assert "library_documents 1234" in text
+    assert 'db_operation_seconds_bucket{op="upsert_scanned_files",le="0.1"} 3' in text
+    assert 'db_operation_seconds_bucket{op="upsert_scanned_files",le="+Inf"} 4' in text
+    assert 'db_operation_seconds_count{op="upsert_scanned_files"} 4' in text
+
+    [(labels, stats)] = latency.values()
+    assert stats['count'] == 4 and 0.01 < stats['p50'] <= 0.1
+
+    reg.write_file(tmp_path / "metrics.prom")
+    assert (tmp_path / "metrics.prom").read_text() == text
+
+    port = reg.serve(0)
+    try:
+        with urllib.request.urlopen(f"http://127.0.0.1:{port}/metrics") as res:
+            assert "tmdb_responses_total" in res.read().decode()
+    finally:
+        reg.stop_server()
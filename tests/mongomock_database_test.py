@@ -0,0 +1,39 @@
+import sys
+import json
+import subprocess
+import pytest
+from pathlib import Path
+
+project_root = Path(__file__).resolve().parent.parent
+sys.path.append(str(project_root / 'src'))
+sys.path.append(str(project_root / 'benchmarks'))
+
+pytest.importorskip("mongomock")
+
+from core.database import DataBase
+from fake_mongo import MongoClient
+
+# Te same testy co dla prawdziwego MongoDB (database_contract.py), ale bez serwera -
+# pilnują ścieżki mongomock używanej przez benchmarks/scan_bench.py --mongomock
+from database_contract import *  # noqa: F401,F403
+
+
+@pytest.fixture
+def db():
+    return DataBase(client=MongoClient(), db_name="movie_library_test")
+
+
+@pytest.mark.skip(reason="mongomock nie obsługuje indeksu tekstowego ($text)")
+def test_search_index_and_text_search(db):
+    pass
+
+
+def test_scan_bench_runs_on_mongomock(tmp_path):
+    """Dymny test benchmarku: etapy db i pipeline na mongomock (bez progów wydajności)"""
+    bench = project_root / 'benchmarks' / 'scan_bench.py'
+    out = tmp_path / "wynik.json"
+    subprocess.run([sys.executable, str(bench), "--count", "40", "--mongomock", "--stages", "db,pipeline",
+                    "--latency-ms", "0", "--jitter-ms", "0", "--json", str(out)],
+                   check=True, capture_output=True, timeout=120)
+    stages = json.loads(out.read_text())["stages"]
+    assert stages["db"]["files"] == 40 and stages["pipeline"]["files"] == 40
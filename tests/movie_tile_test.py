@@ -0,0 +1,51 @@
+import os
+import sys
+from pathlib import Path
+
+# Bez ekranu (CI/serwer) - Qt rysuje "w pamięci"
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+# Konfiguracja ścieżek (żeby widzieć folder src)
+sys.path.append(str(Path(__file__).resolve().parent.parent / 'src'))
+
+from PyQt6.QtGui import QPixmap, QColor
+from ui.image_cache import ImageCache
+from ui.movie_tile import MovieTile
+
+
+def test_backdrop_is_prescaled_once_per_size(qapp, qtbot):
+    cache = ImageCache(store=False)
+    backdrop = QPixmap(1280, 720)
+    backdrop.fill(QColor("red"))
+    cache._remember("http://img/backdrop.jpg", backdrop)
+
+    tile = MovieTile(image_cache=cache)
+    qtbot.addWidget(tile)
+    tile.resize(400, 300)
+    tile.show()
+    tile.update_info({'title_scanned': "Film", 'movie_details': {'backdrop_url': "http://img/backdrop.jpg"}})
+
+    render = tile._render
+    assert render.size() == tile._pixel_size()
+    # Odświeżenie bez zmiany rozmiaru nie składa tła od nowa
+    tile.repaint()
+    assert tile._render is render
+
+    tile.resize(500, 350)
+    qtbot.waitUntil(lambda: tile._render.size() == tile._pixel_size(), timeout=2000)
+    assert tile._render is not render
+
+
+def test_selecting_prefetched_neighbour_keeps_its_download(qapp, qtbot):
+    cache = ImageCache(store=False)
+    tile = MovieTile(image_cache=cache)
+    qtbot.addWidget(tile)
+    tile.update_info({'title_scanned': "A", 'movie_details': {'poster_url': "http://127.0.0.1:9/a.jpg"}})
+    neighbour = {'title_scanned': "B", 'movie_details': {'poster_url': "http://127.0.0.1:9/b.jpg"}}
+    tile.prefetch(neighbour)
+    reply = cache._pending["http://127.0.0.1:9/b.jpg"][0]
+
+    # Przejście na sąsiada: prefetch trwa dalej (nowe pokolenie), poprzedni plakat jest przerywany
+    tile.update_info(neighbour)
+    assert list(cache._pending) == ["http://127.0.0.1:9/b.jpg"]
+    assert cache._pending["http://127.0.0.1:9/b.jpg"] == (reply, tile.generation)
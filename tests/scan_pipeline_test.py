@@ -0,0 +1,177 @@
+import sys
+import threading
+from pathlib import Path
+
+# Konfiguracja ścieżek (żeby widzieć folder src)
+sys.path.append(str(Path(__file__).resolve().parent.parent / 'src'))
+
+from core.file_scanner import FileScanner
+from core.enrichment import TMDBEnricher, TokenBucket
+from core.scan_pipeline import ScanPipeline
+
+
+class MemoryDB:
+    """Minimalna baza w pamięci z metodami, których używa ScanPipeline"""
+    def __init__(self):
+        self.docs = {}
+        self.dirs = {}
+
+    def get_scan_state(self, root):
+        return {p: d.get('fs_stat') for p, d in self.docs.items()}, dict(self.dirs)
+
+    def upsert_scanned_files(self, records):
+        for r in records:
+            doc = self.docs.setdefault(r['filepath'], {'_id': len(self.docs) + 1, 'tmdb_id': None})
+            doc['fs_stat'] = r.get('fs_stat')
+            doc['fingerprint'] = r.get('fingerprint')
+        return {r['filepath']: self.docs[r['filepath']]['_id'] for r in records}
+
+    def get_unenriched_ids(self, ids):
+        return {d['_id'] for d in self.docs.values() if d['_id'] in set(ids) and d['tmdb_id'] is None}
+
+    def update_many_details(self, ids, details, tmdb_id):
+        for d in self.docs.values():
+            if d['_id'] in ids:
+                d['tmdb_id'] = tmdb_id
+
+    def prune_missing(self, root, present_paths, soft=False):
+        stale = [p for p, d in self.docs.items()
+                 if p.startswith(root) and p not in present_paths and not (soft and d.get('missing'))]
+        for p in stale:
+            if soft:
+                self.docs[p]['missing'] = True
+            else:
+                self.docs.pop(p)
+        for p in present_paths:
+            if p in self.docs:
+                self.docs[p].pop('missing', None)
+        return stale
+
+    def move_movies(self, moves):
+        for old, rec in moves:
+            self.docs[rec['filepath']] = self.docs.pop(old)
+            self.docs[rec['filepath']].pop('missing', None)
+
+    def find_by_fingerprints(self, fingerprints):
+        fingerprints = set(fingerprints)
+        found = {}
+        for path, d in self.docs.items():
+            if d.get('fingerprint') in fingerprints:
+                found.setdefault(d['fingerprint'], []).append({'_id': d['_id'], 'file_path': path})
+        return found
+
+    def save_dir_states(self, root, dirs):
+        self.dirs = dict(dirs)
+
+
+class FakeTMDB:
+    rate_limiter = None
+
+    def __init__(self):
+        self.calls = 0
+
+    def search_smart(self, query, year=None, force_tv=False):
+        self.calls += 1
+        return {"tmdb_id": 1, "title": query}
+
+
+def make_pipeline(db, tmdb, soft_delete=True):
+    enricher = TMDBEnricher(tmdb, max_workers=2, rate_limiter=TokenBucket(rate=1000))
+    return ScanPipeline(db, FileScanner(max_workers=2), enricher, batch_size=2, soft_delete=soft_delete)
+
+
+def test_pipeline_streams_events_and_rescans_incrementally(tmp_path):
+    for i in range(1, 4):
+        (tmp_path / f"Show.S01E0{i}.mkv").write_bytes(b"x" * i)
+    (tmp_path / "Film.2001.mkv").write_bytes(b"f")
+
+    db, tmdb = MemoryDB(), FakeTMDB()
+    events = []
+    summary = make_pipeline(db, tmdb).run(str(tmp_path), callback=lambda k, d: events.append((k, d)))
+
+    assert summary['added'] == 4 and summary['enriched'] == 4
+    # Serial i film - dwa zapytania do TMDB
+    assert tmdb.calls == 2
+    stored = [doc for kind, data in events if kind == 'stored' for doc in data]
+    assert len(stored) == 4
+    last_progress = [d for k, d in events if k == 'progress'][-1]
+    assert last_progress == {'found': 4, 'inserted': 4, 'enriched': 4, 'failed': 0}
+
+    summary = make_pipeline(db, tmdb).run(str(tmp_path))
+    assert summary['added'] == summary['modified'] == 0
+    assert tmdb.calls == 2
+
+
+def test_cancelled_scan_does_not_remove_records(tmp_path):
+    (tmp_path / "Film.mkv").write_bytes(b"f")
+    db = MemoryDB()
+    db.docs["/gdzie/indziej.mkv"] = {'_id': 99, 'tmdb_id': 5}
+
+    cancel = threading.Event()
+    cancel.set()
+    summary = make_pipeline(db, FakeTMDB()).run(str(tmp_path), cancel=cancel)
+
+    assert summary['cancelled']
+    assert "/gdzie/indziej.mkv" in db.docs
+
+
+def test_missing_files_are_tombstoned_and_revived(tmp_path):
+    film = tmp_path / "Film.2001.mkv"
+    film.write_bytes(b"f")
+    (tmp_path / "Inny.mkv").write_bytes(b"i")
+    db, tmdb = MemoryDB(), FakeTMDB()
+    make_pipeline(db, tmdb).run(str(tmp_path))
+
+    film.rename(tmp_path.parent / "schowany.mkv")
+    summary = make_pipeline(db, tmdb).run(str(tmp_path))
+    assert summary['removed'] == 1
+    assert db.docs[str(film)]['missing'] and db.docs[str(film)]['tmdb_id'] == 1
+
+    # Plik wraca - rekord znów widoczny, bez nowego zapytania do TMDB
+    (tmp_path.parent / "schowany.mkv").rename(film)
+    calls = tmdb.calls
+    summary = make_pipeline(db, tmdb).run(str(tmp_path))
+    assert summary['removed'] == 0 and 'missing' not in db.docs[str(film)]
+    assert tmdb.calls == calls
+
+    film.unlink()
+    make_pipeline(db, tmdb, soft_delete=False).run(str(tmp_path))
+    assert str(film) not in db.docs
+
+
+def test_file_moved_to_another_library_keeps_its_match(tmp_path):
+    """Przeniesienie na inny "dysk" (nowy inode) rozpoznane po treści - bez zapytania do TMDB"""
+    old_root, new_root = tmp_path / "stary", tmp_path / "nowy"
+    old_root.mkdir()
+    new_root.mkdir()
+    (old_root / "Film.2001.mkv").write_bytes(b"tresc filmu" * 1000)
+    db, tmdb = MemoryDB(), FakeTMDB()
+    make_pipeline(db, tmdb).run(str(old_root))
+    db.docs[str(old_root / "Film.2001.mkv")]['tmdb_id'] = 99  # np. poprawka z fix_match
+
+    # Kopia + usunięcie oryginału (inny inode i mtime)
+    (new_root / "Film (2001).mkv").write_bytes((old_root / "Film.2001.mkv").read_bytes())
+    (old_root / "Film.2001.mkv").unlink()
+    calls = tmdb.calls
+    summary = make_pipeline(db, tmdb).run(str(new_root))
+
+    assert summary['moved'] == 1 and summary['added'] == 0
+    assert db.docs[str(new_root / "Film (2001).mkv")]['tmdb_id'] == 99
+    assert tmdb.calls == calls
+
+
+def test_changed_dirs_are_listed_despite_unchanged_mtime(tmp_path):
+    season = tmp_path / "Show" / "Season 1"
+    season.mkdir(parents=True)
+    episode = season / "Show.S01E01.mkv"
+    episode.write_bytes(b"a")
+    db = MemoryDB()
+    make_pipeline(db, FakeTMDB()).run(str(tmp_path))
+
+    # Nadpisanie pliku nie zmienia mtime katalogu - zwykły skan przyrostowy go nie zauważy
+    episode.write_bytes(b"abc")
+    assert make_pipeline(db, FakeTMDB()).run(str(tmp_path))['modified'] == 0
+
+    summary = make_pipeline(db, FakeTMDB()).run(str(tmp_path), changed_dirs=[str(season) + "/"])
+    assert summary['modified'] == 1 and summary['removed'] == 0
+    assert db.docs[str(episode)]['fs_stat']['size'] == 3
@@ -0,0 +1,63 @@
+import sys
+from pathlib import Path
+
+# Konfiguracja ścieżek (żeby widzieć folder src)
+sys.path.append(str(Path(__file__).resolve().parent.parent / 'src'))
+
+from core.search_index import SearchIndex
+
+
+def doc(i, title, year=None, genres=(), kind=None, episode="", original=None):
+    details = {'title': title, 'genres': list(genres)}
+    if year: details['release_year'] = year
+    if kind: details['type'] = kind
+    if original: details['original_title'] = original
+    return {'_id': i, 'file_path': f"/filmy/{i}.mkv", 'title_scanned': title,
+            'episode_code': episode, 'movie_details': details}
+
+
+def make_index():
+    index = SearchIndex()
+    index.load([
+        doc(1, "The Matrix", "1999", ["Akcja", "Sci-Fi"], "movie"),
+        doc(2, "The Matrix Reloaded", "2003", ["Akcja"], "movie"),
+        doc(3, "Wiedźmin", "2019", ["Dramat", "Fantasy"], "tv", episode="S01E01", original="The Witcher"),
+        doc(4, "Łódź Kaliska", "1991", ["Dramat"], "movie"),
+    ])
+    return index
+
+
+def test_prefix_and_multiword_search():
+    index = make_index()
+    assert index.search("matr") == {1, 2}
+    assert index.search("the matrix rel") == {2}
+    # Bez polskich znaków i po tytule oryginalnym
+    assert index.search("wiedzmin") == {3}
+    assert index.search("lodz") == {4}
+    assert index.search("witcher") == {3}
+    assert index.search("s01e01") == {3}
+    assert index.search("") is None
+
+
+def test_typo_tolerance_and_facets():
+    index = make_index()
+    assert index.search("matirx") == {1, 2}
+    assert index.search("matrix rok:1999") == {1}
+    assert index.search("typ:serial") == {3}
+    assert index.search("gatunek:dram") == {3, 4}
+    assert index.search("", year=2003) == {2}
+    assert index.facet_counts('year', {1, 2}) == {'1999': 1, '2003': 1}
+
+
+def test_incremental_updates():
+    index = make_index()
+    index.apply('update', [doc(4, "Dune", "2021", ["Sci-Fi"], "movie")])
+    assert index.search("lodz") == set()
+    assert index.search("dune") == {4}
+
+    index.apply('delete', [{'_id': 1, 'file_path': "/filmy/1.mkv"}])
+    assert index.search("matrix") == {2}
+    index.apply('insert', [doc(5, "Matrix Resurrections", "2021")])
+    assert index.search("matrix res") == {5}
+    # Słowo, które zniknęło ze wszystkich dokumentów, nie zostaje w indeksie
+    assert "lodz" not in index._ids_by_token
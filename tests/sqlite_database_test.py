@@ -0,0 +1,75 @@
+import sys
+import pytest
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parent.parent / 'src'))
+
+from core.sqlite_database import SQLiteDataBase
+from core.storage import BaseDataBase, open_database, migrate
+from movie_manager import cli
+
+# Te same testy co dla MongoDB (database_contract.py) - bez pymongo, tylko fixture bazy jest inny
+from database_contract import *  # noqa: F401,F403
+
+
+@pytest.fixture
+def db(tmp_path):
+    database = SQLiteDataBase(path=tmp_path / "library.sqlite")
+    yield database
+    database.close()
+
+
+def test_schema_uses_wal_and_indexes(db):
+    assert db.conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+    plan = " ".join(row[-1] for row in db.conn.execute(
+        "EXPLAIN QUERY PLAN SELECT id FROM movies WHERE fingerprint IN ('a', 'b')"))
+    assert "idx_movies_fingerprint" in plan
+
+
+def test_open_database_selects_backend(tmp_path, monkeypatch):
+    monkeypatch.setenv("DB_BACKEND", "sqlite")
+    monkeypatch.setenv("SQLITE_PATH", str(tmp_path / "env.sqlite"))
+    database = open_database(cache=False)
+    assert isinstance(database, SQLiteDataBase) and database.path == str(tmp_path / "env.sqlite")
+    with pytest.raises(ValueError):
+        open_database("redis")
+
+
+def test_incomplete_backend_fails_at_construction():
+    class NoQueries(BaseDataBase):
+        def _to_oid(self, movie_id):
+            return movie_id
+
+    with pytest.raises(TypeError):
+        NoQueries()
+
+
+def test_migrate_copies_records_state_and_roots(db, tmp_path):
+    stat = {'size': 1, 'mtime_ns': 1, 'inode': 1}
+    ids = db.upsert_scanned_files([
+        {'filepath': "/lib/a.mkv", 'title_guess': "A", 'fs_stat': stat, 'fingerprint': "1-a"},
+        {'filepath': "/lib/b.mkv", 'title_guess': "B", 'fs_stat': stat},
+    ])
+    db.update_movie_details(ids["/lib/a.mkv"], {"title": "Film A", "genres": ["Dramat"]}, tmdb_id=3)
+    db.prune_missing("/lib", ["/lib/a.mkv"], soft=True)
+    db.save_dir_states("/lib", {"/lib": {'mtime_ns': 2, 'subdirs': []}})
+    db.add_library_root("/lib")
+
+    target = SQLiteDataBase(path=tmp_path / "copy.sqlite")
+    progress = []
+    assert migrate(db, target, batch_size=1, progress=progress.append) == {"movies": 2, "dirs": 1, "roots": 1}
+    assert progress == [1, 2]
+
+    copied = target.get_movie_by_path("/lib/a.mkv")
+    assert copied['movie_details'] == {"title": "Film A", "genres": ["Dramat"]} and copied['fingerprint'] == "1-a"
+    assert target.count_missing() == 1 and target.get_library_roots() == ["/lib"]
+    assert target.get_scan_state("/lib") == db.get_scan_state("/lib")
+
+    # Powtórzona migracja nadpisuje rekordy zamiast je dublować
+    migrate(db, target)
+    assert target.get_stats()['total'] == 2
+
+
+def test_cli_migrate_between_sqlite_files_is_rejected(tmp_path, capsys):
+    code = cli.main(["migrate", "--from", "sqlite", "--to", "sqlite", "--sqlite-path", str(tmp_path / "x.sqlite")])
+    assert code == 1 and "ten sam backend" in capsys.readouterr().out
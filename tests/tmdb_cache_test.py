@@ -0,0 +1,110 @@
+import sys
+import time
+from pathlib import Path
+
+# Konfiguracja ścieżek (żeby widzieć folder src)
+sys.path.append(str(Path(__file__).resolve().parent.parent / 'src'))
+
+from core.tmdb_cache import TMDBCache
+from core.tmdb_api import TMDBClient
+
+
+class FakeResponse:
+    def __init__(self, status_code, data=None):
+        self.status_code = status_code
+        self.data = data
+
+    def json(self):
+        return self.data
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise RuntimeError(f"HTTP {self.status_code}")
+
+
+def test_key_normalization():
+    """Klucz API, wielkość liter, spacje i nazwa parametru roku nie zmieniają klucza"""
+    a = TMDBCache.make_key("/search/movie", {"api_key": "A", "query": "The  Matrix ", "primary_release_year": 1999})
+    b = TMDBCache.make_key("/search/movie/", {"api_key": "B", "query": "the matrix", "year": "1999"})
+    assert a == b
+    assert TMDBCache.make_key("/movie/603", {}) != TMDBCache.make_key("/tv/603", {})
+
+
+def test_persists_across_instances(tmp_path):
+    path = tmp_path / "cache.sqlite"
+    cache = TMDBCache(path)
+    cache.set("k", 'details', {"id": 1})
+    cache.close()
+
+    hit, data = TMDBCache(path).get("k")
+    assert hit and data == {"id": 1}
+
+
+def test_ttl_and_negative_entries(tmp_path):
+    cache = TMDBCache(tmp_path / "c.sqlite", ttls={'details': 60, 'negative': -1})
+    cache.set("ok", 'details', {"id": 1})
+    cache.set("none", 'details', None, negative=True)
+
+    assert cache.get("ok") == (True, {"id": 1})
+    # Negatywny wpis z ujemnym TTL jest już przeterminowany
+    assert cache.get("none") == (False, None)
+
+    cache = TMDBCache(tmp_path / "c2.sqlite")
+    cache.set("none", 'details', None, negative=True)
+    assert cache.get("none") == (True, None)
+
+
+def test_lru_eviction(tmp_path):
+    cache = TMDBCache(tmp_path / "c.sqlite", max_entries=10)
+    for i in range(10):
+        cache.set(f"k{i}", 'search', {"i": i})
+    time.sleep(0.01)
+    cache.get("k0")  # k0 był używany niedawno - nie powinien wylecieć
+    for i in range(10, 15):
+        cache.set(f"k{i}", 'search', {"i": i})
+    cache.evict()
+
+    assert len(cache) <= 10
+    assert cache.get("k0")[0]
+    assert not cache.get("k1")[0]
+
+
+def test_client_rescan_makes_no_http_calls(tmp_path):
+    """Drugie wyszukiwanie tego samego tytułu nie wysyła żadnego żądania"""
+    client = TMDBClient(cache=TMDBCache(tmp_path / "c.sqlite"))
+    client.api_key = "test"
+    calls = []
+
+    def fake_get(url, params):
+        calls.append(url)
+        if "/search/" in url:
+            return FakeResponse(200, {"results": [{"id": 603}]})
+        return FakeResponse(200, {"id": 603, "title": "The Matrix", "release_date": "1999-03-31"})
+
+    client._get = fake_get
+    first = client._search_specific("The Matrix", "1999", 'movie')
+    assert first['title'] == "The Matrix"
+    assert len(calls) == 2  # wyszukiwanie + szczegóły
+
+    again = client._search_specific("the matrix", 1999, 'movie')
+    assert again == first
+    assert len(calls) == 2
+
+
+def test_hits_buffer_access_times_until_flush(tmp_path):
+    path = tmp_path / "c.sqlite"
+    cache = TMDBCache(path)
+    cache.set("k", 'details', {"id": 1})
+    stored = cache.conn.execute("SELECT last_access FROM responses WHERE key = 'k'").fetchone()[0]
+    time.sleep(0.01)
+
+    # Trafienie nie zapisuje do pliku - czas dostępu czeka w pamięci
+    changes = cache.conn.total_changes
+    assert cache.get("k")[0]
+    assert cache.conn.total_changes == changes and "k" in cache._accessed
+
+    # Zamknięcie zapisuje zbuforowane czasy
+    cache.close()
+    reopened = TMDBCache(path)
+    accessed = reopened.conn.execute("SELECT last_access FROM responses WHERE key = 'k'").fetchone()[0]
+    assert accessed > stored
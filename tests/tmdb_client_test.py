@@ -0,0 +1,86 @@
+import sys
+from pathlib import Path
+
+import pytest
+import requests
+
+# Konfiguracja ścieżek (żeby widzieć folder src)
+sys.path.append(str(Path(__file__).resolve().parent.parent / 'src'))
+
+import core.tmdb_api
+from core.tmdb_api import TMDBClient
+
+
+class FakeResponse:
+    def __init__(self, status_code, data=None, headers=None):
+        self.status_code = status_code
+        self.data = data
+        self.headers = headers or {}
+
+    def json(self):
+        return self.data
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise requests.HTTPError(f"HTTP {self.status_code}")
+
+
+@pytest.fixture
+def client(monkeypatch):
+    """Klient bez cache, z zapisywaniem czasów oczekiwania zamiast prawdziwego sleep"""
+    c = TMDBClient(cache=False, max_retries=3)
+    c.api_key = "test"
+    c.sleeps = []
+    monkeypatch.setattr(core.tmdb_api.time, "sleep", c.sleeps.append)
+    return c
+
+
+def queue_responses(client, responses):
+    def fake_get(url, params=None, timeout=None):
+        item = responses.pop(0)
+        if isinstance(item, Exception):
+            raise item
+        return item
+    client.session.get = fake_get
+
+
+def test_retries_429_honouring_retry_after(client):
+    queue_responses(client, [
+        FakeResponse(429, headers={"Retry-After": "2"}),
+        FakeResponse(200, {"id": 1, "title": "Film", "release_date": "2001-01-01"}),
+    ])
+    data = client._get_details_by_id(1, 'movie')
+
+    assert data['title'] == "Film"
+    assert client.sleeps == [2.0]
+    assert client.stats["throttled"] == 1
+    assert client.stats["retries"] == 1
+    assert client.stats["requests"] == 2
+
+
+def test_retries_5xx_and_network_errors_with_backoff(client):
+    queue_responses(client, [
+        FakeResponse(503),
+        requests.ConnectionError("reset"),
+        FakeResponse(200, {"results": []}),
+    ])
+    res = client._get("https://example/search", {})
+
+    assert res.status_code == 200
+    assert client.stats["retries"] == 2
+    # Jitter: opóźnienie w przedziale [0, base * 2^próba]
+    assert 0 <= client.sleeps[0] <= client.backoff_base
+    assert 0 <= client.sleeps[1] <= client.backoff_base * 2
+
+
+def test_gives_up_after_max_retries(client):
+    queue_responses(client, [FakeResponse(500) for _ in range(4)])
+    assert client._get_details_by_id(1, 'movie') is None
+    assert client.stats["requests"] == 4
+    assert client.stats["retries"] == 3
+
+
+def test_not_found_is_not_retried(client):
+    queue_responses(client, [FakeResponse(404)])
+    assert client._get_details_by_id(999, 'tv') is None
+    assert client.stats["retries"] == 0
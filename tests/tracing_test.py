@@ -0,0 +1,51 @@
+import sys
+import json
+import threading
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parent.parent / 'src'))
+
+from core import tracing
+from core.tracing import Tracer
+from scan_pipeline_test import MemoryDB, FakeTMDB, make_pipeline
+
+
+def test_spans_are_written_as_chrome_trace(tmp_path):
+    tracer = Tracer()
+    with tracer.span("wyłączony"):
+        pass
+    assert tracer.events() == []
+
+    def child():
+        with tracer.span("dziecko"):
+            pass
+
+    tracer.start(str(tmp_path / "trace.json"))
+    with tracer.span("rodzic", cat="scan", folder="/filmy") as span:
+        worker = threading.Thread(target=child, name="worker")
+        worker.start()
+        worker.join()
+        span.set(files=3)
+    tracer.counter("kolejka", records=5)
+    path = tracer.save()
+
+    data = json.loads(Path(path).read_text())
+    events = {e['name']: e for e in data['traceEvents']}
+    assert events['rodzic']['ph'] == "X" and events['rodzic']['args'] == {"folder": "/filmy", "files": 3}
+    assert events['dziecko']['tid'] != events['rodzic']['tid']
+    assert events['rodzic']['dur'] >= events['dziecko']['dur']
+    threads = [e['args']['name'] for e in data['traceEvents'] if e['ph'] == "M"]
+    assert "worker" in threads
+
+
+def test_scan_pipeline_is_traced(tmp_path):
+    (tmp_path / "Show.S01E01.mkv").write_bytes(b"a")
+    (tmp_path / "Film.2001.mkv").write_bytes(b"b")
+    tracing.TRACER.start()
+    try:
+        make_pipeline(MemoryDB(), FakeTMDB()).run(str(tmp_path))
+        names = {e['name'] for e in tracing.TRACER.events()}
+    finally:
+        tracing.TRACER.stop()
+        tracing.TRACER.clear()
+    assert {"ScanPipeline.run", "list_dir", "fingerprint", "store_batch", "tmdb_lookup"} <= names